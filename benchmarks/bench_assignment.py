@@ -0,0 +1,59 @@
+"""Benchmark of the assignment solvers against scipy.optimize.linear_sum_assignment.
+
+Tracking problems are the cost matrices between two images of objects doing a random walk, some of them
+disappearing. Random problems are uniform costs, all pairs valid, the worst case of the incremental solver.
+The optimal cost is checked against linear_sum_assignment with well-conditioned forbidden pairs.
+
+Run from the repository root: python -m benchmarks.bench_assignment
+
+"""
+import time
+import numpy as np
+from pyfasttrack.assignment import AssignmentSolver, IncrementalSolver, ScipySolver
+from pyfasttrack.data import Detections
+from pyfasttrack.tracker import Tracker
+
+
+def get_tracking_problem(n, rng):
+    params = {"spot": 2, "normDist": 1, "normAngle": 1, "normArea": 1, "normPerim": 1, "maxDist": 10}
+    x = rng.uniform(0, np.sqrt(n) * 50, n)
+    y = rng.uniform(0, np.sqrt(n) * 50, n)
+    prev = Detections(size=n)
+    prev.data["xBody"] = x
+    prev.data["yBody"] = y
+    visible = rng.random(n) > 0.05
+    current = Detections(size=np.count_nonzero(visible))
+    current.data["xBody"] = (x + rng.normal(0, 3, n))[visible]
+    current.data["yBody"] = (y + rng.normal(0, 3, n))[visible]
+    current = current[rng.permutation(len(current))]
+    return Tracker(params).get_cost(prev, current)
+
+
+def get_random_problem(n, rng):
+    cost = rng.uniform(0, 1, (n, n))
+    return cost, np.ones(cost.shape, dtype=bool)
+
+
+def run(solver, cost, valid, repeat=5):
+    durations = []
+    for __ in range(repeat):
+        start = time.perf_counter()
+        row, col = solver.solve(cost, valid)
+        durations.append(time.perf_counter() - start)
+    return min(durations), len(row), np.sum(cost[row, col])
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    print("{:>10} {:>8} {:>12} {:>16} {:>10} {:>10}".format(
+        "problem", "objects", "scipy (ms)", "incremental (ms)", "pairs", "cost"))
+    for name, problem, sizes in (("tracking", get_tracking_problem, (100, 1000, 3000)),
+                                 ("random", get_random_problem, (100, 300))):
+        for n in sizes:
+            cost, valid = problem(n, rng)
+            ref = np.where(valid, cost, AssignmentSolver.get_forbidden_cost(cost[valid]))
+            scipy_time, scipy_pairs, scipy_cost = run(ScipySolver(), ref, valid)
+            time_, pairs, total = run(IncrementalSolver(), cost, valid)
+            print("{:>10} {:>8} {:>12.3f} {:>16.3f} {:>10} {:>10}".format(
+                name, n, scipy_time * 1e3, time_ * 1e3, "ok" if pairs == scipy_pairs else "error",
+                "ok" if np.isclose(total, scipy_cost) else "error"))
@@ -0,0 +1,26 @@
+"""Benchmark of the background projections on a sample of 4K images.
+
+Run from the repository root: python -m benchmarks.bench_background
+
+"""
+import time
+import numpy as np
+from pyfasttrack.background import Background
+
+
+def run(method, images):
+    start = time.perf_counter()
+    Background(method).compute(images)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 256, (2160, 3840), dtype=np.uint8)
+              for __ in range(50)]
+    print("{:>8} {:>10}".format("method", "time (s)"))
+    for method in Background.methods:
+        print("{:>8} {:>10.3f}".format(method, run(method, images)))
+    start = time.perf_counter()
+    np.median(np.stack(images), axis=0).astype(np.uint8)
+    print("{:>8} {:>10.3f}".format("np.stack", time.perf_counter() - start))
@@ -0,0 +1,41 @@
+"""Benchmark of the import time of the package and its modules, each one measured in a new interpreter.
+
+Run from the repository root: python -m benchmarks.bench_import
+The exit status is 1 if import pyfasttrack exceeds its budget or loads a heavy dependency.
+
+"""
+import subprocess
+import sys
+
+BUDGET = 0.05
+HEAVY = ("sentry_sdk", "scipy", "ultralytics", "torch", "onnxruntime", "cv2")
+MODULES = ("pyfasttrack", "pyfasttrack.data", "pyfasttrack.source", "pyfasttrack.ft_detector",
+           "pyfasttrack.tracker", "pyfasttrack.pipeline", "pyfasttrack.batch", "pyfasttrack.onnx_detector")
+CODE = """
+import sys, time
+start = time.perf_counter()
+import {}
+duration = time.perf_counter() - start
+print(duration, ",".join(i for i in {} if i in sys.modules))
+"""
+
+
+def run(module, repeat=5):
+    durations = []
+    for __ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", CODE.format(module, HEAVY)],
+                                capture_output=True, text=True, check=True).stdout.split()
+        durations.append(float(output[0]))
+    return min(durations), output[1] if len(output) > 1 else ""
+
+
+if __name__ == "__main__":
+    print("{:>28} {:>10}  {}".format("module", "time (s)", "heavy modules loaded"))
+    for module in MODULES:
+        duration, loaded = run(module)
+        print("{:>28} {:>10.3f}  {}".format(module, duration, loaded))
+        if module == "pyfasttrack":
+            failed = duration > BUDGET or loaded != ""
+    if failed:
+        print("import pyfasttrack exceeds its budget of {} s or loads a heavy dependency".format(BUDGET))
+        sys.exit(1)
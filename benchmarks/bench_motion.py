@@ -0,0 +1,48 @@
+"""Benchmark of the motion models on fast objects, each one moving at a constant velocity with some noise.
+
+maxDist must be larger than the displacement between two images. With a motion model, motionDist only has to
+cover the prediction error of the objects with a known velocity.
+
+Run from the repository root: python -m benchmarks.bench_motion
+
+"""
+import time
+from pyfasttrack.tracker import Tracker
+from .synthetic import SyntheticDetector
+
+
+def run(n, images, motion, motion_dist):
+    params = {"spot": 2, "normDist": 1, "normAngle": 1, "normArea": 1, "normPerim": 1,
+              "maxDist": 25, "maxTime": 5, "sparse": 1, "motion": motion, "motionDist": motion_dist}
+    tracker = Tracker(params, SyntheticDetector(n, spacing=40, speed=15))
+    tracker.initialize(None)
+    pairs = 0
+    sparse_cost = tracker.get_sparse_cost
+
+    def counted_sparse_cost(*args):
+        nonlocal pairs
+        cost = sparse_cost(*args)
+        pairs += len(cost[0])
+        return cost
+
+    tracker.get_sparse_cost = counted_sparse_cost
+    truth = {}
+    errors = 0
+    start = time.perf_counter()
+    for __ in range(images):
+        detections = tracker.process(None)
+        for i, j in zip(detections.data["id"], detections.data["headMajorAxisLength"]):
+            errors += truth.setdefault(i, j) != j
+    total = time.perf_counter() - start
+    return total / images, pairs / images, errors + tracker.max_id + 1 - n
+
+
+if __name__ == "__main__":
+    print("{:>8} {:>8} {:>10} {:>12} {:>10} {:>10}".format(
+        "objects", "motion", "motionDist", "process (ms)", "pairs", "errors"))
+    run(10, 2, 0, 25)
+    for n in [100, 1000, 10000]:
+        for motion, motion_dist in [(0, 25), (1, 8), (2, 8)]:
+            total, pairs, errors = run(n, 20, motion, motion_dist)
+            print("{:>8} {:>8} {:>10} {:>12.3f} {:>10.0f} {:>10}".format(
+                n, motion, motion_dist, total * 1e3, pairs, errors))
@@ -0,0 +1,30 @@
+"""Benchmark of the lost objects pool with two thirds of the objects hidden for a few images.
+
+Run from the repository root: python -m benchmarks.bench_occlusion
+
+"""
+import time
+from pyfasttrack.tracker import Tracker
+from .synthetic import SyntheticDetector
+
+
+def run(n, images, sparse, pool):
+    params = {"spot": 2, "normDist": 1, "normAngle": 1, "normArea": 1, "normPerim": 1,
+              "maxDist": 10, "maxTime": 20, "sparse": sparse, "lostPool": pool}
+    tracker = Tracker(params, SyntheticDetector(n, hide=0.2, show=0.1))
+    tracker.initialize(None)
+    start = time.perf_counter()
+    for __ in range(images):
+        tracker.process(None)
+    return (time.perf_counter() - start) / images, tracker.max_id
+
+
+if __name__ == "__main__":
+    print("{:>8} {:>8} {:>8} {:>14} {:>10}".format(
+        "objects", "sparse", "lostPool", "process (ms)", "identities"))
+    run(10, 2, 0, 0)
+    for n in [100, 1000, 3000]:
+        for sparse, pool in [(0, 0), (0, 1), (1, 0), (1, 1)]:
+            total, identities = run(n, 40, sparse, pool)
+            print("{:>8} {:>8} {:>8} {:>14.3f} {:>10}".format(
+                n, sparse, pool, total * 1e3, identities))
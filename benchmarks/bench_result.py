@@ -0,0 +1,60 @@
+"""Benchmark of the Result backends, writing and loading the tracking table.
+
+Run from the repository root: python -m benchmarks.bench_result
+
+"""
+import shutil
+import sqlite3
+import tempfile
+import time
+import numpy as np
+from pyfasttrack.data import Detections, NpzBackend, Result, SqliteBackend
+
+
+def detections(n, image):
+    dat = Detections(size=n)
+    for i in dat.data.dtype.names:
+        dat.data[i] = np.random.default_rng(image).random(n)
+    dat.data["headMajorAxisLength"] += 1
+    dat.data["tailMajorAxisLength"] += 1
+    dat.data["bodyMajorAxisLength"] += 1
+    dat.data["imageNumber"] = image
+    dat.data["id"] = np.arange(n)
+    return dat
+
+
+def load_sqlite(path):
+    cnx = sqlite3.connect(path + "/Tracking_Result/tracking.db")
+    data = np.asarray(cnx.execute(
+        "SELECT * FROM tracking").fetchall(), dtype=np.float64)
+    cnx.close()
+    return data
+
+
+def load_npz(path):
+    return NpzBackend.read(path + "/Tracking_Result/")
+
+
+def run(backend, load, n, images, buffer_size):
+    folder = tempfile.mkdtemp()
+    data = [detections(n, i) for i in range(images)]
+    start = time.perf_counter()
+    with Result(folder, buffer_size=buffer_size, backend=backend) as result:
+        for i in data:
+            result.add_data(i)
+    write = time.perf_counter() - start
+    start = time.perf_counter()
+    load(folder)
+    read = time.perf_counter() - start
+    shutil.rmtree(folder)
+    return write, read
+
+
+if __name__ == "__main__":
+    print("{:>8} {:>8} {:>8} {:>10} {:>10}".format(
+        "backend", "objects", "images", "write (s)", "load (s)"))
+    for n, images in [(10, 1000), (300, 1000), (300, 10000)]:
+        for name, backend, load in [("sqlite", SqliteBackend, load_sqlite), ("npz", NpzBackend, load_npz)]:
+            write, read = run(backend, load, n, images, 100)
+            print("{:>8} {:>8} {:>8} {:>10.3f} {:>10.3f}".format(
+                name, n, images, write, read))
@@ -0,0 +1,41 @@
+"""Benchmark of the Tracker identity management from 10 to 10,000 objects.
+
+Run from the repository root: python -m benchmarks.bench_tracker
+
+"""
+import time
+from pyfasttrack.tracker import Tracker
+from .synthetic import SyntheticDetector
+
+
+def run(n, images):
+    params = {"spot": 2, "normDist": 1, "normAngle": 1, "normArea": 1, "normPerim": 1,
+              "maxDist": 10, "maxTime": 5, "sparse": 1}
+    tracker = Tracker(params, SyntheticDetector(n, hide=0.05, show=0.95))
+    tracker.initialize(None)
+    assign_time = 0
+    assign = tracker.assign
+
+    def timed_assign(*args):
+        nonlocal assign_time
+        start = time.perf_counter()
+        order = assign(*args)
+        assign_time += time.perf_counter() - start
+        return order
+
+    tracker.assign = timed_assign
+    start = time.perf_counter()
+    for __ in range(images):
+        tracker.process(None)
+    total = time.perf_counter() - start
+    return total / images, assign_time / images
+
+
+if __name__ == "__main__":
+    print("{:>8} {:>14} {:>14} {:>18}".format(
+        "objects", "process (ms)", "assign (ms)", "bookkeeping (ms)"))
+    run(10, 2)
+    for n in [10, 100, 1000, 10000]:
+        total, assign = run(n, 20)
+        print("{:>8} {:>14.3f} {:>14.3f} {:>18.3f}".format(
+            n, total * 1e3, assign * 1e3, (total - assign) * 1e3))
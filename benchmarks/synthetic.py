@@ -0,0 +1,58 @@
+"""Synthetic detector shared by the tracking benchmarks.
+
+"""
+import numpy as np
+from pyfasttrack.base_detector import BaseDetector
+from pyfasttrack.data import Detections
+
+
+class SyntheticDetector(BaseDetector):
+    """Detector returning objects moving at a constant velocity with a random walk, hidden and found again in turn.
+
+    The true identity is stored in headMajorAxisLength and the objects are returned in a random order.
+
+    """
+
+    def __init__(self, n, seed=0, spacing=50, speed=0, hide=0, show=1):
+        """Initialize the detector.
+
+        Parameters
+        ----------
+        n : int
+            Number of objects.
+        seed : int
+            Seed of the random generator.
+        spacing : float
+            Objects are spread in a square of side sqrt(n) * spacing.
+        speed : float
+            Displacement in pixels by image, in a random direction for each object.
+        hide : float
+            Probability for a visible object to be hidden at the next image.
+        show : float
+            Probability for a hidden object to be found at the next image.
+
+        """
+        self.rng = np.random.default_rng(seed)
+        self.size = np.sqrt(n) * spacing
+        self.position = self.rng.uniform(0, self.size, (n, 2))
+        angle = self.rng.uniform(0, 2 * np.pi, n)
+        self.velocity = speed * np.column_stack((np.cos(angle), np.sin(angle)))
+        self.visible = np.ones(n, dtype=bool)
+        self.hide = hide
+        self.show = show
+
+    def detect(self, image):
+        pass
+
+    def process(self, image):
+        self.position += self.velocity + self.rng.normal(0, 1, self.position.shape)
+        if self.hide > 0:
+            change = self.rng.random(len(self.visible)) < np.where(self.visible, self.hide, self.show)
+            self.visible ^= change
+        detections = Detections(size=np.count_nonzero(self.visible))
+        detections.data["xBody"] = self.position[self.visible, 0]
+        detections.data["yBody"] = self.position[self.visible, 1]
+        detections.data["areaBody"] = 100
+        detections.data["perimeterBody"] = 40
+        detections.data["headMajorAxisLength"] = np.flatnonzero(self.visible)
+        return detections[self.rng.permutation(len(detections))]
@@ -1,9 +1,36 @@
-import sentry_sdk
-sentry_sdk.init(
-    dsn="https://5dff536b23ee400db3e2f247edf1d711@o4505228290031616.ingest.sentry.io/4505228343967744",
-
-    # Set traces_sample_rate to 1.0 to capture 100%
-    # of transactions for performance monitoring.
-    # We recommend adjusting this value in production.
-    traces_sample_rate=1.0
-)
+import importlib
+import os
+
+DSN = "https://5dff536b23ee400db3e2f247edf1d711@o4505228290031616.ingest.sentry.io/4505228343967744"
+
+__all__ = ["background", "base_detector", "batch", "data", "ft_detector", "onnx_detector", "pipeline", "source",
+           "tracker", "yolo_detector", "enable_telemetry"]
+
+
+def enable_telemetry(traces_sample_rate=0.0, **kwargs):
+    """Send the errors, and optionally performance traces, to the PyFastTrack Sentry project.
+
+    Telemetry is disabled by default, it is enabled by this function or at import when the environment
+    variable PYFASTTRACK_TELEMETRY is set to 1.
+
+    Parameters
+    ----------
+    traces_sample_rate : float
+        Fraction of the transactions traced for performance monitoring, 0 to report only the errors.
+    **kwargs
+        Other arguments of sentry_sdk.init.
+
+    """
+    import sentry_sdk
+    sentry_sdk.init(dsn=DSN, traces_sample_rate=traces_sample_rate, **kwargs)
+
+
+def __getattr__(name):
+    """Import the submodules at their first access, pyfasttrack.tracker works after import pyfasttrack."""
+    if name in __all__:
+        return importlib.import_module("." + name, __name__)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+if os.environ.get("PYFASTTRACK_TELEMETRY") == "1":
+    enable_telemetry()
@@ -0,0 +1,226 @@
+import abc
+import numpy as np
+
+
+class AssignmentSolver(metaclass=abc.ABCMeta):
+    """Solve the assignment problems of the Tracker.
+
+    A solver finds the pairs of an optimal assignment restricted to the valid pairs: the number of pairs is
+    maximal and their total cost minimal. Subclass it and pass an instance to the Tracker to plug another solver.
+
+    """
+
+    @classmethod
+    def from_params(cls, params):
+        """Create the solver selected by the optional parameter solver.
+
+        Parameters
+        ----------
+        params : dict
+            Parameters, solver is 0 (default) for ScipySolver and 1 for IncrementalSolver.
+
+        Returns
+        -------
+        AssignmentSolver
+            Solver.
+
+        """
+        return (ScipySolver, IncrementalSolver)[int(params.get("solver", 0))]()
+
+    @staticmethod
+    def get_forbidden_cost(costs):
+        """Get a cost for the forbidden pairs higher than any assignment of the valid pairs.
+
+        Forbidden pairs cost more than all the valid pairs together but stay in the same order of
+        magnitude to keep the precision of the solvers.
+
+        Parameters
+        ----------
+        costs : ndarray
+            Costs of the valid pairs.
+
+        Returns
+        -------
+        float
+            Cost.
+
+        """
+        return 2 * np.sum(np.abs(costs)) + 1
+
+    @abc.abstractmethod
+    def solve(self, cost, valid):
+        """Find an optimal assignment.
+
+        Parameters
+        ----------
+        cost : ndarray
+            Cost matrix of shape (previous objects, current objects).
+        valid : ndarray
+            Boolean matrix of the valid pairs, the other costs are ignored.
+
+        Returns
+        -------
+        ndarray
+            Rows of the assigned pairs.
+        ndarray
+            Columns of the assigned pairs.
+
+        """
+        pass
+
+
+class ScipySolver(AssignmentSolver):
+    """Solve each assignment from scratch with scipy.optimize.linear_sum_assignment.
+
+    """
+
+    def solve(self, cost, valid):
+        """Find an optimal assignment.
+
+        Parameters
+        ----------
+        cost : ndarray
+            Cost matrix of shape (previous objects, current objects).
+        valid : ndarray
+            Boolean matrix of the valid pairs, the other costs are ignored.
+
+        Returns
+        -------
+        ndarray
+            Rows of the assigned pairs.
+        ndarray
+            Columns of the assigned pairs.
+
+        """
+        from scipy.optimize import linear_sum_assignment
+        row, col = linear_sum_assignment(cost)
+        is_valid = valid[row, col]
+        return row[is_valid], col[is_valid]
+
+
+class IncrementalSolver(AssignmentSolver):
+    """Start from the nearest neighbor matching and only repair its conflicts.
+
+    Between two images, each object is usually the nearest neighbor of its previous position, the matching of
+    each row with its cheapest valid column is the previous permutation and is optimal when no column is
+    taken twice. It is then returned without solving. Otherwise, this matching is the warm start of a
+    Jonker-Volgenant solver: the row duals are the row minima and only the rows left out by the conflicts are
+    inserted, each one with a shortest augmenting path. Each row can stay unassigned at a cost higher than any
+    assignment of the valid pairs, the result is exact. The solver is faster than linear_sum_assignment when the
+    conflicts are few, as in tracking, and slower on dense random problems.
+
+    """
+
+    def solve(self, cost, valid):
+        """Find an optimal assignment.
+
+        Parameters
+        ----------
+        cost : ndarray
+            Cost matrix of shape (previous objects, current objects).
+        valid : ndarray
+            Boolean matrix of the valid pairs, the other costs are ignored.
+
+        Returns
+        -------
+        ndarray
+            Rows of the assigned pairs.
+        ndarray
+            Columns of the assigned pairs.
+
+        """
+        n_rows, n_cols = cost.shape
+        if n_rows == 0 or n_cols == 0:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        masked = np.where(valid, cost, np.inf)
+        best = np.argmin(masked, axis=1)
+        row = np.flatnonzero(valid[np.arange(n_rows), best])
+        col = best[row]
+        if len(np.unique(col)) == len(col):
+            return row, col
+
+        # Rows start at their cheapest column with null reduced costs, rows without valid pair are left out
+        u = np.zeros(n_rows)
+        u[row] = masked[row, col]
+        v = np.zeros(n_cols)
+        col4row = np.full(n_rows, -1, dtype=np.intp)
+        row4col = np.full(n_cols, -1, dtype=np.intp)
+        __, first = np.unique(col, return_index=True)
+        col4row[row[first]] = col[first]
+        row4col[col[first]] = row[first]
+        forbidden = self.get_forbidden_cost(cost[valid])
+        for i in np.setdiff1d(row, row[first]):
+            self.augment(masked, u, v, col4row, row4col, i, forbidden)
+        assigned = (col4row >= 0) & (col4row < n_cols)
+        row = np.flatnonzero(assigned)
+        return row, col4row[row]
+
+    @staticmethod
+    def augment(cost, u, v, col4row, row4col, start, forbidden):
+        """Assign a row with a shortest augmenting path, the duals and the assignment are updated in place.
+
+        Each row i has its own extra column n_cols + i of cost forbidden, the row is unassigned when it takes it.
+        This column can only end a path, its dual stays null and it is not stored.
+
+        Parameters
+        ----------
+        cost : ndarray
+            Cost matrix, np.inf for the forbidden pairs.
+        u : ndarray
+            Row duals.
+        v : ndarray
+            Column duals.
+        col4row : ndarray
+            Column of each row, -1 if the row is unassigned.
+        row4col : ndarray
+            Row of each column, -1 if the column is unassigned.
+        start : int
+            Unassigned row.
+        forbidden : float
+            Cost of the extra columns.
+
+        """
+        n_cols = cost.shape[1]
+        distance = np.full(n_cols, np.inf)
+        path = np.full(n_cols, -1, dtype=np.intp)
+        remaining = np.ones(n_cols, dtype=bool)
+        rows = []
+        cols = []
+        extra = np.inf
+        i = start
+        minimum = 0.
+        while True:
+            rows.append(i)
+            reduced = minimum + cost[i] - u[i] - v
+            better = remaining & (reduced < distance)
+            distance[better] = reduced[better]
+            path[better] = i
+            if minimum + forbidden - u[i] < extra:
+                extra = minimum + forbidden - u[i]
+                extra_row = i
+            candidates = np.where(remaining, distance, np.inf)
+            j = int(np.argmin(candidates))
+            if extra <= candidates[j]:
+                # The path ends at the extra column of extra_row
+                minimum = extra
+                j = n_cols + extra_row
+                break
+            minimum = candidates[j]
+            remaining[j] = False
+            cols.append(j)
+            if row4col[j] == -1:
+                break
+            i = row4col[j]
+
+        u[start] += minimum
+        rows = np.asarray(rows[1:], dtype=np.intp)
+        u[rows] += minimum - distance[col4row[rows]]
+        cols = np.asarray(cols, dtype=np.intp)
+        v[cols] -= minimum - distance[cols]
+        while True:
+            i = path[j] if j < n_cols else j - n_cols
+            if j < n_cols:
+                row4col[j] = i
+            col4row[i], j = j, col4row[i]
+            if i == start:
+                break
@@ -0,0 +1,191 @@
+import numpy as np
+import cv2
+from .source import FrameSource
+
+
+class Background():
+    """Estimate the background of a recording from a sample of its images.
+
+    The sampled images are projected pixel by pixel with the minimum, the maximum, the mean or the median.
+    The minimum, the maximum and the mean are reduced image by image. The median keeps the sample in memory
+    and is computed by bands of rows to bound the temporary memory, by bisection on the bits of the values for
+    unsigned integer images. The background can then be updated with a running average to follow slow
+    illumination changes.
+
+    """
+
+    methods = ("min", "max", "mean", "median")
+
+    def __init__(self, method="median", memory=2**27):
+        """Initialize the estimator.
+
+        Parameters
+        ----------
+        method : str
+            Projection, "min", "max", "mean" or "median".
+        memory : int
+            Maximal size in bytes of the temporary arrays of the median.
+
+        """
+        if method not in self.methods:
+            raise ValueError("Unknown background method {}".format(method))
+        self.method = method
+        self.memory = memory
+        self.background = None
+        self.accumulator = None
+
+    @classmethod
+    def from_params(cls, params, **kwargs):
+        """Create the estimator corresponding to the FastTrack parameter methBack.
+
+        Parameters
+        ----------
+        params : dict
+            Parameters, methBack is 0 for the minimum, 1 for the maximum and 2 for the mean.
+        **kwargs
+            Arguments of Background.
+
+        Returns
+        -------
+        Background
+            Estimator.
+
+        """
+        return cls(("min", "max", "mean")[int(params["methBack"])], **kwargs)
+
+    def estimate(self, path, n=None, grayscale=True):
+        """Compute the background of a recording from n images evenly spaced.
+
+        As FastTrack, one image every length // n images is used starting from the first image.
+
+        Parameters
+        ----------
+        path : str or list
+            Images, see FrameSource.
+        n : int
+            Number of images, all the images if None.
+        grayscale : bool
+            Convert the images to GRAYSCALE when decoding.
+
+        Returns
+        -------
+        ndarray
+            Background.
+
+        """
+        step = 1
+        stop = None
+        if n:
+            step = max(FrameSource(path).get_length() // int(n), 1)
+            stop = step * int(n)
+        with FrameSource(path, grayscale=grayscale, stop=stop, step=step) as source:
+            return self.compute(source)
+
+    def compute(self, images):
+        """Compute the background of a sample of images.
+
+        Parameters
+        ----------
+        images : iterable
+            Images of the same shape and type.
+
+        Returns
+        -------
+        ndarray
+            Background, same shape and type than the images.
+
+        """
+        images = iter(images)
+        first = next(images, None)
+        if first is None:
+            raise ValueError("No image to compute the background")
+        if self.method == "median":
+            sample = [first]
+            sample.extend(images)
+            background = np.empty_like(first)
+            # Bands bound the temporary arrays, at most a stack of the band and its partially sorted copy
+            rows = max(self.memory // (2 * len(sample) * first[0].nbytes), 1)
+            for i in range(0, first.shape[0], rows):
+                band = [j[i:i + rows] for j in sample]
+                if first.dtype.kind == "u":
+                    lower = self.get_kth(band, (len(band) - 1) // 2)
+                    upper = self.get_kth(band, len(band) // 2) if len(
+                        band) % 2 == 0 else lower
+                    background[i:i + rows] = np.rint(
+                        (lower.astype(np.float64) + upper) / 2)
+                else:
+                    background[i:i + rows] = np.rint(
+                        np.median(np.stack(band), axis=0))
+        elif self.method == "mean":
+            accumulator = first.astype(np.float64)
+            n = 1
+            for image in images:
+                accumulator += image
+                n += 1
+            background = np.rint(accumulator / n).astype(first.dtype)
+        else:
+            reduce = np.minimum if self.method == "min" else np.maximum
+            background = first.copy()
+            for image in images:
+                reduce(background, image, out=background)
+        self.background = background
+        self.accumulator = None
+        return background
+
+    @staticmethod
+    def get_kth(images, k):
+        """Get the k-th smallest value of each pixel of unsigned integer images.
+
+        The value is found bit by bit from the most significant one, keeping a bit when less than k + 1
+        values are lower than the candidate. Each bit is one comparison of all the images, no sort is needed.
+
+        Parameters
+        ----------
+        images : list
+            Images of the same shape and unsigned integer type.
+        k : int
+            Rank of the value, 0 for the minimum.
+
+        Returns
+        -------
+        ndarray
+            k-th smallest value of each pixel.
+
+        """
+        dtype = images[0].dtype
+        kth = np.zeros(images[0].shape, dtype=dtype)
+        candidate = np.empty_like(kth)
+        less = np.empty(kth.shape, dtype=bool)
+        count = np.empty(kth.shape, dtype=np.uint8 if len(
+            images) < 256 else np.uint32)
+        for bit in range(8 * dtype.itemsize - 1, -1, -1):
+            np.bitwise_or(kth, dtype.type(1 << bit), out=candidate)
+            count[...] = 0
+            for image in images:
+                np.less(image, candidate, out=less)
+                np.add(count, less, out=count, casting="unsafe")
+            np.copyto(kth, candidate, where=count <= k)
+        return kth
+
+    def update(self, image, rate=0.01):
+        """Update the background with a running average.
+
+        Parameters
+        ----------
+        image : ndarray
+            New image, the first image initializes the background if it was not computed.
+        rate : float
+            Weight of the new image.
+
+        Returns
+        -------
+        ndarray
+            Updated background.
+
+        """
+        if self.accumulator is None:
+            self.accumulator = (
+                image if self.background is None else self.background).astype(np.float32)
+        cv2.accumulateWeighted(image, self.accumulator, rate)
+        self.background = np.rint(self.accumulator).astype(image.dtype)
+        return self.background
@@ -1,13 +1,19 @@
 import abc
 import numpy as np
 import cv2
+from .data import Detections
 
 
 class BaseDetector(metaclass=abc.ABCMeta):
     """Abstract class to implement an objects detector.
 
+    Set the attribute analytic to True to split the head and the tail from the pixel coordinates
+    projected on the major axis instead of rotating each mask.
+
     """
 
+    analytic = False
+
     @abc.abstractmethod
     def detect(self, image):
         """Abstract method to be implemented.
@@ -30,6 +36,25 @@ class BaseDetector(metaclass=abc.ABCMeta):
         """
         pass
 
+    def detect_batch(self, images):
+        """Detect objects in several images.
+
+        Reimplement this method when the detection is faster on batches of images,
+        the default implementation calls detect on each image.
+
+        Parameters
+        ----------
+        images : list
+            Full images.
+
+        Returns
+        -------
+        list
+            List of (mask, left_corner_coord) by image.
+
+        """
+        return [self.detect(i) for i in images]
+
     def process(self, image):
         """Process one image.
 
@@ -38,54 +63,119 @@ class BaseDetector(metaclass=abc.ABCMeta):
         image : ndarray
             The full image.
 
+        Returns
+        -------
+        Detections
+            Detected objects and their features.
+
+        """
+        return self.process_masks(self.detect(image))
+
+    def process_batch(self, images):
+        """Process several images, detected at once with detect_batch.
+
+        Parameters
+        ----------
+        images : list
+            Full images.
+
         Returns
         -------
         list
-            List of detected objects and their features.
+            Detections of each image.
+
+        """
+        return [self.process_masks(i) for i in self.detect_batch(images)]
+
+    def process_masks(self, masks):
+        """Compute the features of detected objects.
+
+        Parameters
+        ----------
+        masks : list
+            List of (mask, left_corner_coord), output of detect.
+
+        Returns
+        -------
+        Detections
+            Detected objects and their features.
 
         """
-        detections = []
-        for mask, coordinate in self.detect(image):
+        detections = Detections(size=len(masks))
+        if len(masks) == 0:
+            return detections
+        data = detections.data
+
+        coordinates = np.asarray([i[1] for i in masks], dtype=np.float64)
+        body_moments = [cv2.moments(i[0]) for i in masks]
+        body = self.get_features_batch(self.stack_moments(body_moments))
+        tail_moments = np.empty((len(masks), 6))
+        head_moments = np.empty((len(masks), 6))
+        tails = []
+        heads = []
+        body_centers = np.empty((len(masks), 2), dtype=np.intp)
+        rots = np.empty((len(masks), 2, 3))
+        is_left = np.empty(len(masks), dtype=bool)
+        if self.analytic:
+            # One buffer by frame for the tail halves
+            buffer = np.empty(np.max([i[0].shape for i in masks], axis=0), dtype=masks[0][0].dtype)
+        for index, (mask, __) in enumerate(masks):
             contours, _ = cv2.findContours(
                 mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            data = {"area": cv2.contourArea(
-                contours[0]), "perim": cv2.arcLength(contours[0], True)}
+            data["areaBody"][index] = cv2.contourArea(contours[0])
+            data["perimeterBody"][index] = cv2.arcLength(contours[0], True)
 
-            body = self.get_features(mask)
-            is_left, rotated_mask, rot = self.get_direction(mask, body)
+            features = {"orientation": body["orientation"][index]}
+            if self.analytic:
+                is_left[index], moments, rot = self.get_direction_analytic(
+                    mask, features, body_moments[index])
+            else:
+                is_left[index], rotated_mask, rot = self.get_direction(
+                    mask, features)
+            body["orientation"][index] = features["orientation"]
 
             body_center = np.intp(
-                rot @ np.asarray([body["center"][0], body["center"][1], 1]))
-            rot = cv2.invertAffineTransform(rot)
-
-            mask_tail = rotated_mask[:, body_center[0]::]
-            tail = self.get_features(mask_tail)
-            a = rot @ np.asarray(
-                [tail["center"][0] + body_center[0], tail["center"][1], 1])
-            tail["center"][0] = a[0] + coordinate[0]
-            tail["center"][1] = a[1] + coordinate[1]
-            tail["orientation"] = tail["orientation"] - \
-                np.pi * (tail["orientation"] > np.pi)
-            tail["orientation"] = self.modulo(
-                tail["orientation"] + body["orientation"] + np.pi * (np.abs(tail["orientation"]) > 0.5 * np.pi))
-
-            mask_head = rotated_mask[:, 0:body_center[0]]
-            head = self.get_features(mask_head)
-            a = rot @ np.asarray([head["center"][0], head["center"][1], 1])
-            head["center"][0] = a[0] + coordinate[0]
-            head["center"][1] = a[1] + coordinate[1]
-            head["orientation"] = head["orientation"] - \
-                np.pi * (head["orientation"] > np.pi)
-            head["orientation"] = self.modulo(
-                head["orientation"] + body["orientation"] + np.pi * (np.abs(head["orientation"]) > 0.5 * np.pi))
-
-            body["center"][0] += coordinate[0]
-            body["center"][1] += coordinate[1]
-
-            if is_left:
-                detections.append({"3": data, "2": body, "1": tail, "0": head})
+                rot @ np.asarray([body["x"][index], body["y"][index], 1]))
+            body_centers[index] = body_center
+            rots[index] = rot
+            if self.analytic:
+                head_moments[index], tail_moments[index] = self.get_halves_moments(
+                    mask, moments, rot, body_center[0], buffer)
             else:
-                detections.append({"3": data, "2": body, "0": tail, "1": head})
+                tails.append(rotated_mask[:, body_center[0]::])
+                heads.append(rotated_mask[:, 0:body_center[0]])
+        if not self.analytic:
+            tail_moments = self.get_moments(tails)
+            head_moments = self.get_moments(heads)
+
+        # Inverse of the rotations, [R | t] is inverted as [R.T | -R.T t]
+        rots = np.concatenate((np.transpose(rots[:, :, 0:2], (0, 2, 1)),
+                               -np.transpose(rots[:, :, 0:2], (0, 2, 1)) @ rots[:, :, 2:3]), axis=2)
+        tail = self.get_features_batch(tail_moments)
+        tail["x"] += body_centers[:, 0]
+        head = self.get_features_batch(head_moments)
+        for part in (tail, head):
+            x = rots[:, 0, 0] * part["x"] + \
+                rots[:, 0, 1] * part["y"] + rots[:, 0, 2]
+            y = rots[:, 1, 0] * part["x"] + \
+                rots[:, 1, 1] * part["y"] + rots[:, 1, 2]
+            part["x"] = x + coordinates[:, 0]
+            part["y"] = y + coordinates[:, 1]
+            part["orientation"] = part["orientation"] - \
+                np.pi * (part["orientation"] > np.pi)
+            part["orientation"] = self.modulo(
+                part["orientation"] + body["orientation"] + np.pi * (np.abs(part["orientation"]) > 0.5 * np.pi))
+        body["x"] += coordinates[:, 0]
+        body["y"] += coordinates[:, 1]
+
+        head, tail = ({key: np.where(is_left, head[key], tail[key]) for key in head},
+                      {key: np.where(is_left, tail[key], head[key]) for key in head})
+        for name, part in (("Head", head), ("Tail", tail), ("Body", body)):
+            data["x" + name] = part["x"]
+            data["y" + name] = part["y"]
+            data["t" + name] = part["orientation"]
+            data[name.lower() + "MajorAxisLength"] = part["major_axis"]
+            data[name.lower() + "MinorAxisLength"] = part["minor_axis"]
         return detections
 
     def get_features(self, mask):
@@ -98,31 +188,84 @@ class BaseDetector(metaclass=abc.ABCMeta):
             Mask of one object.
 
         """
-        moments = cv2.moments(mask)
+        features = self.get_features_batch(self.get_moments([mask]))
+        return {"center": [float(features["x"][0]), float(features["y"][0])], "orientation": features["orientation"][0],
+                "major_axis": features["major_axis"][0], "minor_axis": features["minor_axis"][0]}
+
+    @staticmethod
+    def get_moments(masks):
+        """Get the moments needed to compute the features of several masks.
 
-        x = moments["m10"] / moments["m00"]
-        y = moments["m01"] / moments["m00"]
 
-        i = moments["mu20"]
-        j = moments["mu11"]
-        k = moments["mu02"]
+        Parameters
+        ----------
+        masks : list
+            List of masks, one object by mask.
+
+        Returns
+        -------
+        ndarray
+            Array of shape (len(masks), 6) with m00, m10, m01, mu20, mu11, mu02 by mask.
+
+        """
+        # One cv2.moments call by mask is faster than per-label sums of a labeled image in NumPy
+        return BaseDetector.stack_moments([cv2.moments(i) for i in masks])
+
+    @staticmethod
+    def stack_moments(moments):
+        """Stack the moments needed to compute the features of several masks.
+
+
+        Parameters
+        ----------
+        moments : list
+            List of moments, output of cv2.moments.
+
+        Returns
+        -------
+        ndarray
+            Array of shape (len(moments), 6) with m00, m10, m01, mu20, mu11, mu02 by mask.
+
+        """
+        return np.asarray([(i["m00"], i["m10"], i["m01"], i["mu20"], i["mu11"], i["mu02"]) for i in moments],
+                          dtype=np.float64).reshape(len(moments), 6)
+
+    @staticmethod
+    def get_features_batch(moments):
+        """Get the features of several objects using equivalent ellipse.
+
+        All the objects are computed at once as array operations.
+
+
+        Parameters
+        ----------
+        moments : ndarray
+            Array of shape (n, 6) with m00, m10, m01, mu20, mu11, mu02 by object.
+
+        Returns
+        -------
+        dict
+            Arrays of x, y, orientation, major_axis and minor_axis.
+
+        """
+        m00, m10, m01, i, j, k = moments.T
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x = m10 / m00
+            y = m01 / m00
 
-        if i + j - k != 0:
             orientation = (0.5 * np.arctan((2 * j) / (i - k)) +
                            (i < k) * (np.pi * 0.5))
             orientation += 2 * np.pi * (orientation < 0)
-            orientation = (2 * np.pi - orientation)
-        else:
-            orientation = 0
+            orientation = np.where(i + j - k != 0, 2 * np.pi - orientation, 0)
 
-        maj_axis = 2 * \
-            np.sqrt((((i + k) + np.sqrt((i - k) * (i - k) + 4 * j * j))
-                    * 0.5) / moments["m00"])
-        min_axis = 2 * \
-            np.sqrt((((i + k) - np.sqrt((i - k) * (i - k) + 4 * j * j))
-                    * 0.5) / moments["m00"])
+            maj_axis = 2 * \
+                np.sqrt((((i + k) + np.sqrt((i - k) * (i - k) + 4 * j * j))
+                        * 0.5) / m00)
+            min_axis = 2 * \
+                np.sqrt((((i + k) - np.sqrt((i - k) * (i - k) + 4 * j * j))
+                        * 0.5) / m00)
 
-        return {"center": [x, y], "orientation": orientation, "major_axis": maj_axis, "minor_axis": min_axis}
+        return {"x": x, "y": y, "orientation": orientation, "major_axis": maj_axis, "minor_axis": min_axis}
 
     @staticmethod
     def modulo(angle):
@@ -165,19 +308,15 @@ class BaseDetector(metaclass=abc.ABCMeta):
             Rotation matrix.
 
         """
-        rot = cv2.getRotationMatrix2D(center=(
-            mask.shape[1]/2, mask.shape[0]/2), angle=-(features["orientation"]*180)/np.pi, scale=1)
-        new_size = [mask.shape[0]*np.abs(rot[0, 1]) + mask.shape[1]*np.abs(rot[0, 0]),
-                    mask.shape[0]*np.abs(rot[0, 0]) + mask.shape[1]*np.abs(rot[0, 1])]
-        rot[0, 2] += new_size[0]/2 - mask.shape[1]/2
-        rot[1, 2] += new_size[1]/2 - mask.shape[0]/2
+        rot, new_size = self.get_rotation(mask, features)
         rotated_mask = cv2.warpAffine(mask, rot, np.intp(new_size))
         dist = np.sum(rotated_mask, axis=0, dtype=np.float64)
-        dist /= np.sum(dist)
+        # Raw moments of order 0 to 3 of the column distribution in one product
         indexes = np.arange(1, len(dist)+1, dtype=np.float64)
-        mean = np.sum(indexes*dist)
-        sd = np.sqrt(np.sum((indexes-mean)**2*dist))
-        skew = (np.sum(indexes**3*dist) -
+        total, mean, square, cube = np.vander(indexes, 4, increasing=True).T @ dist
+        mean /= total
+        sd = np.sqrt(square / total - mean**2)
+        skew = (cube / total -
                 3 * mean * sd**2 - mean**3) / sd**3
         if skew > 0:
             features["orientation"] = self.modulo(
@@ -185,3 +324,135 @@ class BaseDetector(metaclass=abc.ABCMeta):
             return True, rotated_mask, rot
         else:
             return False, rotated_mask, rot
+
+    def get_direction_analytic(self, mask, features, moments=None):
+        """Get the object direction without rotating the mask.
+
+        The skewness along the major axis is computed from the third order moments of the mask
+        projected in the frame used by get_direction.
+        The object orientation is updated with the correct direction.
+
+
+        Parameters
+        ----------
+        mask : ndarray
+            Mask of one object.
+        features : dict
+            Object features.
+        moments : dict
+            Moments of the mask, output of cv2.moments. Computed if None.
+
+        Returns
+        -------
+        bool
+            Is object left oriented.
+        dict
+            Moments of the mask.
+        ndarray
+            Rotation matrix.
+
+        """
+        rot, __ = self.get_rotation(mask, features)
+        if moments is None:
+            moments = cv2.moments(mask)
+        a, b = rot[0, 0], rot[0, 1]
+        variance = a * a * moments["mu20"] + 2 * a * b * \
+            moments["mu11"] + b * b * moments["mu02"]
+        third = a**3 * moments["mu30"] + 3 * a * a * b * moments["mu21"] + \
+            3 * a * b * b * moments["mu12"] + b**3 * moments["mu03"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            skew = (third / moments["m00"]) / \
+                np.power(variance / moments["m00"], 1.5)
+        if skew > 0:
+            features["orientation"] = self.modulo(
+                features["orientation"] - np.pi)
+            return True, moments, rot
+        else:
+            return False, moments, rot
+
+    @staticmethod
+    def get_halves_moments(mask, moments, rot, split, buffer=None):
+        """Get the moments of the head and the tail without rotating the mask.
+
+        The mask is cut by the line x = split of the rotated frame, the moments of each half
+        are computed in the original frame and transformed in the rotated frame.
+
+
+        Parameters
+        ----------
+        mask : ndarray
+            Mask of one object.
+        moments : dict
+            Moments of the mask.
+        rot : ndarray
+            Rotation matrix.
+        split : int
+            Column of the rotated frame where the object is cut, the tail is on the right.
+        buffer : ndarray
+            Buffer at least as large as the mask and of the same type, used instead of a copy of the mask.
+
+        Returns
+        -------
+        ndarray
+            Array of shape (6,) with m00, m10, m01, mu20, mu11, mu02 of the head in the rotated frame.
+        ndarray
+            Array of shape (6,) with m00, m10, m01, mu20, mu11, mu02 of the tail in the rotated frame,
+            x starting at split.
+
+        """
+        # Remove the head, pixels with x < split - 0.5 in the rotated frame. fillConvexPoly
+        # also fills the pixels crossed by the edge, the edge is set half a pixel before.
+        inverse = cv2.invertAffineTransform(rot)
+        size = mask.shape[0] + mask.shape[1]
+        corners = np.asarray([[split - 1 - 2 * size, -2 * size, 1], [split - 1, -2 * size, 1],
+                              [split - 1, 2 * size, 1], [split - 1 - 2 * size, 2 * size, 1]])
+        polygon = np.int32(np.round((corners @ inverse.T) * 256))
+        if buffer is None or buffer.dtype != mask.dtype:
+            tail_mask = mask.copy()
+        else:
+            tail_mask = buffer[0:mask.shape[0], 0:mask.shape[1]]
+            tail_mask[...] = mask
+        cv2.fillConvexPoly(tail_mask, polygon, 0, cv2.LINE_8, 8)
+        tail = cv2.moments(tail_mask)
+
+        halves = []
+        for half, offset in ((tail, split), ({key: moments[key] - tail[key] for key in ("m00", "m10", "m01", "m20", "m11", "m02")}, 0)):
+            if half["m00"] == 0:
+                halves.append(np.zeros(6))
+                continue
+            center = np.asarray([half["m10"], half["m01"]]) / half["m00"]
+            covariance = np.asarray([[half["m20"] - half["m10"] * center[0], half["m11"] - half["m10"] * center[1]],
+                                     [half["m11"] - half["m10"] * center[1], half["m02"] - half["m01"] * center[1]]])
+            center = rot[:, 0:2] @ center + rot[:, 2]
+            covariance = rot[:, 0:2] @ covariance @ rot[:, 0:2].T
+            halves.append(np.asarray([half["m00"], half["m00"] * (center[0] - offset), half["m00"] * center[1],
+                                      covariance[0, 0], covariance[0, 1], covariance[1, 1]]))
+        return halves[1], halves[0]
+
+    @staticmethod
+    def get_rotation(mask, features):
+        """Get the rotation that aligns the object major axis with the x axis.
+
+
+        Parameters
+        ----------
+        mask : ndarray
+            Mask of one object.
+        features : dict
+            Object features.
+
+        Returns
+        -------
+        ndarray
+            Rotation matrix.
+        list
+            Size of the rotated image that contains the whole mask.
+
+        """
+        rot = cv2.getRotationMatrix2D(center=(
+            mask.shape[1]/2, mask.shape[0]/2), angle=-(features["orientation"]*180)/np.pi, scale=1)
+        new_size = [mask.shape[0]*np.abs(rot[0, 1]) + mask.shape[1]*np.abs(rot[0, 0]),
+                    mask.shape[0]*np.abs(rot[0, 0]) + mask.shape[1]*np.abs(rot[0, 1])]
+        rot[0, 2] += new_size[0]/2 - mask.shape[1]/2
+        rot[1, 2] += new_size[1]/2 - mask.shape[0]/2
+        return rot, new_size
@@ -0,0 +1,281 @@
+import concurrent.futures
+import multiprocessing
+import os
+import queue
+import time
+import cv2
+import toml
+from .background import Background
+from .data import Configuration, Result
+from .ft_detector import FtDetector
+from .source import FrameSource
+from .tracker import Tracker
+
+_queue = None
+_backgrounds = {}
+
+
+def _set_queue(progress):
+    """Set the progress queue of a worker process.
+
+    Parameters
+    ----------
+    progress : multiprocessing.Queue
+        Queue of (job index, images done, images total).
+
+    """
+    global _queue
+    _queue = progress
+
+
+def _get_background(path):
+    """Get a background image, loaded once by process.
+
+    Parameters
+    ----------
+    path : str
+        Background image.
+
+    Returns
+    -------
+    ndarray
+        Background as GRAYSCALE.
+
+    """
+    if path not in _backgrounds:
+        background = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if background is None:
+            raise IOError("Cannot read background {}".format(path))
+        _backgrounds[path] = background
+    return _backgrounds[path]
+
+
+def _run_job(job, report, interval):
+    """Track one job, the errors are returned in the summary.
+
+    Parameters
+    ----------
+    job : dict
+        Job with name, path, params, background and output.
+    report : callable
+        Called with (images done, images total).
+    interval : int
+        Number of images between two reports.
+
+    Returns
+    -------
+    dict
+        Summary with name, images tracked, time in seconds and error, None if the job succeeded.
+
+    """
+    start = time.perf_counter()
+    done = 0
+    try:
+        detector = FtDetector(job["params"])
+        if job["background"] is None:
+            detector.set_background(Background.from_params(
+                job["params"]).estimate(job["path"], job["params"]["nBack"]))
+        else:
+            detector.set_background(_get_background(job["background"]))
+        tracker = Tracker(job["params"], detector)
+        source = FrameSource(job["path"], grayscale=True)
+        total = source.get_length()
+        report(done, total)
+        with source, Result(job["output"], buffer_size=interval) as result:
+            for dat in tracker.run(source):
+                result.add_data(dat)
+                done += 1
+                if done % interval == 0:
+                    report(done, total)
+        report(done, total)
+        error = None
+    except Exception as e:
+        error = e
+    return {"name": job["name"], "images": done, "time": time.perf_counter() - start, "error": error}
+
+
+def _run_worker_job(index, job, interval):
+    """Track one job in a worker process, the progress is sent in the progress queue.
+
+    Parameters
+    ----------
+    index : int
+        Job index.
+    job : dict
+        Job with path, params, background and output.
+    interval : int
+        Number of images between two reports.
+
+    Returns
+    -------
+    dict
+        Summary of the job.
+
+    """
+    return _run_job(job, lambda done, total: _queue.put((index, done, total)), interval)
+
+
+class BatchRunner():
+    """Run FastTrack tracking jobs in a pool of processes.
+
+    A job is a recording with its configuration and its background, the result is written in the
+    Tracking_Result folder of its output folder. Jobs are tracked in parallel, one job by worker,
+    configurations are read once and backgrounds are loaded once by worker.
+
+    """
+
+    def __init__(self, jobs, workers=None, progress=None, interval=100):
+        """Initialize the runner.
+
+        Parameters
+        ----------
+        jobs : str or list
+            Manifest file or list of jobs. A job is a dict with the keys path (see FrameSource), config
+            (cfg.toml or database), and optionally background (estimated with nBack and methBack if missing),
+            output (default to the folder of the images) and name.
+        workers : int
+            Number of worker processes, os.cpu_count() if None. 0 to run the jobs in the calling process.
+        progress : callable
+            Called with (job name, images done, images total) when a job progresses.
+        interval : int
+            Number of images between two progress reports, also the number of images buffered by Result.
+
+        """
+        if isinstance(jobs, str):
+            jobs = self.read_manifest(jobs)
+        self.workers = os.cpu_count() if workers is None else workers
+        self.callback = progress
+        self.interval = interval
+        self.configs = {}
+        self.jobs = [self.get_job(i) for i in jobs]
+        self.progress = {i["name"]: (0, None) for i in self.jobs}
+
+    @staticmethod
+    def read_manifest(path):
+        """Read a manifest of jobs.
+
+        The manifest is a toml file with one [[job]] table by job, relative paths are relative to the manifest folder.
+
+        Parameters
+        ----------
+        path : str
+            Manifest file.
+
+        Returns
+        -------
+        list
+            Jobs.
+
+        """
+        folder = os.path.dirname(os.path.abspath(path))
+        jobs = toml.load(path).get("job", [])
+        for job in jobs:
+            for key in ("path", "config", "background", "output"):
+                if isinstance(job.get(key), list):
+                    job[key] = [os.path.join(folder, i) for i in job[key]]
+                elif key in job:
+                    job[key] = os.path.join(folder, job[key])
+        return jobs
+
+    def get_params(self, path):
+        """Get the parameters of a configuration, read once by path.
+
+        Parameters
+        ----------
+        path : str
+            cfg.toml file or database with a parameter table.
+
+        Returns
+        -------
+        dict
+            Parameters.
+
+        """
+        path = os.path.abspath(path)
+        if path not in self.configs:
+            config = Configuration()
+            if path.endswith(".toml"):
+                params = config.read_toml(path)
+            else:
+                params = config.read_db(path)
+            if params is None:
+                raise ValueError("Cannot read configuration {}".format(path))
+            self.configs[path] = params
+        return self.configs[path]
+
+    def get_job(self, job):
+        """Complete a job.
+
+        Parameters
+        ----------
+        job : dict
+            Job as described in the manifest.
+
+        Returns
+        -------
+        dict
+            Job with name, path, params, background and output.
+
+        """
+        path = job["path"]
+        if "output" in job:
+            output = job["output"]
+        elif not isinstance(path, (list, tuple)) and os.path.isdir(path):
+            output = path
+        else:
+            output = os.path.dirname(
+                path[0] if isinstance(path, (list, tuple)) else path)
+        return {"name": job.get("name", str(path)), "path": path, "params": self.get_params(job["config"]),
+                "background": os.path.abspath(job["background"]) if "background" in job else None, "output": output}
+
+    def report(self, index, done, total):
+        """Record the progress of a job.
+
+        Parameters
+        ----------
+        index : int
+            Job index.
+        done : int
+            Number of images tracked.
+        total : int
+            Number of images of the job.
+
+        """
+        name = self.jobs[index]["name"]
+        self.progress[name] = (done, total)
+        if self.callback is not None:
+            self.callback(name, done, total)
+
+    def run(self):
+        """Run the jobs.
+
+        A job that fails does not stop the others, its error is returned in its summary.
+
+        Returns
+        -------
+        list
+            Summary of each job, a dict with name, images, time in seconds and error (None if the job succeeded).
+
+        """
+        if self.workers == 0:
+            return [_run_job(job, lambda done, total, index=index: self.report(index, done, total), self.interval)
+                    for index, job in enumerate(self.jobs)]
+
+        progress = multiprocessing.Queue()
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.workers, initializer=_set_queue,
+                                                    initargs=(progress,)) as executor:
+            futures = [executor.submit(_run_worker_job, index, job, self.interval)
+                       for index, job in enumerate(self.jobs)]
+            while not all(i.done() for i in futures):
+                try:
+                    self.report(*progress.get(timeout=0.1))
+                except queue.Empty:
+                    pass
+        # Workers have exited, the remaining reports are all in the queue
+        while True:
+            try:
+                self.report(*progress.get(timeout=0.1))
+            except queue.Empty:
+                break
+        progress.close()
+        return [i.result() for i in futures]
@@ -1,7 +1,13 @@
 import toml
+import abc
 import sqlite3
+import atexit
+import queue
+import threading
 import pathlib
 import os
+import re
+import time
 import numpy as np
 
 
@@ -105,48 +111,225 @@ class Configuration():
         return [self.params["parameters"][key] for key in keys]
 
 
-class Result():
-    """Class to write result files compatible with FastTrack.
+class Detections():
+    """Frame-level container of detected objects.
+
+    The objects are stored in a structured array, one row by object and one column
+    by feature, named after the columns of the FastTrack tracking table.
+    Indexing with an integer returns a dict with 4 keys "0", "1", "2", "3" for backward compatibility.
+    0,1,2 is the {center, orientation, major_axis, minor_axis} of the head, tail and body respectively.
+    3 is {area, perim, time, id} of the object. This dict is a copy, modifying it will not modify the container.
 
     """
 
-    def add_data(self, dat):
-        """Append data in the database.
+    dtype = np.dtype([("xHead", np.float64), ("yHead", np.float64), ("tHead", np.float64),
+                      ("xTail", np.float64), ("yTail", np.float64), ("tTail", np.float64),
+                      ("xBody", np.float64), ("yBody", np.float64), ("tBody", np.float64),
+                      ("areaBody", np.float64), ("perimeterBody", np.float64),
+                      ("headMajorAxisLength", np.float64), ("headMinorAxisLength", np.float64),
+                      ("tailMajorAxisLength", np.float64), ("tailMinorAxisLength", np.float64),
+                      ("bodyMajorAxisLength", np.float64), ("bodyMinorAxisLength", np.float64),
+                      ("imageNumber", np.int64), ("id", np.int64)])
 
-            Parameters
-            ----------
-            dat : dict or list of dicts
-                Data.
+    keys = {"0": {"center": ("xHead", "yHead"), "orientation": "tHead",
+                  "major_axis": "headMajorAxisLength", "minor_axis": "headMinorAxisLength"},
+            "1": {"center": ("xTail", "yTail"), "orientation": "tTail",
+                  "major_axis": "tailMajorAxisLength", "minor_axis": "tailMinorAxisLength"},
+            "2": {"center": ("xBody", "yBody"), "orientation": "tBody",
+                  "major_axis": "bodyMajorAxisLength", "minor_axis": "bodyMinorAxisLength"},
+            "3": {"area": "areaBody", "perim": "perimeterBody", "time": "imageNumber", "id": "id"}}
+
+    def __init__(self, data=None, size=0):
+        """Initialize the container.
+
+        Parameters
+        ----------
+        data : ndarray
+            Structured array with Detections.dtype. If None, a zeroed array of size objects is allocated.
+        size : int
+            Number of objects.
 
         """
-        cursor = self.cnx.cursor()
-        if not isinstance(dat, list):
-            dat = [dat]
-        for data in dat:
-            cursor.execute("INSERT INTO tracking (xHead, yHead, tHead, xTail, yTail, tTail, xBody, yBody, tBody, curvature, areaBody,"
-                           "perimeterBody, headMajorAxisLength, headMinorAxisLength, headExcentricity, tailMajorAxisLength,"
-                           "tailMinorAxisLength, tailExcentricity, bodyMajorAxisLength, bodyMinorAxisLength, bodyExcentricity,"
-                           "imageNumber, id) VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) ",
-                           (data["0"]["center"][0], data["0"]["center"][1], data["0"]["orientation"],
-                            data["1"]["center"][0], data["1"]["center"][1], data["1"]["orientation"],
-                            data["2"]["center"][0], data["2"]["center"][1], data["2"]["orientation"],
-                            0, data["3"]["area"], data["3"]["perim"],
-                            data["0"]["major_axis"], data["0"]["minor_axis"], np.sqrt(
-                               1-(data["0"]["minor_axis"]/data["0"]["major_axis"])**2),
-                            data["1"]["major_axis"], data["1"]["minor_axis"], np.sqrt(
-                               1-(data["1"]["minor_axis"]/data["1"]["major_axis"])**2),
-                            data["2"]["major_axis"], data["2"]["minor_axis"], np.sqrt(
-                               1-(data["2"]["minor_axis"]/data["2"]["major_axis"])**2),
-                            data["3"]["time"], data["3"]["id"]))
-        self.cnx.commit()
-        cursor.close()
+        if data is None:
+            data = np.zeros(size, dtype=self.dtype)
+        self.data = data
 
-    def __init__(self, path):
-        path = os.path.abspath(path + "/Tracking_Result/")
-        os.makedirs(path)
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        for i in range(len(self.data)):
+            yield self[i]
+
+    def __getitem__(self, index):
+        """Get one object as dict or a subset of objects.
+
+        Parameters
+        ----------
+        index : int, slice or ndarray
+            Integer to get one object, slice, boolean or integer array to get a subset.
+
+        Returns
+        -------
+        dict or Detections
+            Object as dict if index is an integer, Detections otherwise.
+
+        """
+        if isinstance(index, (int, np.integer)):
+            row = self.data[index]
+            dat = dict()
+            for key, fields in self.keys.items():
+                dat[key] = {name: [float(row[field[0]]), float(row[field[1]])] if name == "center" else row[field]
+                            for name, field in fields.items()}
+            return dat
+        return Detections(self.data[index])
+
+    def __repr__(self):
+        return "Detections({})".format(len(self.data))
+
+    @classmethod
+    def from_dicts(cls, dicts):
+        """Build the container from a list of dict.
+
+        Missing keys are set to zero.
+
+        Parameters
+        ----------
+        dicts : list
+            List of dict. Each dict is one object with 4 key "0", "1", "2", "3".
+
+        Returns
+        -------
+        Detections
+            Container.
+
+        """
+        detections = cls(size=len(dicts))
+        for i, dat in enumerate(dicts):
+            for key, fields in cls.keys.items():
+                if key not in dat:
+                    continue
+                for name, field in fields.items():
+                    if name not in dat[key]:
+                        continue
+                    if name == "center":
+                        detections.data[field[0]][i] = dat[key][name][0]
+                        detections.data[field[1]][i] = dat[key][name][1]
+                    else:
+                        detections.data[field][i] = dat[key][name]
+        return detections
+
+    def to_dicts(self):
+        """Convert the container to a list of dict.
+
+        Returns
+        -------
+        list
+            List of dict. Each dict is one object with 4 key "0", "1", "2", "3".
+
+        """
+        return list(self)
+
+
+class ResultBackend(metaclass=abc.ABCMeta):
+    """Abstract class to implement a storage of the tracking table.
+
+    """
+
+    columns = ("xHead", "yHead", "tHead", "xTail", "yTail", "tTail", "xBody", "yBody", "tBody", "curvature", "areaBody",
+               "perimeterBody", "headMajorAxisLength", "headMinorAxisLength", "headExcentricity", "tailMajorAxisLength",
+               "tailMinorAxisLength", "tailExcentricity", "bodyMajorAxisLength", "bodyMinorAxisLength", "bodyExcentricity",
+               "imageNumber", "id")
+
+    @abc.abstractmethod
+    def __init__(self, path, resume=False):
+        """Create the storage.
+
+        Parameters
+        ----------
+        path : str
+            Tracking_Result folder.
+        resume : bool
+            Reopen an existing storage instead of creating it.
+
+        """
+        pass
+
+    @abc.abstractmethod
+    def write(self, columns):
+        """Append rows to the tracking table.
+
+        Parameters
+        ----------
+        columns : dict
+            Arrays of the same length by column name, in the columns order.
+
+        """
+        pass
+
+    @abc.abstractmethod
+    def close(self):
+        """Close the storage.
+
+        """
+        pass
+
+    @abc.abstractmethod
+    def truncate(self, image):
+        """Delete the rows from an image number, used to resume a tracking.
+
+        Parameters
+        ----------
+        image : int
+            First image number deleted.
+
+        """
+        pass
+
+    @classmethod
+    @abc.abstractmethod
+    def read(cls, path, columns=None):
+        """Read the tracking table.
+
+        Parameters
+        ----------
+        path : str
+            Tracking_Result folder.
+        columns : list
+            Columns to read, all if None.
+
+        Returns
+        -------
+        dict
+            Arrays by column name.
+
+        """
+        pass
+
+
+class SqliteBackend(ResultBackend):
+    """Write the tracking table in the tracking.db database compatible with FastTrack.
+
+    The database is written in WAL mode and converted back to a standard rollback journal database when closed.
+
+    """
+
+    def __init__(self, path, resume=False):
+        """Create the database.
+
+        Parameters
+        ----------
+        path : str
+            Tracking_Result folder.
+        resume : bool
+            Reopen an existing database instead of creating it.
+
+        """
         self.cnx = sqlite3.connect(path + "/tracking.db")
+        self.cnx.execute("PRAGMA journal_mode=WAL")
+        self.cnx.execute("PRAGMA synchronous=NORMAL")
         cursor = self.cnx.cursor()
-        cursor.execute("CREATE TABLE tracking ( xHead REAL, yHead REAL, tHead REAL, xTail REAL,"
+        cursor.execute("CREATE TABLE IF NOT EXISTS tracking ( xHead REAL, yHead REAL, tHead REAL, xTail REAL,"
                        "yTail REAL, tTail REAL, xBody REAL, yBody REAL, tBody REAL,"
                        "curvature REAL, areaBody REAL, perimeterBody REAL,"
                        "headMajorAxisLength REAL, headMinorAxisLength REAL,"
@@ -156,5 +339,815 @@ class Result():
         self.cnx.commit()
         cursor.close()
 
+    def write(self, columns):
+        """Append rows to the tracking table in one transaction.
+
+        Parameters
+        ----------
+        columns : dict
+            Arrays of the same length by column name, in the columns order.
+
+        """
+        with self.cnx:
+            self.cnx.executemany("INSERT INTO tracking ({}) VALUES({})".format(", ".join(self.columns), ", ".join("?" * len(self.columns))),
+                                 zip(*[columns[i].tolist() for i in self.columns]))
+
+    def truncate(self, image):
+        """Delete the rows from an image number, used to resume a tracking.
+
+        Parameters
+        ----------
+        image : int
+            First image number deleted.
+
+        """
+        with self.cnx:
+            self.cnx.execute(
+                "DELETE FROM tracking WHERE imageNumber >= ?", (int(image),))
+
+    def close(self):
+        """Close the database.
+
+        """
+        if self.cnx is not None:
+            try:
+                self.cnx.execute("PRAGMA journal_mode=DELETE")
+            finally:
+                self.cnx.close()
+                self.cnx = None
+
+    @classmethod
+    def read(cls, path, columns=None):
+        """Read the tracking table.
+
+        Parameters
+        ----------
+        path : str
+            Tracking_Result folder.
+        columns : list
+            Columns to read, all if None.
+
+        Returns
+        -------
+        dict
+            Arrays by column name.
+
+        """
+        columns = cls.columns if columns is None else columns
+        for i in columns:
+            if i not in cls.columns:
+                raise KeyError(i)
+        cnx = sqlite3.connect(os.path.join(path, "tracking.db"))
+        try:
+            rows = cnx.execute("SELECT {} FROM tracking".format(
+                ", ".join(columns))).fetchall()
+        finally:
+            cnx.close()
+        values = list(zip(*rows)) if rows else [()] * len(columns)
+        return {i: np.asarray(j, dtype=np.int64 if i in ("imageNumber", "id") else np.float64)
+                for i, j in zip(columns, values)}
+
+
+class NpzBackend(ResultBackend):
+    """Write the tracking table as columnar chunks in the tracking folder.
+
+    Each write is one row-group saved as an uncompressed npz file with one array by column.
+    Chunks are written under a temporary name and renamed when complete, other files of the folder are ignored.
+    Chunks are read back with NpzBackend.read or one by one with NpzBackend.iter_chunks.
+
+    """
+
+    pattern = re.compile(r"chunk_(\d+)\.npz")
+
+    def __init__(self, path, resume=False):
+        """Create the tracking folder.
+
+        Parameters
+        ----------
+        path : str
+            Tracking_Result folder.
+        resume : bool
+            Append chunks to an existing tracking folder instead of creating it.
+
+        """
+        self.path = path + "/tracking/"
+        os.makedirs(self.path, exist_ok=resume)
+        self.chunk = self.get_next_chunk()
+
+    def write(self, columns):
+        """Write a row-group.
+
+        Parameters
+        ----------
+        columns : dict
+            Arrays of the same length by column name, in the columns order.
+
+        """
+        self.save(self.path + "chunk_{:06d}.npz".format(self.chunk), columns)
+        self.chunk += 1
+
+    def close(self):
+        """Nothing to close, each chunk is written entirely.
+
+        """
+        pass
+
+    @staticmethod
+    def save(path, columns):
+        """Save a chunk atomically, a partially written chunk is never read.
+
+        Parameters
+        ----------
+        path : str
+            Chunk path.
+        columns : dict
+            Arrays by column name.
+
+        """
+        with open(path + ".tmp", "wb") as f:
+            np.savez(f, **columns)
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def get_chunks(cls, path):
+        """Get the chunk files in the writing order.
+
+        Parameters
+        ----------
+        path : str
+            Tracking folder.
+
+        Returns
+        -------
+        list
+            Chunk paths.
+
+        """
+        chunks = [(int(i.group(1)), i.group(0)) for i in map(
+            cls.pattern.fullmatch, os.listdir(path)) if i is not None]
+        return [os.path.join(path, i) for __, i in sorted(chunks)]
+
+    def get_next_chunk(self):
+        """Get the number of the next chunk, following the last existing chunk.
+
+        Returns
+        -------
+        int
+            Chunk number.
+
+        """
+        chunks = self.get_chunks(self.path)
+        return int(self.pattern.fullmatch(os.path.basename(chunks[-1])).group(1)) + 1 if chunks else 0
+
+    def truncate(self, image):
+        """Delete the rows from an image number, used to resume a tracking.
+
+        Only the chunks containing deleted rows are rewritten.
+
+        Parameters
+        ----------
+        image : int
+            First image number deleted.
+
+        """
+        for i in self.get_chunks(self.path):
+            with np.load(i) as chunk:
+                keep = chunk["imageNumber"] < image
+                if np.all(keep):
+                    continue
+                columns = {j: chunk[j][keep] for j in chunk.files}
+            if np.any(keep):
+                self.save(i, columns)
+            else:
+                os.remove(i)
+        self.chunk = self.get_next_chunk()
+
+    @classmethod
+    def iter_chunks(cls, path, columns=None):
+        """Iterate over the chunks of the tracking table, only one chunk is loaded at a time.
+
+        Parameters
+        ----------
+        path : str
+            Tracking_Result folder.
+        columns : list
+            Columns to read, all if None.
+
+        Yields
+        ------
+        dict
+            Arrays by column name of one chunk.
+
+        """
+        columns = cls.columns if columns is None else columns
+        for i in cls.get_chunks(os.path.join(path, "tracking")):
+            with np.load(i) as chunk:
+                yield {j: chunk[j] for j in columns}
+
+    @classmethod
+    def read(cls, path, columns=None):
+        """Read the tracking table.
+
+        Parameters
+        ----------
+        path : str
+            Tracking_Result folder.
+        columns : list
+            Columns to read, all if None.
+
+        Returns
+        -------
+        dict
+            Arrays by column name.
+
+        """
+        columns = cls.columns if columns is None else columns
+        chunks = list(cls.iter_chunks(path, columns))
+        return {i: np.concatenate([j[i] for j in chunks]) if chunks else np.empty(0) for i in columns}
+
+
+class Result():
+    """Class to write result files compatible with FastTrack.
+
+    Rows are buffered in memory and written in one transaction every buffer_size images
+    or every flush_interval seconds. The storage is a ResultBackend, by default the
+    tracking.db database compatible with FastTrack. An existing result can be resumed
+    from a Tracker checkpoint.
+
+    """
+
+    columns = ResultBackend.columns
+
+    def add_data(self, dat):
+        """Append data in the database.
+
+            Parameters
+            ----------
+            dat : Detections, dict or list of dicts
+                Data.
+
+        """
+        if isinstance(dat, dict):
+            dat = [dat]
+        if not isinstance(dat, Detections):
+            dat = Detections.from_dicts(dat)
+        if self.size + len(dat) > len(self.buffer):
+            buffer = np.empty(
+                max(2 * len(self.buffer), self.size + len(dat)), dtype=Detections.dtype)
+            buffer[:self.size] = self.buffer[:self.size]
+            self.buffer = buffer
+        self.buffer[self.size:self.size + len(dat)] = dat.data
+        self.size += len(dat)
+        self.images += 1
+        if self.images >= self.buffer_size or (self.flush_interval is not None and time.monotonic() - self.last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write the buffered data in the database.
+
+        """
+        if self.size:
+            self.backend.write(self.get_columns(
+                Detections(self.buffer[:self.size])))
+        self.size = 0
+        self.images = 0
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        """Write the buffered data and close the database.
+
+        """
+        if self.backend is not None:
+            try:
+                self.flush()
+            finally:
+                self.backend.close()
+                self.backend = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def cnx(self):
+        """Connection to the database of the SqliteBackend, None otherwise.
+
+        """
+        return getattr(self.backend, "cnx", None)
+
+    @staticmethod
+    def get_columns(dat):
+        """Get the columns of the tracking table.
+
+            Parameters
+            ----------
+            dat : Detections
+                Data.
+
+            Returns
+            -------
+            dict
+                Arrays by column name, in the tracking table column order.
+
+        """
+        data = dat.data
+        with np.errstate(divide="ignore", invalid="ignore"):
+            excentricity = [np.sqrt(1 - (data[part + "MinorAxisLength"] / data[part + "MajorAxisLength"])**2)
+                            for part in ("head", "tail", "body")]
+        columns = [data["xHead"], data["yHead"], data["tHead"],
+                   data["xTail"], data["yTail"], data["tTail"],
+                   data["xBody"], data["yBody"], data["tBody"],
+                   np.zeros(len(data)), data["areaBody"], data["perimeterBody"],
+                   data["headMajorAxisLength"], data["headMinorAxisLength"], excentricity[0],
+                   data["tailMajorAxisLength"], data["tailMinorAxisLength"], excentricity[1],
+                   data["bodyMajorAxisLength"], data["bodyMinorAxisLength"], excentricity[2],
+                   data["imageNumber"], data["id"]]
+        return dict(zip(Result.columns, columns))
+
+    @staticmethod
+    def get_rows(dat):
+        """Get the rows of the tracking table.
+
+            Parameters
+            ----------
+            dat : Detections
+                Data.
+
+            Returns
+            -------
+            list
+                List of tuples, one by object, in the tracking table column order.
+
+        """
+        return list(zip(*[i.tolist() for i in Result.get_columns(dat).values()]))
+
+    def __init__(self, path, buffer_size=1, flush_interval=None, backend=SqliteBackend, resume=None):
+        """Create the result database.
+
+        Parameters
+        ----------
+        path : str
+            Folder where the Tracking_Result folder is created.
+        buffer_size : int
+            Number of images buffered before writing in the database.
+        flush_interval : float
+            Maximal time in seconds between two writings, None to only use buffer_size.
+        backend : type
+            ResultBackend implementation, SqliteBackend or NpzBackend.
+        resume : int
+            Image number from which a tracking is resumed, the existing result is reopened and its rows
+            from this image are deleted. None to create a new result.
+
+        """
+        self.backend = None
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.buffer = np.empty(1024, dtype=Detections.dtype)
+        self.size = 0
+        self.images = 0
+        self.last_flush = time.monotonic()
+        path = os.path.abspath(path + "/Tracking_Result/")
+        if resume is None:
+            os.makedirs(path)
+            self.backend = backend(path)
+        else:
+            if not os.path.isdir(path):
+                raise FileNotFoundError(
+                    "No tracking result to resume in {}".format(path))
+            self.backend = backend(path, resume=True)
+            self.backend.truncate(resume)
+
     def __del__(self):
-        self.cnx.close()
+        self.close()
+
+
+class Reader():
+    """Class to read result files compatible with FastTrack.
+
+    Indexes on imageNumber and id are created when missing, trajectories and images
+    are read with indexed queries and returned as arrays.
+
+    """
+
+    def __init__(self, path, chunk_size=65536):
+        """Open the result database.
+
+        Parameters
+        ----------
+        path : str
+            Path pointing to the tracking.db database or to the folder containing Tracking_Result.
+        chunk_size : int
+            Number of rows fetched at once.
+
+        """
+        if os.path.isdir(path):
+            path = os.path.join(path, "Tracking_Result", "tracking.db")
+        if not os.path.isfile(path):
+            raise FileNotFoundError(path)
+        self.chunk_size = chunk_size
+        self.cnx = sqlite3.connect(path)
+        self.columns = tuple(i[1] for i in self.cnx.execute(
+            "PRAGMA table_info(tracking)"))
+        with self.cnx:
+            self.cnx.execute(
+                "CREATE INDEX IF NOT EXISTS imageNumberIndex ON tracking (imageNumber, id)")
+            self.cnx.execute(
+                "CREATE INDEX IF NOT EXISTS idIndex ON tracking (id, imageNumber)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Close the database.
+
+        """
+        if self.cnx is not None:
+            self.cnx.close()
+            self.cnx = None
+
+    def get_columns(self, columns):
+        """Check the requested columns.
+
+        Parameters
+        ----------
+        columns : list
+            Columns, all if None.
+
+        Returns
+        -------
+        list
+            Columns.
+
+        """
+        if columns is None:
+            return list(self.columns)
+        for i in columns:
+            if i not in self.columns:
+                raise KeyError(i)
+        return list(columns)
+
+    def query(self, columns, condition="", parameters=()):
+        """Fetch rows by chunks.
+
+        Parameters
+        ----------
+        columns : list
+            Columns, all if None.
+        condition : str
+            SQL clause after the SELECT, for example WHERE and ORDER BY.
+        parameters : tuple
+            Parameters of the clause.
+
+        Yields
+        ------
+        ndarray
+            Array of shape (rows, columns), at most chunk_size rows.
+
+        """
+        columns = self.get_columns(columns)
+        cursor = self.cnx.execute("SELECT {} FROM tracking {}".format(
+            ", ".join(columns), condition), parameters)
+        try:
+            rows = cursor.fetchmany(self.chunk_size)
+            while rows:
+                yield np.asarray(rows, dtype=np.float64)
+                rows = cursor.fetchmany(self.chunk_size)
+        finally:
+            cursor.close()
+
+    def fetch(self, columns, condition="", parameters=()):
+        """Fetch all the rows.
+
+        Parameters
+        ----------
+        columns : list
+            Columns, all if None.
+        condition : str
+            SQL clause after the SELECT.
+        parameters : tuple
+            Parameters of the clause.
+
+        Returns
+        -------
+        ndarray
+            Array of shape (rows, columns).
+
+        """
+        chunks = list(self.query(columns, condition, parameters))
+        if not chunks:
+            return np.empty((0, len(self.get_columns(columns))))
+        return np.concatenate(chunks)
+
+    def get_ids(self):
+        """Get the objects identities.
+
+        Returns
+        -------
+        ndarray
+            Sorted identities.
+
+        """
+        return np.asarray([i[0] for i in self.cnx.execute("SELECT DISTINCT id FROM tracking ORDER BY id")], dtype=np.int64)
+
+    def get_image_numbers(self):
+        """Get the image numbers.
+
+        Returns
+        -------
+        ndarray
+            Sorted image numbers.
+
+        """
+        return np.asarray([i[0] for i in self.cnx.execute("SELECT DISTINCT imageNumber FROM tracking ORDER BY imageNumber")], dtype=np.int64)
+
+    def get_trajectory(self, idty, columns=None):
+        """Get the trajectory of one object.
+
+        Parameters
+        ----------
+        idty : int
+            Object identity.
+        columns : list
+            Columns, all if None.
+
+        Returns
+        -------
+        ndarray
+            Array of shape (images, columns) sorted by image number.
+
+        """
+        return self.fetch(columns, "WHERE id = ? ORDER BY imageNumber", (int(idty),))
+
+    def get_image(self, image, columns=None):
+        """Get the objects of one image.
+
+        Parameters
+        ----------
+        image : int
+            Image number.
+        columns : list
+            Columns, all if None.
+
+        Returns
+        -------
+        ndarray
+            Array of shape (objects, columns) sorted by id.
+
+        """
+        return self.fetch(columns, "WHERE imageNumber = ? ORDER BY id", (int(image),))
+
+    def get_images(self, start, stop, columns=None):
+        """Get the objects of a range of images.
+
+        Parameters
+        ----------
+        start : int
+            First image number.
+        stop : int
+            Last image number, excluded.
+        columns : list
+            Columns, all if None.
+
+        Returns
+        -------
+        ndarray
+            Array of shape (rows, columns) sorted by image number and id.
+
+        """
+        return self.fetch(columns, "WHERE imageNumber >= ? AND imageNumber < ? ORDER BY imageNumber, id", (int(start), int(stop)))
+
+    def iter_groups(self, key, columns=None):
+        """Iterate over the groups of rows sharing the same key, fetched by chunks.
+
+        Parameters
+        ----------
+        key : str
+            imageNumber or id.
+        columns : list
+            Columns, all if None.
+
+        Yields
+        ------
+        int
+            Key value.
+        ndarray
+            Array of shape (rows, columns).
+
+        """
+        columns = self.get_columns(columns)
+        index = len(columns)
+        other = "imageNumber" if key == "id" else "id"
+        current, parts = None, []
+        for chunk in self.query(columns + [key], "ORDER BY {}, {}".format(key, other)):
+            keys = chunk[:, index].astype(np.int64)
+            splits = np.flatnonzero(np.diff(keys)) + 1
+            for part in np.split(np.arange(len(keys)), splits):
+                if current is not None and keys[part[0]] != current:
+                    yield current, np.concatenate(parts)
+                    parts = []
+                current = int(keys[part[0]])
+                parts.append(chunk[part, 0:index])
+        if current is not None:
+            yield current, np.concatenate(parts)
+
+    def iter_trajectories(self, columns=None):
+        """Iterate over the trajectories without loading the whole database.
+
+        Parameters
+        ----------
+        columns : list
+            Columns, all if None.
+
+        Yields
+        ------
+        int
+            Object identity.
+        ndarray
+            Array of shape (images, columns) sorted by image number.
+
+        """
+        return self.iter_groups("id", columns)
+
+    def iter_images(self, columns=None):
+        """Iterate over the images without loading the whole database.
+
+        Parameters
+        ----------
+        columns : list
+            Columns, all if None.
+
+        Yields
+        ------
+        int
+            Image number.
+        ndarray
+            Array of shape (objects, columns) sorted by id.
+
+        """
+        return self.iter_groups("imageNumber", columns)
+
+
+_FLUSH = object()
+
+
+class AsyncResult():
+    """Class to write result files compatible with FastTrack in a background thread.
+
+    Data are passed to a dedicated writer thread through a bounded queue, the tracking
+    only waits when the queue is full. An error of the writer stops the writing, the data queued
+    after it are discarded and every later call of add_data, flush or close raises it. The writer
+    is drained and closed by close, by the context manager or at the interpreter exit.
+
+    """
+
+    def __init__(self, path, queue_size=64, **kwargs):
+        """Create the result database in the writer thread.
+
+        Parameters
+        ----------
+        path : str
+            Folder where the Tracking_Result folder is created.
+        queue_size : int
+            Maximal number of images waiting to be written.
+        **kwargs
+            Arguments of Result, buffer_size, flush_interval, backend and resume.
+
+        """
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.error = None
+        self.closed = False
+        self.written = 0
+        self.calls = 0
+        self.latency = 0
+        self.max_latency = 0
+        ready = threading.Event()
+        self.thread = threading.Thread(
+            target=self.write, args=(path, kwargs, ready), daemon=True)
+        self.thread.start()
+        ready.wait()
+        if self.error is not None:
+            self.thread.join()
+            self.closed = True
+            self.raise_error()
+        atexit.register(self.close)
+
+    def write(self, path, kwargs, ready):
+        """Write the data of the queue, run in the writer thread.
+
+        Parameters
+        ----------
+        path : str
+            Folder where the Tracking_Result folder is created.
+        kwargs : dict
+            Arguments of Result.
+        ready : threading.Event
+            Set when the database is created.
+
+        """
+        try:
+            result = Result(path, **kwargs)
+        except Exception as e:
+            self.error = e
+            ready.set()
+            return
+        ready.set()
+        try:
+            while True:
+                dat = self.queue.get()
+                try:
+                    if dat is None:
+                        break
+                    if self.error is None:
+                        start = time.perf_counter()
+                        if dat is _FLUSH:
+                            result.flush()
+                        else:
+                            result.add_data(dat)
+                            self.written += 1
+                        latency = time.perf_counter() - start
+                        self.calls += 1
+                        self.latency += latency
+                        self.max_latency = max(self.max_latency, latency)
+                except Exception as e:
+                    self.error = e
+                finally:
+                    self.queue.task_done()
+        finally:
+            try:
+                if self.error is not None:
+                    # Nothing is written after an error, the buffered rows are dropped
+                    result.size = 0
+                result.close()
+            except Exception as e:
+                if self.error is None:
+                    self.error = e
+
+    def raise_error(self):
+        """Raise the error of the writer thread, if any.
+
+        """
+        if self.error is not None:
+            raise self.error
+
+    def add_data(self, dat):
+        """Append data in the database.
+
+            Parameters
+            ----------
+            dat : Detections, dict or list of dicts
+                Data.
+
+        """
+        self.raise_error()
+        if self.closed:
+            raise ValueError("Writing in a closed AsyncResult")
+        if isinstance(dat, dict):
+            dat = [dat]
+        if isinstance(dat, Detections):
+            dat = Detections(np.copy(dat.data))
+        else:
+            dat = Detections.from_dicts(dat)
+        self.queue.put(dat)
+
+    def flush(self):
+        """Wait until all the queued data are written in the database.
+
+        """
+        if not self.closed:
+            self.queue.put(_FLUSH)
+            self.queue.join()
+        self.raise_error()
+
+    def close(self):
+        """Write the queued data and close the database.
+
+        """
+        if not self.closed:
+            self.closed = True
+            atexit.unregister(self.close)
+            self.queue.put(None)
+            self.thread.join()
+        self.raise_error()
+
+    def get_statistics(self):
+        """Get the writer statistics.
+
+        Returns
+        -------
+        dict
+            Queue depth, number of images written, mean and maximal latency in seconds of the writes and flushes.
+
+        """
+        return {"queue_depth": self.queue.qsize(), "written": self.written,
+                "mean_latency": self.latency / max(self.calls, 1), "max_latency": self.max_latency}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -1,6 +1,7 @@
 from pyfasttrack.ft_detector import FtDetector
 from pyfasttrack.tracker import Tracker
 from pyfasttrack.data import Result
+from pyfasttrack.source import FrameSource
 import data as dat
 import cv2
 import os
@@ -25,17 +26,6 @@ tracker = Tracker(params)
 tracker.set_params(params)
 tracker.set_detector(detector)
 
-camera = cv2.VideoCapture(
-    "{}/test/data/images/frame_%06d.pgm".format(example_folder_path))
-dat = tracker.initialize(cv2.cvtColor(camera.read()[1], cv2.COLOR_BGR2GRAY))
-saver.add_data(dat)
-
-ret = True
-while (ret):
-    ret, frame = camera.read()
-    if ret:
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        dat = tracker.process(frame)
+with FrameSource("{}/test/data/images/frame_%06d.pgm".format(example_folder_path), grayscale=True) as source:
+    for dat in tracker.run(source):
         saver.add_data(dat)
-
-camera.release()
@@ -1,7 +1,7 @@
 from pyfasttrack.yolo_detector import YoloDetector
 from pyfasttrack.tracker import Tracker
 from pyfasttrack.data import Result
-import cv2
+from pyfasttrack.source import FrameSource
 import os
 
 example_folder_path = os.path.dirname(os.path.abspath(__file__))
@@ -11,7 +11,8 @@ saver = Result("{}/test/data/images/".format(example_folder_path))
 
 # Set up detector
 # See https://github.com/ultralytics/ultralytics/blob/44c7c3514d87a5e05cfb14dba5a3eeb6eb860e70/ultralytics/datasets/coco.yaml for equivalence between coco labels and indexes
-yolo_params = {"model": "yolov8l-seg.pt", "classes": [2], "conf": 0.5}
+yolo_params = {"model": "yolov8l-seg.pt",
+               "classes": [2], "conf": 0.5, "device": "cpu"}
 detector = YoloDetector(yolo_params)
 
 # Set up tracker
@@ -21,16 +22,7 @@ tracker = Tracker()
 tracker.set_params(params)
 tracker.set_detector(detector)
 
-camera = cv2.VideoCapture(
-    "{}/test/data/images/Nascar.mp4".format(example_folder_path))
-dat = tracker.initialize(camera.read()[1])
-saver.add_data(dat)
-
-ret = True
-while (ret):
-    ret, frame = camera.read()
-    if ret:
-        dat = tracker.process(frame)
+with FrameSource("{}/test/data/images/Nascar.mp4".format(example_folder_path)) as source:
+    # Images are detected by batches of 8
+    for dat in tracker.run(source, batch_size=8):
         saver.add_data(dat)
-
-camera.release()
@@ -6,11 +6,40 @@ import cv2
 class FtDetector(BaseDetector):
     """Implement the classic FastTrack detector.
 
+    The image is processed only in the regions of interest, the FastTrack region xTop, yTop, xBottom, yBottom
+    or several regions set with set_rois.
+
+    The parameters are parsed by set_params and parsed again by detect when one of them is changed in the
+    params dict. The intermediate images are written in buffers kept between images, once their size is known
+    no image-sized array is allocated. Set the attribute reuse_buffers to False to allocate them at each image,
+    for example if the detector is shared between threads.
+
     """
 
+    reuse_buffers = True
+    parsed_keys = ("lightBack", "thresh", "minArea", "maxArea", "morph", "morphSize", "morphType",
+                   "xTop", "yTop", "xBottom", "yBottom")
+
     def __init__(self, params):
         """Initialize the detector.
 
+        Parameters
+        ----------
+        params : dict
+            Parameters.
+
+        """
+        self.rois = []
+        self.set_params(params)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["buffers"] = {}
+        return state
+
+    def set_params(self, params):
+        """Set and parse the parameters.
+
         Parameters
         ----------
         params : dict
@@ -18,10 +47,69 @@ class FtDetector(BaseDetector):
 
         """
         self.params = params
+        self.parsed = self.get_parsed_values()
+        self.light_back = int(params["lightBack"]) != 0
+        self.thresh = int(params["thresh"])
+        self.min_area = int(params["minArea"])
+        self.max_area = int(params["maxArea"])
+        self.morph = int(params["morph"])
+        size = int(params["morphSize"])
+        self.kernel = None
+        self.margin = 0
+        if size != 0 and self.morph != 8:
+            self.kernel = cv2.getStructuringElement(
+                int(params["morphType"]), (2 * size + 1, 2 * size + 1), (size, size))
+            # Opening, closing and the other compound operations apply the kernel twice
+            self.margin = 2 * size
+        self.roi = None
+        if int(params["xBottom"]) != 0 and int(params["yBottom"]) != 0:
+            x, y = int(params["xTop"]), int(params["yTop"])
+            self.roi = ((x, y, int(params["xBottom"]) - x,
+                        int(params["yBottom"]) - y), None, (x, y))
+        self.buffers = {}
+
+    def get_parsed_values(self):
+        """Get the values of the parsed parameters, to detect their changes.
+
+        Returns
+        -------
+        tuple
+            Values of the parameters in parsed_keys.
+
+        """
+        return tuple(self.params[i] for i in self.parsed_keys)
+
+    def get_buffer(self, key, shape):
+        """Get a buffer for an intermediate image.
+
+        Parameters
+        ----------
+        key : tuple
+            Buffer name and region index.
+        shape : tuple
+            Shape of the image.
+
+        Returns
+        -------
+        ndarray
+            Buffer of type uint8, its content is undefined.
+
+        """
+        buffer = self.buffers.get(key)
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape, dtype=np.uint8)
+            if self.reuse_buffers:
+                self.buffers[key] = buffer
+        return buffer
 
     def detect(self, image):
         """Detect objects
 
+        Only the regions of interest are processed, the image and the background are cropped
+        before the subtraction. With a morphological operation, the crop is extended by the reach
+        of the kernel, clamped to the image, and trimmed after the operation so that the result is
+        the same as for the whole image.
+
         Parameters
         ----------
         image : ndarray
@@ -33,37 +121,140 @@ class FtDetector(BaseDetector):
             List of masks as [(mask, left_corner), ...].
 
         """
-        if int(self.params["lightBack"]) == 0:
-            image = cv2.subtract(self.background, image)
-        else:
-            image = cv2.subtract(image, self.background)
+        if self.get_parsed_values() != self.parsed:
+            self.set_params(self.params)
+        masks = []
+        for index, ((x, y, width, height), mask, offset) in enumerate(self.get_rois()):
+            x0, y0 = max(x, 0), max(y, 0)
+            x1, y1 = min(x + width, image.shape[1]), min(y + height, image.shape[0])
+            if x1 <= x0 or y1 <= y0:
+                continue
+            if mask is not None:
+                mask = mask[y0 - y:y1 - y, x0 - x:x1 - x]
+            left, top = max(x0 - self.margin, 0), max(y0 - self.margin, 0)
+            right = min(x1 + self.margin, image.shape[1])
+            bottom = min(y1 + self.margin, image.shape[0])
+            masks.extend(self.detect_roi(image[top:bottom, left:right], self.background[top:bottom, left:right],
+                                         mask, (x0 - offset[0], y0 - offset[1]), index,
+                                         (x0 - left, y0 - top, x1 - x0, y1 - y0)))
+        return masks
 
-        __, image = cv2.threshold(image, int(
-            self.params["thresh"]), 255, cv2.THRESH_BINARY)
+    def detect_roi(self, image, background, mask, offset, index=0, inner=None):
+        """Detect objects in a region of interest.
 
-        if int(self.params["morphSize"]) != 0 and int(self.params["morph"]) != 8:
-            element = cv2.getStructuringElement(int(self.params["morphType"]), (2 * int(self.params["morphSize"]) + 1, 2 * int(
-                self.params["morphSize"]) + 1), (int(self.params["morphSize"]), int(self.params["morphSize"])))
-            image = cv2.morphologyEx(image, int(self.params["morph"]), element)
+        Parameters
+        ----------
+        image : ndarray
+            Region of the image as GRAYSCALE, with its margin.
+        background : ndarray
+            Same region of the background.
+        mask : ndarray
+            Mask of the region without its margin, non-zero inside the region, None to keep the whole rectangle.
+        offset : tuple
+            Coordinates [x, y] of the region in the frame of the results.
+        index : int
+            Index of the region, each region has its buffers.
+        inner : tuple
+            Rectangle (x, y, width, height) of the region in image, the margin is only used by the morphological
+            operation. None if image has no margin.
 
-        if int(self.params["xBottom"]) != 0 and int(self.params["yBottom"]) != 0:
-            image = image[int(self.params["yTop"]):int(self.params["yBottom"]), int(
-                self.params["xTop"]):int(self.params["xBottom"])]
+        Returns
+        -------
+        list
+            List of masks as [(mask, left_corner), ...].
+
+        """
+        binary = self.get_buffer(("binary", index), image.shape)
+        if self.light_back:
+            cv2.subtract(image, background, dst=binary)
+        else:
+            cv2.subtract(background, image, dst=binary)
+        cv2.threshold(binary, self.thresh, 255,
+                      cv2.THRESH_BINARY, dst=binary)
+
+        if self.kernel is not None:
+            morph = self.get_buffer(("morph", index), image.shape)
+            cv2.morphologyEx(binary, self.morph, self.kernel, dst=morph)
+            binary = morph
+        if inner is not None:
+            binary = binary[inner[1]:inner[1] + inner[3], inner[0]:inner[0] + inner[2]]
+
+        if mask is not None:
+            cv2.bitwise_and(binary, mask, dst=binary)
 
         contours, _ = cv2.findContours(
-            image, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+            binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
         masks = []
         for i in contours:
             area = cv2.contourArea(i)
-            if area < int(self.params["maxArea"]) and area > int(self.params["minArea"]):
+            if area < self.max_area and area > self.min_area:
                 rect = cv2.boundingRect(i)
-                mask = np.zeros_like(image)
-                cv2.drawContours(mask, [i], 0, 255, -1, 8)
+                obj = np.zeros((rect[3], rect[2]), dtype=np.uint8)
+                cv2.drawContours(obj, [i], 0, 255, -1,
+                                 8, offset=(-rect[0], -rect[1]))
                 masks.append(
-                    (np.copy(mask[rect[1]:rect[1] + rect[3], rect[0]:rect[0] + rect[2]]), rect[0:2]))
+                    (obj, (rect[0] + offset[0], rect[1] + offset[1])))
 
         return masks
 
+    def get_rois(self):
+        """Get the regions of interest.
+
+        The regions set with set_rois are used if any, else the FastTrack region xTop, yTop, xBottom, yBottom.
+        As in FastTrack, the coordinates found in the FastTrack region are relative to its corner.
+
+        Returns
+        -------
+        list
+            List of (rectangle [x, y, width, height], mask or None, origin [x, y] of the results).
+
+        """
+        if self.rois:
+            return self.rois
+        if self.roi is not None:
+            return [self.roi]
+        return [((0, 0, self.background.shape[1], self.background.shape[0]), None, (0, 0))]
+
+    def set_rois(self, rois=None, mask=None):
+        """Set several regions of interest, for example one by arena.
+
+        The coordinates of the objects are in the full frame. The regions must not overlap,
+        an object in two regions is detected twice.
+
+        Parameters
+        ----------
+        rois : list
+            Regions, each one a rectangle (x, y, width, height) or a polygon as an array of points [[x, y], ...].
+            None to use only the mask.
+        mask : ndarray
+            Image of the size of the frames, non-zero where the objects are detected. None to only use the regions.
+
+        """
+        if rois is None:
+            rois = [] if mask is None else [cv2.boundingRect(
+                np.uint8(mask != 0))]
+        self.rois = []
+        for roi in rois:
+            roi = np.asarray(roi)
+            if roi.ndim == 2:
+                polygon = np.int32(np.round(roi))
+                rect = cv2.boundingRect(polygon)
+                roi_mask = np.zeros((rect[3], rect[2]), dtype=np.uint8)
+                cv2.fillPoly(roi_mask, [polygon - rect[0:2]], 255)
+            else:
+                rect = tuple(int(i) for i in roi)
+                roi_mask = None
+            if mask is not None:
+                crop = np.zeros((rect[3], rect[2]), dtype=np.uint8)
+                x0, y0 = max(rect[0], 0), max(rect[1], 0)
+                x1, y1 = min(rect[0] + rect[2], mask.shape[1]), min(rect[1] + rect[3], mask.shape[0])
+                crop[y0 - rect[1]:y1 - rect[1], x0 - rect[0]:x1 -
+                     rect[0]] = np.where(mask[y0:y1, x0:x1] != 0, 255, 0)
+                roi_mask = crop if roi_mask is None else cv2.bitwise_and(
+                    roi_mask, crop)
+            self.rois.append((rect, roi_mask, (0, 0)))
+        self.buffers = {}
+
     def set_background(self, image):
         """Set the background image.
 
@@ -0,0 +1,203 @@
+import numpy as np
+
+
+class MotionModel():
+    """Predict the position of the tracked objects in the next image.
+
+    The state of each object is its position and its velocity in pixels by image. The "velocity" method
+    extrapolates the last observed positions with the velocity between the two last observations. The "kalman"
+    method is a constant velocity Kalman filter, the velocity changes are a white noise of variance noise and
+    the measured positions have a variance measurement_noise. All the objects are predicted and updated at once.
+    An object that is not observed keeps its predicted position, the prediction continues until it is observed again.
+    The velocity of an object is unknown until it is observed twice.
+
+    """
+
+    methods = ("velocity", "kalman")
+
+    def __init__(self, method="velocity", noise=1., measurement_noise=1., velocity=100.):
+        """Initialize the model.
+
+        Parameters
+        ----------
+        method : str
+            Model, "velocity" or "kalman".
+        noise : float
+            Variance of the velocity changes between two images, Kalman filter only.
+        measurement_noise : float
+            Variance of the measured positions, Kalman filter only.
+        velocity : float
+            Standard deviation of the velocity of a new object, Kalman filter only.
+
+        """
+        if method not in self.methods:
+            raise ValueError("Unknown motion model {}".format(method))
+        self.method = method
+        self.transition = np.array(
+            [[1, 0, 1, 0], [0, 1, 0, 1], [0, 0, 1, 0], [0, 0, 0, 1]], dtype=np.float64)
+        self.noise = noise * np.array([[0.25, 0, 0.5, 0], [0, 0.25, 0, 0.5], [0.5, 0, 1, 0], [0, 0.5, 0, 1]])
+        self.measurement_noise = measurement_noise * np.eye(2)
+        self.initial_covariance = np.diag(
+            [measurement_noise, measurement_noise, velocity**2, velocity**2])
+        self.initialize(np.empty((0, 2)))
+
+    @classmethod
+    def from_params(cls, params):
+        """Create the model selected by the optional parameter motion.
+
+        Parameters
+        ----------
+        params : dict
+            Parameters, motion is 0 (default) without model, 1 for the velocity model and 2 for the Kalman filter.
+            The Kalman filter uses the optional parameters motionNoise and measurementNoise (default 1), the initial
+            velocity uncertainty is maxDist.
+
+        Returns
+        -------
+        MotionModel
+            Model, None if motion is 0.
+
+        """
+        motion = int(params.get("motion", 0))
+        if motion == 0:
+            return None
+        return cls(("velocity", "kalman")[motion - 1], float(params.get("motionNoise", 1)),
+                   float(params.get("measurementNoise", 1)), float(params.get("maxDist", 100)))
+
+    def initialize(self, positions):
+        """Initialize the model with the first positions, the velocities are null.
+
+        Parameters
+        ----------
+        positions : ndarray
+            Positions [[x, y], ...].
+
+        """
+        self.state = np.zeros((0, 4))
+        self.covariance = np.zeros((0, 4, 4))
+        self.elapsed = np.zeros(0, dtype=np.int64)
+        self.known = np.zeros(0, dtype=bool)
+        self.add(positions)
+
+    def add(self, positions):
+        """Add new objects.
+
+        Parameters
+        ----------
+        positions : ndarray
+            Positions [[x, y], ...] of the new objects.
+
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        state = np.zeros((len(positions), 4))
+        state[:, 0:2] = positions
+        self.state = np.concatenate((self.state, state))
+        self.covariance = np.concatenate(
+            (self.covariance, np.broadcast_to(self.initial_covariance, (len(positions), 4, 4))))
+        self.elapsed = np.concatenate(
+            (self.elapsed, np.zeros(len(positions), dtype=np.int64)))
+        self.known = np.concatenate(
+            (self.known, np.zeros(len(positions), dtype=bool)))
+
+    def predict(self):
+        """Predict the positions in the next image.
+
+        Returns
+        -------
+        ndarray
+            Predicted positions [[x, y], ...].
+
+        """
+        self.state = self.state @ self.transition.T
+        if self.method == "kalman":
+            self.covariance = self.transition @ self.covariance @ self.transition.T + self.noise
+        self.elapsed += 1
+        return self.state[:, 0:2]
+
+    def update(self, index, positions):
+        """Correct the state of the observed objects with their measured positions.
+
+        Parameters
+        ----------
+        index : ndarray
+            Indexes of the observed objects.
+        positions : ndarray
+            Measured positions [[x, y], ...] of the observed objects.
+
+        """
+        index = np.asarray(index, dtype=np.intp)
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        if self.method == "kalman":
+            covariance = self.covariance[index]
+            gain = covariance[:, :, 0:2] @ np.linalg.inv(
+                covariance[:, 0:2, 0:2] + self.measurement_noise)
+            innovation = positions - self.state[index, 0:2]
+            self.state[index] += (gain @ innovation[:, :, np.newaxis])[:, :, 0]
+            self.covariance[index] = covariance - gain @ covariance[:, 0:2, :]
+        else:
+            # Last observed position from the extrapolated one
+            elapsed = self.elapsed[index, np.newaxis]
+            observed = self.state[index, 0:2] - \
+                self.state[index, 2:4] * elapsed
+            self.state[index, 2:4] = (positions - observed) / elapsed
+            self.state[index, 0:2] = positions
+        self.elapsed[index] = 0
+        self.known[index] = True
+
+    def get_gate(self, max_dist, motion_dist):
+        """Get the maximal distance between the predicted position of each object and its next position.
+
+        Parameters
+        ----------
+        max_dist : float
+            Maximal distance of the objects with an unknown velocity, their predicted position is their last position.
+        motion_dist : float
+            Maximal distance of the objects with a known velocity.
+
+        Returns
+        -------
+        ndarray
+            Maximal distance of each object.
+
+        """
+        return np.where(self.known, motion_dist, max_dist)
+
+    def select(self, index):
+        """Keep a subset of the objects.
+
+        Parameters
+        ----------
+        index : ndarray
+            Boolean or integer array of the objects to keep, in their new order.
+
+        """
+        self.state = self.state[index]
+        self.covariance = self.covariance[index]
+        self.elapsed = self.elapsed[index]
+        self.known = self.known[index]
+
+    def get_state(self):
+        """Get the state of the model.
+
+        Returns
+        -------
+        dict
+            State, velocities and covariances by object.
+
+        """
+        return {"motion_state": self.state.copy(), "motion_covariance": self.covariance.copy(),
+                "motion_elapsed": self.elapsed.copy(), "motion_known": self.known.copy()}
+
+    def set_state(self, state):
+        """Restore the state of the model.
+
+        Parameters
+        ----------
+        state : dict
+            State, output of get_state.
+
+        """
+        self.state = np.array(state["motion_state"], dtype=np.float64)
+        self.covariance = np.array(state["motion_covariance"], dtype=np.float64)
+        self.elapsed = np.array(state["motion_elapsed"], dtype=np.int64)
+        self.known = np.array(state["motion_known"], dtype=bool)
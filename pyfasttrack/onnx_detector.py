@@ -0,0 +1,272 @@
+from .base_detector import BaseDetector
+import numpy as np
+import cv2
+
+
+class OnnxDetector(BaseDetector):
+    """Detector running a YOLO segmentation model exported to ONNX on the CPU.
+
+    The model is run with ONNX Runtime, or with the OpenCV DNN module if ONNX Runtime is not installed or
+    the parameter "backend" is "opencv", without the ultralytics and Torch dependencies. The letterboxed image
+    and the input tensor are buffers shared between the images. Masks are computed only inside the boxes of
+    the kept objects and cropped to them.
+
+    Parameters use the ultralytics names: "model" (ONNX file exported with format="onnx"), "conf" (default 0.25),
+    "iou" (default 0.7), "classes" (default all), "imgsz" (default the model input size with ONNX Runtime, else 640,
+    must be the export size with OpenCV), "threads" (number of threads of the ONNX Runtime session, default 0 for
+    the runtime default) and "backend" ("onnxruntime" or "opencv"). The OpenCV DNN module uses the global OpenCV
+    thread count, set by the caller with cv2.setNumThreads.
+
+    The model and the buffers are not pickled, they are created again at the first image, so that the detector
+    can be sent to the worker processes of a Pipeline.
+
+    """
+
+    def __init__(self, params):
+        """Initialize the detector.
+
+        Parameters
+        ----------
+        params : dict
+            Parameters.
+
+        """
+        self.params = params
+        self.conf = float(params.get("conf", 0.25))
+        self.iou = float(params.get("iou", 0.7))
+        self.classes = params.get("classes")
+        self.threads = int(params.get("threads", 0))
+        self.backend = params.get("backend")
+        if self.backend is None:
+            try:
+                import onnxruntime
+                self.backend = "onnxruntime"
+            except ImportError:
+                self.backend = "opencv"
+        if self.backend not in ("onnxruntime", "opencv"):
+            raise ValueError("Unknown backend {}".format(self.backend))
+        self.session = None
+        self.net = None
+        self.load()
+
+        size = params.get("imgsz")
+        if size is None and self.session is not None:
+            shape = self.session.get_inputs()[0].shape
+            if isinstance(shape[2], int) and isinstance(shape[3], int):
+                size = shape[2:4]
+        size = 640 if size is None else size
+        self.size = (int(size), int(size)) if np.isscalar(size) else (
+            int(size[0]), int(size[1]))
+        self.canvas = None
+        self.blob = None
+        self.get_buffers()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["session"] = None
+        state["net"] = None
+        state["canvas"] = None
+        state["blob"] = None
+        return state
+
+    def load(self):
+        """Load the model with the selected backend.
+
+        """
+        if self.backend == "onnxruntime":
+            import onnxruntime
+            options = onnxruntime.SessionOptions()
+            options.intra_op_num_threads = self.threads
+            options.inter_op_num_threads = 1
+            self.session = onnxruntime.InferenceSession(
+                self.params["model"], options, providers=["CPUExecutionProvider"])
+            self.input_name = self.session.get_inputs()[0].name
+        else:
+            self.net = cv2.dnn.readNetFromONNX(self.params["model"])
+            self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+            self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+            self.output_names = self.net.getUnconnectedOutLayersNames()
+
+    def get_buffers(self):
+        """Get the letterboxed image and the input tensor, allocated once.
+
+        Returns
+        -------
+        ndarray
+            Letterboxed image.
+        ndarray
+            Input tensor.
+
+        """
+        if self.blob is None:
+            self.canvas = np.empty(self.size + (3,), dtype=np.uint8)
+            self.blob = np.empty((1, 3) + self.size, dtype=np.float32)
+        return self.canvas, self.blob
+
+    def detect(self, image):
+        """Detect objects
+
+        Parameters
+        ----------
+        image : ndarray
+            Image as BGR or GRAYSCALE.
+
+        Returns
+        -------
+        list
+            List of masks as [(mask, left_corner), ...].
+
+        """
+        if self.session is None and self.net is None:
+            self.load()
+        scale, pad = self.preprocess(image)
+        if self.session is not None:
+            outputs = self.session.run(None, {self.input_name: self.blob})
+        else:
+            self.net.setInput(self.blob)
+            outputs = self.net.forward(self.output_names)
+        return self.postprocess(outputs, scale, pad, image.shape[0:2])
+
+    def preprocess(self, image):
+        """Letterbox the image in the input tensor.
+
+        Parameters
+        ----------
+        image : ndarray
+            Image as BGR or GRAYSCALE.
+
+        Returns
+        -------
+        float
+            Scale from the image to the input.
+        tuple
+            Padding [x, y] of the image in the input.
+
+        """
+        if image.ndim == 2:
+            image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        canvas, blob = self.get_buffers()
+        height, width = self.size
+        scale = min(height / image.shape[0], width / image.shape[1])
+        new_width = int(round(image.shape[1] * scale))
+        new_height = int(round(image.shape[0] * scale))
+        left = (width - new_width) // 2
+        top = (height - new_height) // 2
+        canvas[...] = 114
+        cv2.resize(image, (new_width, new_height), dst=canvas[top:top + new_height, left:left + new_width],
+                   interpolation=cv2.INTER_LINEAR)
+        # BGR HWC uint8 to RGB CHW float in [0, 1]
+        np.multiply(np.moveaxis(canvas[..., ::-1], -1, 0),
+                    1 / 255, out=blob[0], casting="unsafe")
+        return scale, (left, top)
+
+    def postprocess(self, outputs, scale, pad, shape):
+        """Decode the outputs of a YOLO segmentation model.
+
+        Parameters
+        ----------
+        outputs : list
+            Predictions of shape (1, 4 + classes + coefficients, anchors) and, for segmentation models,
+            mask prototypes of shape (1, coefficients, height, width), in any order.
+        scale : float
+            Scale from the image to the input.
+        pad : tuple
+            Padding [x, y] of the image in the input.
+        shape : tuple
+            Image shape [height, width].
+
+        Returns
+        -------
+        list
+            List of masks as [(mask, left_corner), ...].
+
+        """
+        # Outputs are selected by rank, OpenCV returns them in the order of the unconnected layers
+        outputs = [np.asarray(i) for i in outputs]
+        predictions = next(i for i in outputs if i.ndim == 3)[0].T
+        protos = next((i[0] for i in outputs if i.ndim == 4), None)
+        coefficients = 0 if protos is None else protos.shape[0]
+        scores = predictions[:, 4:predictions.shape[1] - coefficients]
+        if self.classes is not None:
+            allowed = np.zeros(scores.shape[1], dtype=bool)
+            allowed[np.asarray(self.classes, dtype=np.intp)] = True
+            scores = np.where(allowed, scores, 0)
+        labels = np.argmax(scores, axis=1)
+        confidences = scores[np.arange(len(scores)), labels]
+        kept = confidences > self.conf
+        if not np.any(kept):
+            return []
+        predictions, labels, confidences = predictions[kept], labels[kept], confidences[kept]
+
+        # Boxes in the input as x, y, width, height, shifted by class for a class-wise non-maximum suppression
+        boxes = np.column_stack((predictions[:, 0] - predictions[:, 2] / 2,
+                                 predictions[:, 1] - predictions[:, 3] / 2, predictions[:, 2], predictions[:, 3]))
+        offsets = labels[:, np.newaxis] * (max(self.size) + 1)
+        shifted = boxes.copy()
+        shifted[:, 0:2] += offsets
+        indexes = np.asarray(cv2.dnn.NMSBoxes(shifted.tolist(), confidences.tolist(),
+                                              self.conf, self.iou), dtype=np.intp).reshape(-1)
+
+        masks = []
+        height, width = shape
+        for i in indexes:
+            x, y, w, h = boxes[i]
+            # Box in the image
+            x0 = int(np.clip(np.floor((x - pad[0]) / scale), 0, width - 1))
+            y0 = int(np.clip(np.floor((y - pad[1]) / scale), 0, height - 1))
+            x1 = int(np.clip(np.ceil((x + w - pad[0]) / scale), x0 + 1, width))
+            y1 = int(np.clip(np.ceil((y + h - pad[1]) / scale), y0 + 1, height))
+            if protos is None:
+                masks.append(
+                    (np.full((y1 - y0, x1 - x0), 255, dtype=np.uint8), (x0, y0)))
+                continue
+            mask = self.get_mask(
+                predictions[i, -coefficients:], protos, (x0, y0, x1, y1), scale, pad)
+            if np.any(mask):
+                masks.append((mask, (x0, y0)))
+        return masks
+
+    def get_mask(self, coefficients, protos, box, scale, pad):
+        """Compute the mask of one object inside its box.
+
+        Parameters
+        ----------
+        coefficients : ndarray
+            Mask coefficients of the object.
+        protos : ndarray
+            Mask prototypes.
+        box : tuple
+            Box [x0, y0, x1, y1] of the object in the image.
+        scale : float
+            Scale from the image to the input.
+        pad : tuple
+            Padding [x, y] of the image in the input.
+
+        Returns
+        -------
+        ndarray
+            Mask of the size of the box.
+
+        """
+        x0, y0, x1, y1 = box
+        ratio_y = protos.shape[1] / self.size[0]
+        ratio_x = protos.shape[2] / self.size[1]
+        # Box in the prototypes, enlarged by one cell for the interpolation
+        px0 = (x0 * scale + pad[0]) * ratio_x
+        py0 = (y0 * scale + pad[1]) * ratio_y
+        px1 = (x1 * scale + pad[0]) * ratio_x
+        py1 = (y1 * scale + pad[1]) * ratio_y
+        cx0, cy0 = max(int(np.floor(px0)) - 1, 0), max(int(np.floor(py0)) - 1, 0)
+        cx1 = min(int(np.ceil(px1)) + 1, protos.shape[2])
+        cy1 = min(int(np.ceil(py1)) + 1, protos.shape[1])
+        crop = np.tensordot(coefficients, protos[:, cy0:cy1, cx0:cx1], axes=1)
+        # Map each pixel center of the box to the prototypes
+        map_x = ((np.arange(x0, x1, dtype=np.float32) + 0.5) * scale +
+                 pad[0]) * ratio_x - 0.5 - cx0
+        map_y = ((np.arange(y0, y1, dtype=np.float32) + 0.5) * scale +
+                 pad[1]) * ratio_y - 0.5 - cy0
+        map_x, map_y = np.meshgrid(map_x, map_y)
+        logits = cv2.remap(crop.astype(np.float32), map_x, map_y,
+                           cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+        # sigmoid > 0.5 is logits > 0
+        return np.where(logits > 0, 255, 0).astype(np.uint8)
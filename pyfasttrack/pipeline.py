@@ -0,0 +1,318 @@
+import collections
+import concurrent.futures
+import os
+import numpy as np
+from .source import FrameSource
+from .tracker import Tracker
+
+_detector = None
+
+
+def _set_detector(detector):
+    """Set the detector of a worker process.
+
+    Parameters
+    ----------
+    detector : BaseDetector
+        Detector that is an implementation of the BaseDetector.
+
+    """
+    global _detector
+    _detector = detector
+
+
+def _process(image):
+    """Process one image in a worker process.
+
+    Parameters
+    ----------
+    image : ndarray
+        Image, channels depending on the detector.
+
+    Returns
+    -------
+    Detections
+        Detected objects and their features.
+
+    """
+    return _detector.process(image)
+
+
+def _track_segment(params, detector, path, grayscale, start, stop):
+    """Track a temporal segment in a worker process.
+
+    Parameters
+    ----------
+    params : dict
+        Parameters.
+    detector : BaseDetector
+        Detector that is an implementation of the BaseDetector.
+    path : str or list
+        Images, see FrameSource.
+    grayscale : bool
+        Convert the images to GRAYSCALE when decoding.
+    start : int
+        Index of the first image of the segment.
+    stop : int
+        Index after the last image of the segment, None to read until the end.
+
+    Returns
+    -------
+    list
+        Detections of each image of the segment, with segment identities and image numbers of the whole recording.
+
+    """
+    tracker = Tracker(params, detector)
+    with FrameSource(path, grayscale=grayscale, start=start, stop=stop) as source:
+        segment = list(tracker.run(source))
+    for i in segment:
+        i.data["imageNumber"] += start
+    return segment
+
+
+class Pipeline():
+    """Pipeline that detects objects in a pool of processes and tracks them in order.
+
+    The detection and the features extraction of each image are independent and run in parallel,
+    the assignment is sequential and runs in the calling process in the images order.
+
+    """
+
+    def __init__(self, tracker, workers=None, queue_size=None):
+        """Initialize the pipeline.
+
+        Parameters
+        ----------
+        tracker : Tracker
+            Tracker with its parameters and detector set.
+        workers : int
+            Number of worker processes, os.cpu_count() if None. 0 to process the images in the calling process.
+        queue_size : int
+            Maximal number of images being processed at the same time, 2 * workers if None.
+
+        """
+        self.tracker = tracker
+        self.workers = os.cpu_count() if workers is None else workers
+        self.queue_size = 2 * \
+            max(self.workers, 1) if queue_size is None else queue_size
+
+    def run(self, images):
+        """Track the objects in a sequence of images.
+
+        Images are read from the iterable only when a slot of the queue is free, the memory is bounded by queue_size images.
+
+        Parameters
+        ----------
+        images : iterable
+            Images, channels depending on the detector.
+
+        Yields
+        ------
+        Detections
+            Detected objects of each image, in the images order.
+
+        """
+        if self.workers == 0:
+            for image in images:
+                yield self.track(self.tracker.detector.process(image))
+            return
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.workers, initializer=_set_detector,
+                                                    initargs=(self.tracker.detector,)) as executor:
+            pending = collections.deque()
+            try:
+                for image in images:
+                    if len(pending) >= self.queue_size:
+                        yield self.track(pending.popleft().result())
+                    pending.append(executor.submit(_process, image))
+                while pending:
+                    yield self.track(pending.popleft().result())
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def track(self, detections):
+        """Track the detected objects of the next image.
+
+        Parameters
+        ----------
+        detections : Detections
+            Detected objects.
+
+        Returns
+        -------
+        Detections
+            Tracked objects.
+
+        """
+        if not self.tracker.is_init:
+            return self.tracker.initialize_detections(detections)
+        return self.tracker.process_detections(detections)
+
+
+class ChunkedPipeline():
+    """Pipeline that splits a recording in overlapping temporal segments tracked in parallel.
+
+    Each segment is read, detected and tracked in its own process. The identities of two consecutive
+    segments are stitched on their overlapping images: the objects of each overlapping image are matched
+    with the tracker cost function and the pairs of identities matched on the most images are merged.
+    An object lost near a segment boundary keeps its identity only if the overlap is longer than maxTime.
+
+    """
+
+    def __init__(self, tracker, chunk_size=1000, overlap=None, workers=None, queue_size=None):
+        """Initialize the pipeline.
+
+        Parameters
+        ----------
+        tracker : Tracker
+            Tracker with its parameters and detector set, used as the model of the segments trackers.
+        chunk_size : int
+            Number of images by segment, without the overlap.
+        overlap : int
+            Number of images tracked by two consecutive segments, maxTime + 1 if None.
+        workers : int
+            Number of worker processes, os.cpu_count() if None. 0 to track the segments in the calling process.
+        queue_size : int
+            Maximal number of segments being tracked at the same time, 2 * workers if None.
+
+        """
+        self.tracker = tracker
+        self.chunk_size = chunk_size
+        self.overlap = int(
+            tracker.params["maxTime"]) + 1 if overlap is None else overlap
+        self.workers = os.cpu_count() if workers is None else workers
+        self.queue_size = 2 * \
+            max(self.workers, 1) if queue_size is None else queue_size
+
+    def get_segments(self, length):
+        """Split a recording in overlapping segments.
+
+        Parameters
+        ----------
+        length : int
+            Number of images of the recording.
+
+        Returns
+        -------
+        list
+            (start, stop) of each segment, the last segment stop is None to read until the end.
+
+        """
+        starts = range(0, max(length, 1), self.chunk_size)
+        return [(i, i + self.chunk_size + self.overlap if i + self.chunk_size < length else None) for i in starts]
+
+    def track_segments(self, path, grayscale):
+        """Track the segments in the pool of processes.
+
+        Parameters
+        ----------
+        path : str or list
+            Images, see FrameSource.
+        grayscale : bool
+            Convert the images to GRAYSCALE when decoding.
+
+        Yields
+        ------
+        int
+            Index of the first image of the segment.
+        list
+            Detections of each image of the segment.
+
+        """
+        segments = self.get_segments(FrameSource(path).get_length())
+        args = (self.tracker.params, self.tracker.detector, path, grayscale)
+        if self.workers == 0:
+            for start, stop in segments:
+                yield start, _track_segment(*args, start, stop)
+            return
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.workers) as executor:
+            pending = collections.deque()
+            try:
+                for start, stop in segments:
+                    if len(pending) >= self.queue_size:
+                        yield pending[0][0], pending.popleft()[1].result()
+                    pending.append(
+                        (start, executor.submit(_track_segment, *args, start, stop)))
+                while pending:
+                    yield pending[0][0], pending.popleft()[1].result()
+            finally:
+                for __, future in pending:
+                    future.cancel()
+
+    def run(self, path, grayscale=False):
+        """Track the objects of a recording.
+
+        Parameters
+        ----------
+        path : str or list
+            Images, see FrameSource. The images are read by the worker processes.
+        grayscale : bool
+            Convert the images to GRAYSCALE when decoding.
+
+        Yields
+        ------
+        Detections
+            Tracked objects of each image, in the images order, with identities consistent over the whole recording.
+
+        """
+        previous = None
+        previous_start = 0
+        next_image = 0
+        next_id = 0
+        for start, segment in self.track_segments(path, grayscale):
+            common = max(min(previous_start + len(previous) -
+                         start, len(segment)), 0) if previous is not None else 0
+            matches = self.match(
+                previous[len(previous) - common:], segment[:common]) if common else {}
+            ids = np.unique(np.concatenate(
+                [i.data["id"] for i in segment] + [np.empty(0, dtype=np.int64)]))
+            mapping = {}
+            for i in ids.tolist():
+                if i in matches:
+                    mapping[i] = matches[i]
+                else:
+                    mapping[i] = next_id
+                    next_id += 1
+            for i in segment:
+                i.data["id"] = [mapping[j] for j in i.data["id"].tolist()]
+            for i in segment[max(next_image - start, 0):]:
+                yield i
+            next_image = start + len(segment)
+            previous, previous_start = segment, start
+
+    def match(self, previous, current):
+        """Match the identities of two segments on their common images.
+
+        Parameters
+        ----------
+        previous : list
+            Detections of the common images tracked by the previous segment.
+        current : list
+            Detections of the common images tracked by the current segment.
+
+        Returns
+        -------
+        dict
+            Identity in the previous segment by identity in the current segment.
+
+        """
+        from scipy.optimize import linear_sum_assignment
+        votes = collections.Counter()
+        for prev, cur in zip(previous, current):
+            order = self.tracker.assign(prev, cur)
+            for i, j in enumerate(order):
+                if j != -1:
+                    votes[(int(prev.data["id"][i]), int(cur.data["id"][j]))] += 1
+        if not votes:
+            return {}
+        previous_ids = sorted({i for i, __ in votes})
+        current_ids = sorted({i for __, i in votes})
+        rows = {j: i for i, j in enumerate(previous_ids)}
+        cols = {j: i for i, j in enumerate(current_ids)}
+        count = np.zeros((len(previous_ids), len(current_ids)))
+        for (i, j), k in votes.items():
+            count[rows[i], cols[j]] = k
+        row, col = linear_sum_assignment(count, maximize=True)
+        return {current_ids[j]: previous_ids[i] for i, j in zip(row, col) if count[i, j] > 0}
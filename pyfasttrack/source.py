@@ -0,0 +1,205 @@
+import glob
+import os
+import queue
+import threading
+import cv2
+
+
+class FrameSource():
+    """Read images from a video file or an image sequence in a background thread.
+
+    Images are decoded ahead of their use into a bounded buffer, hiding the decoding latency
+    behind the processing. The source is an iterator of images.
+
+    """
+
+    extensions = (".pgm", ".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff")
+    exact_seek_backends = ("CV_IMAGES",)
+
+    def __init__(self, path, grayscale=False, buffer_size=32, start=0, stop=None, step=1):
+        """Initialize the source.
+
+        Parameters
+        ----------
+        path : str or list
+            Video file, image sequence pattern as frame_%06d.pgm, glob pattern, folder of images or list of image paths.
+        grayscale : bool
+            Convert the images to GRAYSCALE when decoding.
+        buffer_size : int
+            Maximal number of decoded images waiting to be used.
+        start : int
+            Index of the first image read, to resume a tracking from a checkpoint.
+        stop : int
+            Index after the last image read, None to read until the end.
+        step : int
+            Read one image every step images, the skipped images of a video are grabbed but not retrieved.
+
+        """
+        self.path = path
+        self.grayscale = grayscale
+        self.start = start
+        self.stop_index = stop
+        self.step = step
+        self.buffer = queue.Queue(maxsize=buffer_size)
+        self.stop = threading.Event()
+        self.thread = None
+        self.error = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __iter__(self):
+        if self.thread is not None:
+            raise RuntimeError("FrameSource can only be iterated once")
+        self.thread = threading.Thread(target=self.decode, daemon=True)
+        self.thread.start()
+        while True:
+            image = self.buffer.get()
+            if image is None:
+                break
+            yield image
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def get_images(self):
+        """Get the images paths of an image sequence.
+
+        Returns
+        -------
+        list
+            Images paths, None if the source must be read with cv2.VideoCapture.
+
+        """
+        if isinstance(self.path, (list, tuple)):
+            return list(self.path)
+        if os.path.isdir(self.path):
+            return sorted(os.path.join(self.path, i) for i in os.listdir(self.path)
+                          if i.lower().endswith(self.extensions))
+        if any(i in self.path for i in "*?["):
+            return sorted(glob.glob(self.path))
+        return None
+
+    def get_length(self):
+        """Get the number of images of the source, from the first image and ignoring start and stop.
+
+        The number of images of a video is read in its header and can be approximate for some containers.
+
+        Returns
+        -------
+        int
+            Number of images.
+
+        """
+        images = self.get_images()
+        if images is not None:
+            return len(images)
+        camera = cv2.VideoCapture(self.path)
+        if not camera.isOpened():
+            raise IOError("Cannot open {}".format(self.path))
+        try:
+            return int(camera.get(cv2.CAP_PROP_FRAME_COUNT))
+        finally:
+            camera.release()
+
+    def read(self):
+        """Read the images.
+
+        Yields
+        ------
+        ndarray
+            Image as BGR or GRAYSCALE.
+
+        """
+        images = self.get_images()
+        if images is not None:
+            for i in images[self.start:self.stop_index:self.step]:
+                image = cv2.imread(
+                    i, cv2.IMREAD_GRAYSCALE if self.grayscale else cv2.IMREAD_COLOR)
+                if image is None:
+                    raise IOError("Cannot read image {}".format(i))
+                yield image
+        else:
+            camera = cv2.VideoCapture(self.path)
+            if not camera.isOpened():
+                raise IOError("Cannot open {}".format(self.path))
+            try:
+                self.seek(camera)
+                count = self.start
+                ret, image = camera.read()
+                while ret and (self.stop_index is None or count < self.stop_index):
+                    if self.grayscale:
+                        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+                    yield image
+                    for __ in range(self.step - 1):
+                        camera.grab()
+                    count += self.step
+                    ret, image = camera.read()
+            finally:
+                camera.release()
+
+    def seek(self, camera):
+        """Move a capture to the start image.
+
+        Frame seeking is not exact for all the codecs and most backends report the requested position
+        even when the capture landed on a keyframe before it. The images are grabbed one by one from
+        the beginning, except for the backends listed in exact_seek_backends.
+
+        Parameters
+        ----------
+        camera : cv2.VideoCapture
+            Opened capture.
+
+        """
+        if self.start <= 0:
+            return
+        if camera.getBackendName() in self.exact_seek_backends and camera.set(cv2.CAP_PROP_POS_FRAMES, self.start):
+            return
+        for __ in range(self.start):
+            if not camera.grab():
+                break
+
+    def decode(self):
+        """Decode the images in the buffer, run in the background thread.
+
+        """
+        try:
+            for image in self.read():
+                if not self.put(image):
+                    return
+        except Exception as e:
+            self.error = e
+        self.put(None)
+
+    def put(self, image):
+        """Put an image in the buffer, waiting for a free slot until the source is closed.
+
+        Parameters
+        ----------
+        image : ndarray
+            Image, None to signal the end of the source.
+
+        Returns
+        -------
+        bool
+            False if the source was closed.
+
+        """
+        while not self.stop.is_set():
+            try:
+                self.buffer.put(image, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def close(self):
+        """Stop the decoding and release the source.
+
+        """
+        self.stop.set()
+        if self.thread is not None:
+            self.thread.join()
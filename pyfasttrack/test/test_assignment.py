@@ -0,0 +1,73 @@
+from ..assignment import AssignmentSolver, IncrementalSolver, ScipySolver
+from ..tracker import Tracker
+import numpy as np
+import pytest
+
+
+def test_incremental_solver():
+    rng = np.random.default_rng(0)
+    for i in range(500):
+        n_rows, n_cols = rng.integers(1, 15, 2)
+        cost = rng.uniform(0, 10, (n_rows, n_cols))
+        if i % 2:
+            # Ties
+            cost = np.round(cost)
+        valid = rng.uniform(size=cost.shape) < rng.uniform(0.1, 1)
+        ref = ScipySolver().solve(np.where(valid, cost, AssignmentSolver.get_forbidden_cost(cost[valid])), valid)
+        test = IncrementalSolver().solve(cost, valid)
+        assert np.all(valid[test])
+        assert len(np.unique(test[0])) == len(np.unique(test[1])) == len(test[0])
+        assert len(test[0]) == len(ref[0])
+        assert np.sum(cost[test]) == pytest.approx(np.sum(cost[ref]))
+
+
+def test_nearest_fast_path(monkeypatch):
+    def fail(*args):
+        raise AssertionError("The nearest neighbor matching is not accepted")
+
+    cost = np.array([[1, 5, 9], [6, 2, 8], [9, 9, 9]], dtype=float)
+    valid = cost < 9
+    monkeypatch.setattr(IncrementalSolver, "augment", staticmethod(fail))
+    row, col = IncrementalSolver().solve(cost, valid)
+    assert row.tolist() == [0, 1] and col.tolist() == [0, 1]
+    monkeypatch.undo()
+    # Both rows prefer the first column
+    cost[1, 0] = 0.5
+    row, col = IncrementalSolver().solve(cost, cost < 9)
+    assert row.tolist() == [0, 1] and col.tolist() == [0, 1]
+    row, col = IncrementalSolver().solve(np.zeros((2, 0)), np.zeros((2, 0), dtype=bool))
+    assert len(row) == len(col) == 0
+
+
+def test_tracker_solver():
+    params = {"spot": "0", "normDist": 1, "normAngle": 0.5 *
+              np.pi, "maxDist": 10, "normArea": 2, "normPerim": 0, "maxTime": 2}
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(0, 100, (40, 2))
+    sequence = []
+    for __ in range(20):
+        positions += rng.normal(0, 3, positions.shape)
+        visible = rng.uniform(size=len(positions)) > 0.1
+        sequence.append([{"0": {"center": tuple(i), "orientation": 0}, "3": {"area": 50, "perim": 20}}
+                         for i in positions[visible]])
+
+    class CountingSolver(IncrementalSolver):
+        calls = 0
+
+        def solve(self, cost, valid):
+            CountingSolver.calls += 1
+            return super().solve(cost, valid)
+
+    # The 1e34 cost of the dense problem degrades the precision of linear_sum_assignment, not of the sparse one
+    tracker = Tracker(dict(params, sparse=1))
+    ref = [tracker.initialize_detections(sequence[0])]
+    ref.extend(tracker.process_detections(i) for i in sequence[1:])
+    for sparse in (0, 1):
+        for tracker in (Tracker(dict(params, sparse=sparse, solver=1)), Tracker(dict(params, sparse=sparse),
+                                                                                 solver=CountingSolver())):
+            assert isinstance(tracker.get_solver(), IncrementalSolver)
+            test = [tracker.initialize_detections(sequence[0])]
+            test.extend(tracker.process_detections(i) for i in sequence[1:])
+            for i, j in zip(ref, test):
+                assert np.array_equal(i.data, j.data)
+    assert CountingSolver.calls > 0
@@ -0,0 +1,45 @@
+from ..background import Background
+import toml
+import cv2
+import numpy as np
+import pytest
+
+
+def test_estimate():
+    params = toml.load(
+        "./test/data/images/Groundtruth/Tracking_Result/cfg.toml")["parameters"]
+    ref = cv2.imread(
+        "./test/data/images/Groundtruth/Tracking_Result/background.pgm", cv2.IMREAD_GRAYSCALE)
+    test = Background.from_params(params).estimate(
+        "./test/data/images/frame_%06d.pgm", params["nBack"])
+    assert np.array_equal(test, ref)
+    test = Background.from_params(params).estimate(
+        "./test/data/images/", params["nBack"])
+    assert np.array_equal(test, ref)
+
+
+@pytest.mark.parametrize("method, reference", [("min", np.min), ("max", np.max), ("mean", np.mean), ("median", np.median)])
+@pytest.mark.parametrize("n, dtype", [(7, np.uint8), (8, np.uint8), (8, np.uint16), (7, np.float32)])
+def test_compute(method, reference, n, dtype):
+    rng = np.random.default_rng(0)
+    images = rng.integers(0, 256, (n, 50, 40)).astype(dtype)
+    ref = np.rint(reference(images, axis=0)).astype(dtype)
+    # Small memory to compute the median by bands of a few rows
+    test = Background(method, memory=2000).compute(iter(images))
+    assert test.dtype == dtype
+    assert np.array_equal(test, ref)
+    with pytest.raises(ValueError):
+        Background(method).compute([])
+
+
+def test_update():
+    background = Background()
+    image = np.full((10, 10), 100, dtype=np.uint8)
+    assert np.array_equal(background.update(image), image)
+    for __ in range(3):
+        test = background.update(np.full((10, 10), 200, dtype=np.uint8), 0.5)
+    assert np.all(test == 188)
+    background.compute([image, image])
+    assert np.all(background.update(np.zeros((10, 10), dtype=np.uint8), 0.1) == 90)
+    with pytest.raises(ValueError):
+        Background("mode")
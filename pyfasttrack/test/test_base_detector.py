@@ -1,5 +1,6 @@
 import pytest
-import base_detector as detection
+from .. import base_detector as detection
+from ..data import Detections
 import cv2
 import abc
 import numpy as np
@@ -57,3 +58,133 @@ def test_process():
     test = detector.process(mask)
     assert not deepdiff.DeepDiff(
         ref, test[0]["2"], ignore_order=True, significant_digits=3)
+
+
+def reference_process(detector, masks):
+    """Per-object implementation of BaseDetector.process before the batched features."""
+    def get_features(mask):
+        moments = cv2.moments(mask)
+        x = moments["m10"] / moments["m00"]
+        y = moments["m01"] / moments["m00"]
+        i = moments["mu20"]
+        j = moments["mu11"]
+        k = moments["mu02"]
+        if i + j - k != 0:
+            orientation = (0.5 * np.arctan((2 * j) / (i - k)) +
+                           (i < k) * (np.pi * 0.5))
+            orientation += 2 * np.pi * (orientation < 0)
+            orientation = (2 * np.pi - orientation)
+        else:
+            orientation = 0
+        maj_axis = 2 * np.sqrt((((i + k) + np.sqrt((i - k) * (i - k) + 4 * j * j)) * 0.5) / moments["m00"])
+        min_axis = 2 * np.sqrt((((i + k) - np.sqrt((i - k) * (i - k) + 4 * j * j)) * 0.5) / moments["m00"])
+        return {"center": [x, y], "orientation": orientation, "major_axis": maj_axis, "minor_axis": min_axis}
+
+    detections = []
+    for mask, coordinate in masks:
+        contours, _ = cv2.findContours(
+            mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        data = {"area": cv2.contourArea(
+            contours[0]), "perim": cv2.arcLength(contours[0], True)}
+        body = get_features(mask)
+        rot = cv2.getRotationMatrix2D(center=(
+            mask.shape[1]/2, mask.shape[0]/2), angle=-(body["orientation"]*180)/np.pi, scale=1)
+        new_size = [mask.shape[0]*np.abs(rot[0, 1]) + mask.shape[1]*np.abs(rot[0, 0]),
+                    mask.shape[0]*np.abs(rot[0, 0]) + mask.shape[1]*np.abs(rot[0, 1])]
+        rot[0, 2] += new_size[0]/2 - mask.shape[1]/2
+        rot[1, 2] += new_size[1]/2 - mask.shape[0]/2
+        rotated_mask = cv2.warpAffine(mask, rot, np.intp(new_size))
+        dist = np.sum(rotated_mask, axis=0, dtype=np.float64)
+        dist /= np.sum(dist)
+        indexes = np.arange(1, len(dist)+1, dtype=np.float64)
+        mean = np.sum(indexes*dist)
+        sd = np.sqrt(np.sum((indexes-mean)**2*dist))
+        skew = (np.sum(indexes**3*dist) -
+                3 * mean * sd**2 - mean**3) / sd**3
+        is_left = skew > 0
+        if is_left:
+            body["orientation"] = detector.modulo(body["orientation"] - np.pi)
+        body_center = np.intp(
+            rot @ np.asarray([body["center"][0], body["center"][1], 1]))
+        rot = cv2.invertAffineTransform(rot)
+        parts = []
+        for part_mask, offset in ((rotated_mask[:, body_center[0]::], body_center[0]),
+                                  (rotated_mask[:, 0:body_center[0]], 0)):
+            part = get_features(part_mask)
+            a = rot @ np.asarray([part["center"][0] + offset, part["center"][1], 1])
+            part["center"][0] = a[0] + coordinate[0]
+            part["center"][1] = a[1] + coordinate[1]
+            part["orientation"] = part["orientation"] - \
+                np.pi * (part["orientation"] > np.pi)
+            part["orientation"] = detector.modulo(
+                part["orientation"] + body["orientation"] + np.pi * (np.abs(part["orientation"]) > 0.5 * np.pi))
+            parts.append(part)
+        tail, head = parts
+        body["center"][0] += coordinate[0]
+        body["center"][1] += coordinate[1]
+        if is_left:
+            detections.append({"3": data, "2": body, "1": tail, "0": head})
+        else:
+            detections.append({"3": data, "2": body, "0": tail, "1": head})
+    return detections
+
+
+def random_masks(rng, n):
+    masks = []
+    for __ in range(n):
+        mask = np.zeros((rng.integers(20, 60), rng.integers(20, 60)), dtype=np.uint8)
+        center = (mask.shape[1] // 2, mask.shape[0] // 2)
+        major = int(rng.integers(8, min(mask.shape) // 2 - 1))
+        axes = (major, int(rng.integers(2, major // 2 + 1)))
+        cv2.ellipse(mask, center, axes, rng.uniform(0, 360), 0, 360, 255, -1)
+        # Asymmetric objects, a bump on one side of the ellipse
+        cv2.circle(mask, (center[0] + axes[0] // 2, center[1]), max(axes[1] // 2, 1), 255, -1)
+        masks.append((mask, [int(rng.integers(0, 1000)), int(rng.integers(0, 1000))]))
+    return masks
+
+
+def test_process_batch():
+    mask = cv2.imread("./test/data/assymetric_left.png", cv2.IMREAD_GRAYSCALE)
+    mask = cv2.resize(mask, (586, 586), interpolation=cv2.INTER_NEAREST)
+    masks = [(mask, [0, 0]), (np.rot90(mask, 2).copy(), [10, 20]),
+             (np.rot90(mask, 1).copy(), [3, 7]), (scipy.ndimage.rotate(mask, 35), [5, 5])]
+    masks += random_masks(np.random.default_rng(0), 40)
+
+    class DetectorInstance(detection.BaseDetector):
+        def detect(self, image):
+            return image
+
+    detector = DetectorInstance()
+    test = detector.process(masks)
+    ref = Detections.from_dicts(reference_process(detector, masks))
+    for name in Detections.dtype.names:
+        assert np.allclose(test.data[name], ref.data[name], rtol=1e-9, atol=1e-9), name
+
+
+def test_get_orientation_analytic():
+    mask = cv2.imread("./test/data/assymetric_left.png", cv2.IMREAD_GRAYSCALE)
+    mask = cv2.resize(mask, (586, 586), interpolation=cv2.INTER_NEAREST)
+    detector = instance()
+    for rotation, orientation in [(0, 0), (2, np.pi), (1, 0.5 * np.pi)]:
+        rotated = np.rot90(mask, rotation).copy()
+        ref = detector.get_features(rotated)
+        is_left, __, __ = detector.get_direction(rotated, ref)
+        test = detector.get_features(rotated)
+        assert detector.get_direction_analytic(rotated, test)[0] == is_left
+        assert pytest.approx(test["orientation"], abs=0.01) == ref["orientation"]
+        assert pytest.approx(np.cos(test["orientation"]), abs=0.01) == np.cos(orientation)
+
+
+def test_get_halves_moments_buffer():
+    detector = instance()
+    buffer = np.full((64, 64), 7, dtype=np.uint8)
+    for mask, __ in random_masks(np.random.default_rng(1), 20):
+        ref = mask.copy()
+        moments = cv2.moments(mask)
+        features = detector.get_features(mask)
+        __, __, rot = detector.get_direction_analytic(mask, features, moments)
+        split = int(rot[0, 0:2] @ features["center"] + rot[0, 2])
+        test = detector.get_halves_moments(mask, moments, rot, split, buffer)
+        expected = detector.get_halves_moments(mask, moments, rot, split)
+        assert np.allclose(test, expected)
+        assert np.array_equal(mask, ref)
@@ -0,0 +1,79 @@
+from ..background import Background
+from ..batch import BatchRunner
+from ..ft_detector import FtDetector
+from ..tracker import Tracker
+import os
+import shutil
+import sqlite3
+import toml
+import cv2
+import numpy as np
+import pytest
+
+
+def reference(paths, background):
+    params = toml.load(
+        "./test/data/images/Groundtruth/Tracking_Result/cfg.toml")["parameters"]
+    detector = FtDetector(params)
+    detector.set_background(background)
+    tracker = Tracker(params, detector)
+    ref = [tracker.initialize(cv2.imread(paths[0], cv2.IMREAD_GRAYSCALE))]
+    ref.extend(tracker.process(cv2.imread(i, cv2.IMREAD_GRAYSCALE))
+               for i in paths[1:])
+    return np.concatenate([i.data for i in ref])
+
+
+def read(path):
+    cnx = sqlite3.connect(path + "/Tracking_Result/tracking.db")
+    test = cnx.execute(
+        "SELECT xBody, yBody, tBody, imageNumber, id FROM tracking").fetchall()
+    cnx.close()
+    return np.asarray(test)
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_batch(workers):
+    os.mkdir("./test/data/tmp/")
+    jobs = []
+    for i, (start, stop) in enumerate([(1, 11), (11, 26), (30, 35)]):
+        os.mkdir("./test/data/tmp/{}".format(i))
+        jobs.append({"path": ["../images/frame_{:06d}.pgm".format(j) for j in range(start, stop)],
+                     "config": "../images/Groundtruth/Tracking_Result/cfg.toml",
+                     "background": "../images/Groundtruth/Tracking_Result/background.pgm",
+                     "output": str(i), "name": "job{}".format(i)})
+    # The background of the second job is estimated
+    del jobs[1]["background"]
+    jobs[2]["background"] = "wrong.pgm"
+    with open("./test/data/tmp/manifest.toml", "w") as f:
+        toml.dump({"job": jobs}, f)
+
+    progress = []
+    runner = BatchRunner("./test/data/tmp/manifest.toml", workers=workers, interval=4,
+                         progress=lambda *args: progress.append(args))
+    # Configurations are read once
+    assert len(runner.configs) == 1
+    summaries = runner.run()
+    assert [i["name"] for i in summaries] == ["job0", "job1", "job2"]
+    assert [i["images"] for i in summaries] == [10, 15, 0]
+    assert summaries[0]["error"] is None and summaries[1]["error"] is None
+    assert isinstance(summaries[2]["error"], IOError)
+    assert runner.progress["job1"] == (15, 15)
+    assert [i for i in progress if i[0] == "job0"] == [
+        ("job0", 0, 10), ("job0", 4, 10), ("job0", 8, 10), ("job0", 10, 10)]
+
+    params = toml.load(
+        "./test/data/images/Groundtruth/Tracking_Result/cfg.toml")["parameters"]
+    for i, (start, stop) in enumerate([(1, 11), (11, 26)]):
+        paths = ["./test/data/images/frame_{:06d}.pgm".format(j)
+                 for j in range(start, stop)]
+        if i == 0:
+            background = cv2.imread(
+                "./test/data/images/Groundtruth/Tracking_Result/background.pgm", cv2.IMREAD_GRAYSCALE)
+        else:
+            background = Background.from_params(
+                params).estimate(paths, params["nBack"])
+        ref = reference(paths, background)
+        test = read("./test/data/tmp/{}".format(i))
+        assert np.allclose(test, np.column_stack(
+            [ref[j] for j in ("xBody", "yBody", "tBody", "imageNumber", "id")]))
+    shutil.rmtree("./test/data/tmp/")
@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))))
+
+# Smallest run of each benchmark, to catch the benchmarks broken by a change of the package
+SMOKE = {"bench_tracker": "run(10, 2)",
+         "bench_motion": "run(10, 2, 2, 8)",
+         "bench_occlusion": "run(10, 2, 1, 1)",
+         "bench_assignment": "run(IncrementalSolver(), *get_tracking_problem(20, np.random.default_rng(0)), repeat=1)",
+         "bench_result": "run(NpzBackend, load_npz, 10, 2, 1)",
+         "bench_background": "run(Background.methods[0], [np.zeros((8, 8), dtype=np.uint8)] * 3)",
+         "bench_features": "run(MaskDetector().process, random_masks(np.random.default_rng(0), 5), repeat=1)",
+         "bench_import": "run('pyfasttrack.data', repeat=1)"}
+
+
+def test_benchmarks_listed():
+    names = {i[:-3] for i in os.listdir(os.path.join(ROOT, "benchmarks"))
+             if i.startswith("bench_") and i.endswith(".py")}
+    assert names == set(SMOKE)
+
+
+@pytest.mark.parametrize("name", sorted(SMOKE))
+def test_benchmark(name):
+    code = "from benchmarks.{} import *\n{}".format(name, SMOKE[name])
+    process = subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                             capture_output=True, text=True)
+    assert process.returncode == 0, process.stderr
+
+
+def test_synthetic_detector():
+    code = """from benchmarks.synthetic import SyntheticDetector
+import numpy as np
+detector = SyntheticDetector(50, speed=15)
+start = detector.position.copy()
+detections = detector.process(None)
+assert len(detections) == 50
+assert np.array_equal(np.sort(detections.data["headMajorAxisLength"]), np.arange(50))
+assert np.allclose(np.hypot(*(detector.position - start).T), 15, atol=6)
+detector = SyntheticDetector(1000, hide=0.2, show=0.1)
+sizes = [len(detector.process(None)) for __ in range(30)]
+# Stationary fraction of visible objects show / (hide + show)
+assert 250 < np.mean(sizes[20:]) < 420
+"""
+    process = subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                             capture_output=True, text=True)
+    assert process.returncode == 0, process.stderr
@@ -3,6 +3,9 @@ import data
 import deepdiff
 import os
 import shutil
+import pytest
+import sqlite3
+import numpy as np
 
 
 def test_write_configuration():
@@ -53,3 +56,250 @@ def test_add_data_result():
     test = result.add_data(dat)
     del result  # Close database to delete it avoiding error on windows
     shutil.rmtree("./test/data/tmp/")
+
+
+def test_detections():
+    dat = dict()
+    dat["0"] = {"center": [1, 2], "orientation": 3,
+                "minor_axis": 4, "major_axis": 5}
+    dat["1"] = {"center": [6, 7], "orientation": 8,
+                "minor_axis": 9, "major_axis": 10}
+    dat["2"] = {"center": [11, 12], "orientation": 13,
+                "minor_axis": 14, "major_axis": 15}
+    dat["3"] = {"area": 16, "perim": 17, "time": 18, "id": 19}
+    test = data.Detections.from_dicts([dat, dat])
+    assert len(test) == 2
+    assert test.data["xTail"][1] == 6
+    assert test.data["id"][0] == 19
+    assert not deepdiff.DeepDiff(dat, test[0], ignore_numeric_type_changes=True)
+    assert not deepdiff.DeepDiff([dat, dat], test.to_dicts(), ignore_numeric_type_changes=True)
+    assert len(test[test.data["id"] == 19]) == 2
+    assert len(test[1:]) == 1
+
+
+def test_add_detections_result():
+    os.mkdir("./test/data/tmp/")
+    result = data.Result("./test/data/tmp/")
+    dat = data.Detections(size=3)
+    dat.data["headMajorAxisLength"] = 2
+    dat.data["headMinorAxisLength"] = 1
+    dat.data["id"] = [0, 1, 2]
+    result.add_data(dat)
+    rows = result.cnx.execute(
+        "SELECT headExcentricity, imageNumber, id FROM tracking").fetchall()
+    assert rows == [(np.sqrt(0.75), 0, 0), (np.sqrt(0.75), 0, 1), (np.sqrt(0.75), 0, 2)]
+    del result  # Close database to delete it avoiding error on windows
+    shutil.rmtree("./test/data/tmp/")
+
+
+def test_buffered_result():
+    os.mkdir("./test/data/tmp/")
+    rows = []
+    for buffer_size in [1, 3, 100]:
+        with data.Result("./test/data/tmp/{}".format(buffer_size), buffer_size=buffer_size) as result:
+            for i in range(10):
+                dat = data.Detections(size=i)
+                dat.data["imageNumber"] = i
+                dat.data["id"] = range(i)
+                dat.data["xBody"] = np.arange(i) * 0.5
+                result.add_data(dat)
+                count = result.cnx.execute(
+                    "SELECT COUNT(*) FROM tracking").fetchone()[0]
+                assert count == (i + 1) // buffer_size * buffer_size * \
+                    ((i + 1) // buffer_size * buffer_size - 1) // 2
+        cnx = sqlite3.connect(
+            "./test/data/tmp/{}/Tracking_Result/tracking.db".format(buffer_size))
+        assert cnx.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+        rows.append(cnx.execute("SELECT * FROM tracking").fetchall())
+        cnx.close()
+    assert len(rows[0]) == 45
+    assert rows[0] == rows[1] == rows[2]
+    shutil.rmtree("./test/data/tmp/")
+
+
+def test_async_result(monkeypatch):
+    os.mkdir("./test/data/tmp/")
+    with data.AsyncResult("./test/data/tmp/", queue_size=2, buffer_size=4) as result:
+        for i in range(10):
+            dat = data.Detections(size=2)
+            dat.data["imageNumber"] = i
+            dat.data["id"] = [0, 1]
+            result.add_data(dat)
+            dat.data["id"] = [5, 5]  # Data are copied when queued
+        result.flush()
+        stats = result.get_statistics()
+        assert stats["written"] == 10
+        assert stats["queue_depth"] == 0
+    cnx = sqlite3.connect("./test/data/tmp/Tracking_Result/tracking.db")
+    assert cnx.execute("SELECT imageNumber, id FROM tracking").fetchall() == [
+        (i, j) for i in range(10) for j in range(2)]
+    cnx.close()
+    with pytest.raises(FileExistsError):
+        data.AsyncResult("./test/data/tmp/")
+    def error(self, dat):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(data.Result, "add_data", error)
+    result = data.AsyncResult("./test/data/tmp/tmp/")
+    result.add_data(data.Detections(size=1))
+    with pytest.raises(sqlite3.OperationalError):
+        result.flush()
+    with pytest.raises(sqlite3.OperationalError):
+        result.close()
+    shutil.rmtree("./test/data/tmp/")
+
+
+def test_async_result_error():
+    class FailingBackend(data.NpzBackend):
+        def write(self, columns):
+            if np.any(columns["imageNumber"] == 3):
+                raise OSError("No space left on device")
+            super().write(columns)
+
+    os.mkdir("./test/data/tmp/")
+    result = data.AsyncResult("./test/data/tmp/", backend=FailingBackend)
+    for i in range(10):
+        dat = data.Detections(size=2)
+        dat.data["imageNumber"] = i
+        try:
+            result.add_data(dat)
+        except OSError:
+            break
+    # The error is sticky, the writing never restarts
+    for call in (result.flush, lambda: result.add_data(dat), result.flush, result.close, result.close):
+        with pytest.raises(OSError):
+            call()
+    test = data.NpzBackend.read("./test/data/tmp/Tracking_Result/")
+    assert list(test["imageNumber"]) == [0, 0, 1, 1, 2, 2]
+    shutil.rmtree("./test/data/tmp/")
+
+
+def test_npz_backend():
+    os.mkdir("./test/data/tmp/")
+    for backend in [data.SqliteBackend, data.NpzBackend]:
+        with data.Result("./test/data/tmp/{}".format(backend.__name__), buffer_size=3, backend=backend) as result:
+            for i in range(10):
+                dat = data.Detections(size=i)
+                dat.data["imageNumber"] = i
+                dat.data["id"] = range(i)
+                dat.data["xBody"] = np.arange(i) * 0.5
+                dat.data["headMajorAxisLength"] = 2
+                dat.data["headMinorAxisLength"] = 1
+                result.add_data(dat)
+    cnx = sqlite3.connect(
+        "./test/data/tmp/SqliteBackend/Tracking_Result/tracking.db")
+    ref = cnx.execute("SELECT * FROM tracking").fetchall()
+    cnx.close()
+    test = data.NpzBackend.read("./test/data/tmp/NpzBackend/Tracking_Result/")
+    assert len(os.listdir("./test/data/tmp/NpzBackend/Tracking_Result/tracking")) == 4
+    assert list(test.keys()) == list(data.Result.columns)
+    assert np.array_equal(np.asarray(ref, dtype=np.float64), np.column_stack(
+        list(test.values())), equal_nan=True)
+    test = data.NpzBackend.read(
+        "./test/data/tmp/NpzBackend/Tracking_Result/", ["id"])
+    assert list(test.keys()) == ["id"]
+    sqlite = data.SqliteBackend.read(
+        "./test/data/tmp/SqliteBackend/Tracking_Result/", ["xBody", "imageNumber", "id"])
+    for key, value in sqlite.items():
+        assert np.array_equal(value, data.NpzBackend.read(
+            "./test/data/tmp/NpzBackend/Tracking_Result/", [key])[key])
+
+    # Other files are ignored and the chunks are ordered by number
+    folder = "./test/data/tmp/NpzBackend/Tracking_Result/tracking/"
+    os.rename(folder + "chunk_000003.npz", folder + "chunk_1000000.npz")
+    for name in ["notes.txt", "chunk_000004.npz.tmp"]:
+        with open(folder + name, "w") as f:
+            f.write("partial")
+    chunks = list(data.NpzBackend.iter_chunks(
+        "./test/data/tmp/NpzBackend/Tracking_Result/", ["imageNumber"]))
+    assert [len(i["imageNumber"]) for i in chunks] == [3, 12, 21, 9]
+    assert list(np.concatenate([i["imageNumber"] for i in chunks])) == list(
+        np.repeat(np.arange(10), np.arange(10)))
+    backend = data.NpzBackend("./test/data/tmp/NpzBackend/Tracking_Result/", resume=True)
+    assert backend.chunk == 1000001
+    shutil.rmtree("./test/data/tmp/")
+
+
+def test_result_backend():
+    class PartialBackend(data.ResultBackend):
+        def __init__(self, path, resume=False):
+            pass
+
+        def write(self, columns):
+            pass
+
+        def close(self):
+            pass
+
+    with pytest.raises(TypeError):
+        PartialBackend("./test/data/tmp/")
+
+
+def test_reader():
+    os.mkdir("./test/data/tmp/")
+    shutil.copy("./test/data/images/Groundtruth/Tracking_Result/tracking.db",
+                "./test/data/tmp/tracking.db")
+    with data.Reader("./test/data/tmp/tracking.db") as reader:
+        ref = np.asarray(reader.cnx.execute(
+            "SELECT xBody, yBody, imageNumber, id FROM tracking").fetchall(), dtype=np.float64)
+        indexes = [i[1] for i in reader.cnx.execute(
+            "PRAGMA index_list(tracking)")]
+        assert "imageNumberIndex" in indexes and "idIndex" in indexes
+        reader.chunk_size = 7
+        ids = reader.get_ids()
+        assert np.array_equal(ids, np.unique(ref[:, 3]))
+        assert np.array_equal(reader.get_image_numbers(), np.unique(ref[:, 2]))
+        test = reader.get_trajectory(ids[1], ["xBody", "yBody", "imageNumber"])
+        traj = ref[ref[:, 3] == ids[1]]
+        assert np.array_equal(test, traj[np.argsort(traj[:, 2]), 0:3])
+        test = reader.get_image(3, ["xBody", "id"])
+        image = ref[ref[:, 2] == 3]
+        assert np.array_equal(test, image[np.argsort(image[:, 3])][:, [0, 3]])
+        assert len(reader.get_images(0, 5)) == np.count_nonzero(ref[:, 2] < 5)
+        assert len(reader.get_trajectory(-1)) == 0
+        count = 0
+        for idty, trajectory in reader.iter_trajectories(["imageNumber"]):
+            assert len(trajectory) == np.count_nonzero(ref[:, 3] == idty)
+            assert np.all(np.diff(trajectory[:, 0]) > 0)
+            count += len(trajectory)
+        assert count == len(ref)
+        assert [i for i, __ in reader.iter_images()] == list(
+            reader.get_image_numbers())
+        with pytest.raises(KeyError):
+            reader.get_image(0, ["wrong"])
+    shutil.rmtree("./test/data/tmp/")
+
+
+def test_resume_result():
+    os.mkdir("./test/data/tmp/")
+    for backend in [data.SqliteBackend, data.NpzBackend]:
+        path = "./test/data/tmp/{}".format(backend.__name__)
+        with data.Result(path, buffer_size=3, backend=backend) as result:
+            for i in range(10):
+                dat = data.Detections(size=2)
+                dat.data["imageNumber"] = i
+                dat.data["id"] = [0, 1]
+                result.add_data(dat)
+        # Resume after the image 5, the rows written after are replaced
+        with data.Result(path, buffer_size=3, backend=backend, resume=6) as result:
+            for i in range(6, 12):
+                dat = data.Detections(size=1)
+                dat.data["imageNumber"] = i
+                dat.data["id"] = 2
+                result.add_data(dat)
+        if backend is data.SqliteBackend:
+            cnx = sqlite3.connect(path + "/Tracking_Result/tracking.db")
+            test = np.asarray(cnx.execute(
+                "SELECT imageNumber, id FROM tracking").fetchall()).T
+            cnx.close()
+        else:
+            test = data.NpzBackend.read(
+                path + "/Tracking_Result/", ["imageNumber", "id"]).values()
+            test = np.asarray(list(test))
+        assert list(test[0]) == [0, 0, 1, 1, 2, 2, 3, 3, 4,
+                                 4, 5, 5, 6, 7, 8, 9, 10, 11]
+        assert list(test[1]) == [0, 1] * 6 + [2] * 6
+
+    with pytest.raises(FileNotFoundError):
+        data.Result("./test/data/tmp/wrong", resume=0)
+    shutil.rmtree("./test/data/tmp/")
@@ -2,6 +2,7 @@ from ..ft_detector import FtDetector
 import toml
 import cv2
 import pytest
+import numpy as np
 
 
 def test_detect():
@@ -31,3 +32,172 @@ def test_detect():
                          0.001) == pytest.approx(327.727, 0.001)
     assert pytest.approx(test[0]["1"]["orientation"],
                          0.01) == pytest.approx(6.10226, 0.01)
+
+
+def test_analytic():
+    params = toml.load("./test/data/cfg.toml")["parameters"]
+    ft = FtDetector(params)
+    background = cv2.imread("./test/data/background.pgm", cv2.IMREAD_GRAYSCALE)
+    ft.set_background(background)
+    image = cv2.imread("./test/data/frame.pgm", cv2.IMREAD_GRAYSCALE)
+    ref = ft.process(image)
+    ft.analytic = True
+    test = ft.process(image)
+    assert len(test) == len(ref)
+    for name in ref.data.dtype.names:
+        diff = np.abs(ref.data[name] - test.data[name])
+        if name in ("tHead", "tTail", "tBody"):
+            diff = np.minimum(diff, 2 * np.pi - diff)
+            assert np.all(diff < 0.02)
+        else:
+            assert np.all(diff < 0.5)
+
+
+def test_detect_masks():
+    params = toml.load("./test/data/cfg.toml")["parameters"]
+    ft = FtDetector(params)
+    background = cv2.imread("./test/data/background.pgm", cv2.IMREAD_GRAYSCALE)
+    ft.set_background(background)
+    image = cv2.imread("./test/data/frame.pgm", cv2.IMREAD_GRAYSCALE)
+    test = ft.detect(image)
+    assert len(test) == 14
+    binary = cv2.threshold(cv2.subtract(background, image), int(
+        params["thresh"]), 255, cv2.THRESH_BINARY)[1]
+    contours = [i for i in cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)[0]
+                if int(params["minArea"]) < cv2.contourArea(i) < int(params["maxArea"])]
+    for (mask, corner), contour in zip(test, contours):
+        rect = cv2.boundingRect(contour)
+        ref = np.zeros_like(image)
+        cv2.drawContours(ref, [contour], 0, 255, -1, 8)
+        assert tuple(corner) == rect[0:2]
+        assert np.array_equal(
+            mask, ref[rect[1]:rect[1] + rect[3], rect[0]:rect[0] + rect[2]])
+
+
+def test_rois():
+    params = toml.load("./test/data/cfg.toml")["parameters"]
+    params["morph"] = cv2.MORPH_OPEN
+    ft = FtDetector(params)
+    background = cv2.imread("./test/data/background.pgm", cv2.IMREAD_GRAYSCALE)
+    ft.set_background(background)
+    image = cv2.imread("./test/data/frame.pgm", cv2.IMREAD_GRAYSCALE)
+    full = ft.process(image).data
+    full = full[np.argsort(full["xBody"])]
+    ref = full[full["xBody"] > 300]
+
+    def check(test, ref, shift=0):
+        test = test.data[np.argsort(test.data["xBody"])]
+        assert len(test) == len(ref)
+        for name in ref.dtype.names:
+            if name.startswith("x"):
+                assert np.allclose(test[name] + shift, ref[name])
+            else:
+                assert np.allclose(test[name], ref[name])
+
+    # Regions set by set_rois are in the full frame
+    ft.set_rois([(300, 0, 224, 338)])
+    check(ft.process(image), ref)
+    ft.set_rois([[[300, 0], [523, 0], [523, 337], [300, 337]]])
+    check(ft.process(image), ref)
+    mask = np.zeros_like(image)
+    mask[:, 300:] = 1
+    ft.set_rois(mask=mask)
+    check(ft.process(image), ref)
+    ft.set_rois([(0, 0, 300, 338), (300, 0, 300, 400)])
+    check(ft.process(image), full)
+    ft.set_rois([(0, 0, 600, 400)], mask)
+    check(ft.process(image), ref)
+    triangle = np.asarray([[0, 0], [523, 0], [0, 337]])
+    ft.set_rois([triangle])
+    test = ft.detect(image)
+    assert 0 < len(test) < len(full)
+    for obj, corner in test:
+        points = cv2.findNonZero(obj)[:, 0] + corner
+        assert np.all(points[:, 0] / 523 + points[:, 1] / 337 <= 1.01)
+
+    # FastTrack region is relative to its corner
+    ft.set_rois()
+    params["xTop"], params["yTop"], params["xBottom"], params["yBottom"] = 300, 0, 524, 338
+    ft.set_params(params)
+    check(ft.process(image), ref, 300)
+
+
+def test_rois_morphology():
+    params = toml.load("./test/data/cfg.toml")["parameters"]
+    params["morph"] = cv2.MORPH_CLOSE
+    params["morphSize"] = 3
+    params["minArea"] = 0
+    ft = FtDetector(params)
+    background = cv2.imread("./test/data/background.pgm", cv2.IMREAD_GRAYSCALE)
+    ft.set_background(background)
+    image = cv2.imread("./test/data/frame.pgm", cv2.IMREAD_GRAYSCALE)
+    full = ft.process(image).data
+    # The region edges cut objects
+    x, y = int(full["xBody"][0]), int(full["yBody"][1])
+    binary = cv2.threshold(cv2.subtract(background, image), int(
+        params["thresh"]), 255, cv2.THRESH_BINARY)[1]
+    element = cv2.getStructuringElement(int(params["morphType"]), (7, 7), (3, 3))
+    binary = cv2.morphologyEx(binary, int(params["morph"]), element)
+
+    # Reference: morphology on the whole image, then cropped as before the regions were cropped first
+    for rect in [(x, 0, image.shape[1] - x, image.shape[0]), (0, y, x, image.shape[0] - y)]:
+        ft.set_rois([rect])
+        test = ft.detect(image)
+        crop = binary[rect[1]:rect[1] + rect[3], rect[0]:rect[0] + rect[2]]
+        contours = [i for i in cv2.findContours(crop, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)[0]
+                    if 0 < cv2.contourArea(i) < int(params["maxArea"])]
+        assert len(test) == len(contours)
+        for (mask, corner), contour in zip(test, contours):
+            bounding = cv2.boundingRect(contour)
+            ref = np.zeros((bounding[3], bounding[2]), dtype=np.uint8)
+            cv2.drawContours(ref, [contour], 0, 255, -1, 8, offset=(-bounding[0], -bounding[1]))
+            assert tuple(corner) == (bounding[0] + rect[0], bounding[1] + rect[1])
+            assert np.array_equal(mask, ref)
+
+
+def test_buffers():
+    params = toml.load("./test/data/cfg.toml")["parameters"]
+    params["morph"] = cv2.MORPH_OPEN
+    ft = FtDetector(params)
+    background = cv2.imread("./test/data/background.pgm", cv2.IMREAD_GRAYSCALE)
+    ft.set_background(background)
+    image = cv2.imread("./test/data/frame.pgm", cv2.IMREAD_GRAYSCALE)
+    ref = ft.detect(image)
+    buffers = {i: j for i, j in ft.buffers.items()}
+    assert set(buffers) == {("binary", 0), ("morph", 0)}
+    # Buffers are written by OpenCV and reused for the next images
+    binary = cv2.threshold(cv2.subtract(background, image), int(
+        params["thresh"]), 255, cv2.THRESH_BINARY)[1]
+    assert np.array_equal(buffers[("binary", 0)], binary)
+    for __ in range(2):
+        test = ft.detect(image)
+        assert all(ft.buffers[i] is j for i, j in buffers.items())
+        assert len(test) == len(ref)
+        for (i, j), (k, l) in zip(ref, test):
+            assert np.array_equal(i, k) and tuple(j) == tuple(l)
+
+    ft.reuse_buffers = False
+    ft.set_params(params)
+    test = ft.detect(image)
+    assert ft.buffers == {}
+    assert all(np.array_equal(i, k) for (i, __), (k, __) in zip(ref, test))
+
+
+def test_params_changed():
+    params = toml.load("./test/data/cfg.toml")["parameters"]
+    ft = FtDetector(params)
+    background = cv2.imread("./test/data/background.pgm", cv2.IMREAD_GRAYSCALE)
+    ft.set_background(background)
+    image = cv2.imread("./test/data/frame.pgm", cv2.IMREAD_GRAYSCALE)
+    assert len(ft.detect(image)) == 14
+    # The shared params dict is edited between runs
+    params["maxArea"] = 0
+    assert len(ft.detect(image)) == 0
+    params["maxArea"] = 170
+    params["xTop"], params["yTop"], params["xBottom"], params["yBottom"] = 300, 0, 524, 338
+    test = ft.detect(image)
+    assert 0 < len(test) < 14
+    ref = FtDetector(dict(params))
+    ref.set_background(background)
+    assert all(np.array_equal(i, k) and tuple(j) == tuple(l)
+               for (i, j), (k, l) in zip(ref.detect(image), test))
@@ -0,0 +1,17 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))))
+
+
+def test_lazy_import():
+    code = ("import sys, pyfasttrack, pyfasttrack.tracker, pyfasttrack.pipeline\n"
+            "assert pyfasttrack.data.Result\n"
+            "print(','.join(i for i in ('sentry_sdk', 'scipy', 'ultralytics') if i in sys.modules))")
+    env = dict(os.environ)
+    env.pop("PYFASTTRACK_TELEMETRY", None)
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    assert output.strip() == ""
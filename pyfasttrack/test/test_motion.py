@@ -0,0 +1,43 @@
+from ..motion import MotionModel
+import numpy as np
+import pytest
+
+
+def test_velocity():
+    model = MotionModel("velocity")
+    model.initialize([[0, 0], [5, 5]])
+    assert np.array_equal(model.predict(), [[0, 0], [5, 5]])
+    model.update([0, 1], [[2, 1], [5, 6]])
+    assert np.array_equal(model.predict(), [[4, 2], [5, 7]])
+    # Object 1 is not observed, its velocity is estimated over two images
+    model.update([0], [[4, 2]])
+    model.add([[50, 50]])
+    assert np.array_equal(model.predict(), [[6, 3], [5, 8], [50, 50]])
+    model.update([1, 2], [[5, 11], [51, 50]])
+    assert np.array_equal(model.state[1], [5, 11, 0, 2.5])
+    model.select(np.array([False, True, True]))
+    assert np.array_equal(model.predict(), [[5, 13.5], [52, 50]])
+
+
+def test_kalman():
+    rng = np.random.default_rng(0)
+    model = MotionModel("kalman", noise=1e-4, measurement_noise=0.25)
+    start = rng.uniform(0, 100, (50, 2))
+    velocity = rng.uniform(-5, 5, (50, 2))
+    model.initialize(start)
+    for t in range(1, 30):
+        model.predict()
+        model.update(np.arange(50), start + velocity * t +
+                     rng.normal(0, 0.5, start.shape))
+    assert np.allclose(model.state[:, 2:4], velocity, atol=0.1)
+    assert np.allclose(model.predict(), start + velocity * 30, atol=1)
+
+
+def test_from_params():
+    assert MotionModel.from_params({"maxDist": 10}) is None
+    assert MotionModel.from_params({"motion": 1}).method == "velocity"
+    model = MotionModel.from_params({"motion": 2, "maxDist": 10})
+    assert model.method == "kalman"
+    assert model.initial_covariance[2, 2] == 100
+    with pytest.raises(ValueError):
+        MotionModel("acceleration")
@@ -0,0 +1,99 @@
+from ..onnx_detector import OnnxDetector
+import numpy as np
+import pickle
+import cv2
+import pytest
+
+# Model with a 64x64 input, 3 anchors, 2 classes and 1 mask prototype equal to the red channel of the input.
+# Anchors 0 and 1 (class 0) overlap on the rectangle, anchor 2 (class 1) is a small box inside it.
+MODEL = "./test/data/yolo_seg.onnx"
+
+
+def image():
+    image = np.zeros((32, 48, 3), dtype=np.uint8)
+    image[8:16, 10:20] = 255
+    return image
+
+
+def test_preprocess():
+    detector = OnnxDetector(
+        {"model": MODEL, "backend": "opencv", "imgsz": 64})
+    blob = detector.blob
+    scale, pad = detector.preprocess(image())
+    assert scale == pytest.approx(64 / 48)
+    assert pad == (0, 10)
+    assert detector.blob is blob
+    assert np.all(blob[:, :, 0:10] == np.float32(114 / 255))
+    assert np.all(blob[:, :, 53:] == np.float32(114 / 255))
+    assert np.all(blob[0, :, 28, 20] == 1)
+    scale, pad = detector.preprocess(image()[:, :, 0])
+    assert detector.blob is blob
+    assert np.all(blob[0, :, 28, 20] == 1)
+
+
+def test_detect():
+    detector = OnnxDetector(
+        {"model": MODEL, "backend": "opencv", "imgsz": 64, "threads": 1})
+    test = detector.detect(image())
+    # Anchor 1 is removed by the non-maximum suppression
+    assert len(test) == 2
+    mask, corner = test[0]
+    assert tuple(corner) == (7, 5)
+    full = np.zeros((32, 48), dtype=np.uint8)
+    full[corner[1]:corner[1] + mask.shape[0],
+         corner[0]:corner[0] + mask.shape[1]] = mask
+    assert np.all(full[image()[:, :, 0] == 0][:] == 0)
+    assert np.count_nonzero(full) > 0.9 * 80
+    detector.classes = [0]
+    assert len(detector.detect(image())) == 1
+    detector.conf = 0.95
+    assert detector.detect(image()) == []
+
+    detector.conf = 0.25
+    test = detector.process(image())
+    assert test[0]["2"]["center"] == pytest.approx([14.5, 11.5], abs=0.5)
+
+
+def test_postprocess_order():
+    detector = OnnxDetector(
+        {"model": MODEL, "backend": "opencv", "imgsz": 64})
+    detector.load()
+    scale, pad = detector.preprocess(image())
+    detector.net.setInput(detector.blob)
+    outputs = detector.net.forward(detector.output_names)
+    ref = detector.postprocess(outputs, scale, pad, (32, 48))
+    assert len(ref) == 2
+    # Prototypes before the predictions
+    test = detector.postprocess(outputs[::-1], scale, pad, (32, 48))
+    assert len(test) == len(ref)
+    for (i, j), (k, l) in zip(ref, test):
+        assert np.array_equal(i, k) and tuple(j) == tuple(l)
+
+
+def test_onnxruntime():
+    pytest.importorskip("onnxruntime")
+    ref = OnnxDetector(
+        {"model": MODEL, "backend": "opencv", "imgsz": 64}).detect(image())
+    detector = OnnxDetector({"model": MODEL, "threads": 1})
+    assert detector.size == (64, 64)
+    test = detector.detect(image())
+    assert len(test) == len(ref)
+    for (i, j), (k, l) in zip(ref, test):
+        assert np.array_equal(i, k) and tuple(j) == tuple(l)
+
+
+def test_pickle():
+    threads = cv2.getNumThreads()
+    detector = OnnxDetector(
+        {"model": MODEL, "backend": "opencv", "imgsz": 64, "threads": 1})
+    # The global OpenCV thread count is left to the caller
+    assert cv2.getNumThreads() == threads
+    ref = detector.detect(image())
+    # Pickled as for the worker processes of a Pipeline with the spawn start method
+    copy = pickle.loads(pickle.dumps(detector))
+    assert copy.net is None and copy.blob is None
+    test = copy.detect(image())
+    assert copy.net is not None
+    assert len(test) == len(ref)
+    for (i, j), (k, l) in zip(ref, test):
+        assert np.array_equal(i, k) and tuple(j) == tuple(l)
@@ -0,0 +1,69 @@
+from ..ft_detector import FtDetector
+from ..tracker import Tracker
+from ..pipeline import Pipeline, ChunkedPipeline
+import toml
+import cv2
+import numpy as np
+import pytest
+
+
+def images():
+    for i in range(1, 31):
+        yield cv2.imread("./test/data/images/frame_{:06d}.pgm".format(i), cv2.IMREAD_GRAYSCALE)
+
+
+def tracker():
+    params = toml.load(
+        "./test/data/images/Groundtruth/Tracking_Result/cfg.toml")["parameters"]
+    detector = FtDetector(params)
+    detector.set_background(cv2.imread(
+        "./test/data/images/Groundtruth/Tracking_Result/background.pgm", cv2.IMREAD_GRAYSCALE))
+    return Tracker(params, detector)
+
+
+@pytest.mark.parametrize("workers, queue_size", [(0, None), (2, None), (3, 1)])
+def test_pipeline(workers, queue_size):
+    ref_tracker = tracker()
+    it = images()
+    ref = [ref_tracker.initialize(next(it))] + [ref_tracker.process(i)
+                                                for i in it]
+    test = list(Pipeline(tracker(), workers, queue_size).run(images()))
+    assert len(test) == len(ref)
+    for i, j in zip(ref, test):
+        assert np.array_equal(i.data, j.data)
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_chunked_pipeline(workers):
+    paths = ["./test/data/images/frame_{:06d}.pgm".format(i)
+             for i in range(1, 61)]
+    ref_tracker = tracker()
+    it = (cv2.imread(i, cv2.IMREAD_GRAYSCALE) for i in paths)
+    ref = [ref_tracker.initialize(next(it))] + [ref_tracker.process(i)
+                                                for i in it]
+    pipeline = ChunkedPipeline(tracker(), chunk_size=20,
+                               overlap=5, workers=workers)
+    assert pipeline.get_segments(60) == [(0, 25), (20, 45), (40, None)]
+    test = list(pipeline.run(paths, grayscale=True))
+    assert len(test) == len(ref)
+    mapping = {}
+    for image, (i, j) in enumerate(zip(ref, test)):
+        i = i.data[np.argsort(i.data["xBody"])]
+        j = j.data[np.argsort(j.data["xBody"])]
+        assert np.all(j["imageNumber"] == image)
+        for name in i.dtype.names:
+            if name != "id":
+                assert np.array_equal(i[name], j[name])
+        for k, l in zip(i["id"], j["id"]):
+            assert mapping.setdefault(k, l) == l
+    # Identities are consistent over the whole recording
+    assert len(set(mapping.values())) == len(mapping)
+
+
+@pytest.mark.parametrize("batch_size", [1, 4, 7])
+def test_run_batch(batch_size):
+    ref = list(tracker().run(images()))
+    test = list(tracker().run(images(), batch_size=batch_size))
+    assert len(test) == len(ref)
+    for i, j in zip(ref, test):
+        assert np.array_equal(i.data, j.data)
@@ -0,0 +1,52 @@
+from ..source import FrameSource
+import cv2
+import numpy as np
+import pytest
+
+
+def test_image_sequence():
+    ref = [cv2.imread("./test/data/images/frame_{:06d}.pgm".format(i), cv2.IMREAD_GRAYSCALE)
+           for i in range(1, 11)]
+    paths = ["./test/data/images/frame_{:06d}.pgm".format(i)
+             for i in range(1, 11)]
+    test = list(FrameSource(paths, grayscale=True, buffer_size=2))
+    assert len(test) == 10
+    assert all(np.array_equal(i, j) for i, j in zip(ref, test))
+    test = FrameSource("./test/data/images/frame_%06d.pgm", grayscale=True)
+    for i, j in zip(ref, test):
+        assert np.array_equal(i, j)
+    test.close()
+    test = FrameSource("./test/data/images/frame_00000?.pgm")
+    images = list(test)
+    assert len(images) == 9
+    assert images[0].shape == ref[0].shape + (3,)
+
+
+def test_folder():
+    with FrameSource("./test/data/images/", grayscale=True) as source:
+        test = next(iter(source))
+    ref = cv2.imread("./test/data/images/frame_000001.pgm",
+                     cv2.IMREAD_GRAYSCALE)
+    assert np.array_equal(test, ref)
+
+
+def test_error():
+    with pytest.raises(IOError):
+        list(FrameSource("./test/data/images/wrong.avi"))
+    with pytest.raises(IOError):
+        list(FrameSource(["./test/data/images/wrong.pgm"]))
+
+
+def test_start():
+    ref = list(FrameSource("./test/data/images/frame_%06d.pgm", grayscale=True))
+    for path in ["./test/data/images/frame_%06d.pgm", "./test/data/images/"]:
+        test = list(FrameSource(path, grayscale=True, start=195))
+        assert len(test) == 5
+        assert all(np.array_equal(i, j) for i, j in zip(ref[195:], test))
+    ref = list(FrameSource("./test/data/images/Nascar.mp4", stop=40))
+    for start in [3, 31]:
+        test = list(FrameSource("./test/data/images/Nascar.mp4", start=start, stop=start + 5))
+        assert len(test) == 5
+        # Same pixels as a sequential read, the seek did not land on a keyframe
+        assert all(np.array_equal(i, j) for i, j in zip(ref[start:], test))
+    assert FrameSource("./test/data/images/").get_length() == 200
@@ -1,4 +1,6 @@
 import pytest
+import os
+import shutil
 from ..tracker import Tracker
 import numpy as np
 
@@ -256,3 +258,225 @@ def test_clean():
     assert test_current == []
     assert test_counter == []
     assert test_idty == []
+
+
+def reference_cost(tracker, prev, current):
+    spot = str(int(tracker.params["spot"]))
+    cost = np.zeros((len(prev), len(current)))
+    for i, l in enumerate(prev):
+        for j, k in enumerate(current):
+            distance = np.sqrt((l[spot]["center"][0] - k[spot]["center"][0])**2 + (
+                l[spot]["center"][1] - k[spot]["center"][1])**2)
+            angle = np.abs(tracker.angle_difference(
+                l[spot]["orientation"], k[spot]["orientation"]))
+            area = np.abs(l["3"]["area"] - k["3"]["area"])
+            perim = np.abs(l["3"]["perim"] - k["3"]["perim"])
+            if distance < tracker.params["maxDist"]:
+                cost[i, j] = tracker.compute_cost([distance, angle, area, perim], [
+                    tracker.params["normDist"], tracker.params["normAngle"], tracker.params["normArea"], tracker.params["normPerim"]])
+            else:
+                cost[i, j] = 1e34
+    return cost
+
+
+def random_detections(rng, n, size=100):
+    return [{"0": {"center": (rng.uniform(0, size), rng.uniform(0, size)), "orientation": rng.uniform(0, 2*np.pi)},
+             "3": {"area": rng.uniform(50, 100), "perim": rng.uniform(20, 40)}} for __ in range(n)]
+
+
+def test_cost_matrix():
+    params = {"spot": "0", "normDist": 1, "normAngle": 0.5 *
+              np.pi, "maxDist": 15, "normArea": 2, "normPerim": 0}
+    tracker = Tracker(params)
+    rng = np.random.default_rng(0)
+    for n, m in [(1, 1), (5, 3), (3, 5), (40, 40)]:
+        prev = random_detections(rng, n)
+        current = random_detections(rng, m)
+        cost, valid = tracker.get_cost(prev, current)
+        ref = reference_cost(tracker, prev, current)
+        assert np.array_equal(cost, ref)
+        assert np.array_equal(valid, ref != 1e34)
+
+
+def test_sparse_assignment():
+    params = {"spot": "0", "normDist": 1, "normAngle": 0.5 *
+              np.pi, "maxDist": 10, "normArea": 2, "normPerim": 0}
+    tracker = Tracker(params)
+    sparse_tracker = Tracker(dict(params, sparse=1))
+    rng = np.random.default_rng(0)
+    for n in [0, 1, 10, 200]:
+        prev = random_detections(rng, n, size=1000)
+        current = [{"0": {"center": (i["0"]["center"][0] + rng.uniform(-2, 2), i["0"]["center"][1] + rng.uniform(-2, 2)),
+                          "orientation": i["0"]["orientation"]}, "3": i["3"]} for i in prev]
+        current = [current[i] for i in rng.permutation(n)] + \
+            random_detections(rng, 5, size=1000)
+        assert sparse_tracker.assign(
+            prev, current) == tracker.assign(prev, current)
+
+    # Crowded scenes, the sparse solution is at least as good as the dense one
+    for n, m in [(30, 20), (20, 30), (40, 40)]:
+        prev = random_detections(rng, n, size=50)
+        current = random_detections(rng, m, size=50)
+        cost, __ = tracker.get_cost(prev, current)
+        dense = tracker.assign(prev, current)
+        sparse = sparse_tracker.assign(prev, current)
+        assert sum(i != -1 for i in sparse) == sum(i != -1 for i in dense)
+        assert sum(cost[i, j] for i, j in enumerate(sparse) if j != -1) <= sum(
+            cost[i, j] for i, j in enumerate(dense) if j != -1) + 1e-9
+
+
+def test_process():
+    class DetectorInstance():
+        def process(self, image):
+            return [{"0": {"center": i, "orientation": 0}, "3": {"area": 0, "perim": 0}} for i in image]
+
+    params = {"spot": "0", "normDist": 1, "normAngle": 0, "maxDist": 5,
+              "normArea": 0, "normPerim": 0, "maxTime": 1}
+    tracker = Tracker(params, DetectorInstance())
+    test = tracker.initialize([(0, 0), (10, 10), (20, 20)])
+    assert list(test.data["id"]) == [0, 1, 2]
+    # Object 0 is lost
+    test = tracker.process([(21, 20), (11, 10)])
+    assert list(test.data["id"]) == [1, 2]
+    assert list(test.data["xHead"]) == [11, 21]
+    # Object 0 is deleted, a new object appears
+    test = tracker.process([(12, 10), (50, 50), (22, 20)])
+    assert list(test.data["id"]) == [1, 2, 4]
+    assert list(test.data["xHead"]) == [12, 22, 50]
+    assert list(test.data["imageNumber"]) == [2, 2, 2]
+    assert tracker.id == [1, 2, 4]
+    assert tracker.lost == [0, 0, 0]
+
+
+def test_checkpoint():
+    params = {"spot": "0", "normDist": 1, "normAngle": 0.5 *
+              np.pi, "maxDist": 10, "normArea": 2, "normPerim": 0, "maxTime": 2}
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(0, 200, (30, 2))
+    sequence = []
+    for __ in range(20):
+        positions += rng.normal(0, 2, positions.shape)
+        visible = rng.uniform(size=len(positions)) > 0.1
+        sequence.append([{"0": {"center": tuple(i), "orientation": 0}, "3": {"area": 50, "perim": 20}}
+                         for i in positions[visible]])
+
+    tracker = Tracker(params)
+    ref = [tracker.initialize_detections(sequence[0])]
+    ref.extend(tracker.process_detections(i) for i in sequence[1:])
+
+    os.mkdir("./test/data/tmp/")
+    tracker = Tracker(params)
+    tracker.initialize_detections(sequence[0])
+    for i in sequence[1:10]:
+        tracker.process_detections(i)
+    tracker.save_checkpoint("./test/data/tmp/checkpoint.npz")
+    # The checkpoint is not modified by the tracking that follows
+    tracker.process_detections(sequence[10])
+
+    tracker = Tracker(params)
+    assert tracker.load_checkpoint("./test/data/tmp/checkpoint.npz") == 10
+    test = [tracker.process_detections(i) for i in sequence[10:]]
+    for i, j in zip(ref[10:], test):
+        assert np.array_equal(i.data, j.data)
+    assert os.listdir("./test/data/tmp/") == ["checkpoint.npz"]
+    shutil.rmtree("./test/data/tmp/")
+
+    with pytest.raises(RuntimeError):
+        Tracker(params).get_state()
+
+
+def test_motion():
+    # Two objects cross each other at 10 pixels by image, the nearest last positions swap them
+    def get_sequence():
+        return [[{"0": {"center": (10 * t, 0), "orientation": 0}, "3": {"area": 0, "perim": 0}},
+                 {"0": {"center": (95 - 10 * t, 3), "orientation": 0}, "3": {"area": 0, "perim": 0}}] for t in range(10)]
+
+    params = {"spot": "0", "normDist": 1, "normAngle": 0, "maxDist": 12,
+              "normArea": 0, "normPerim": 0, "maxTime": 2}
+    for motion in (0, 1, 2):
+        tracker = Tracker(dict(params, motion=motion, measurementNoise=0.01))
+        sequence = get_sequence()
+        test = [tracker.initialize_detections(sequence[0])]
+        test.extend(tracker.process_detections(i) for i in sequence[1:])
+        first = [i.data["xHead"][i.data["id"] == 0][0] for i in test]
+        if motion == 0:
+            assert np.any(np.diff(first) < 0)
+        else:
+            assert np.allclose(np.diff(first), 10)
+            assert [list(i.data["id"]) for i in test] == [[0, 1]] * 10
+
+    # A lost object is predicted until it is found again, within a tight motionDist once its velocity is known
+    for sparse in (0, 1):
+        tracker = Tracker(dict(params, motion=1, motionDist=3, sparse=sparse))
+        sequence = [[{"0": {"center": (10 * t, 0), "orientation": 0}, "3": {"area": 0, "perim": 0}},
+                     {"0": {"center": (10 * t, 50), "orientation": 0}, "3": {"area": 0, "perim": 0}}] for t in range(6)]
+        tracker.initialize_detections(sequence[0])
+        tracker.process_detections(sequence[1])
+        assert np.array_equal(tracker.motion.get_gate(12, 3), [3, 3])
+        tracker.process_detections(sequence[2][0:1])
+        test = tracker.process_detections(
+            [sequence[3][0], {"0": {"center": (24, 50), "orientation": 0}, "3": {"area": 0, "perim": 0}}])
+        # Object 1 is predicted at 30 and is lost, the new object has an unknown velocity
+        assert list(test.data["id"]) == [0, 3]
+        assert np.array_equal(tracker.motion.get_gate(12, 3), [3, 3, 12])
+
+    # The motion state is saved in the checkpoint
+    state = tracker.get_state()
+    restored = Tracker(dict(params, motion=1, motionDist=3))
+    restored.set_state(state)
+    for i in sequence[4:]:
+        assert np.array_equal(tracker.process_detections(
+            i).data, restored.process_detections(i).data)
+
+
+def test_lost_pool():
+    params = {"spot": "0", "normDist": 1, "normAngle": 0.5 *
+              np.pi, "maxDist": 10, "normArea": 2, "normPerim": 0, "maxTime": 5}
+    rng = np.random.default_rng(0)
+    grid = np.mgrid[0:300:30, 0:300:30].reshape(2, -1).T.astype(float)
+    sequence = []
+    for __ in range(30):
+        grid += rng.normal(0, 3, grid.shape)
+        visible = rng.uniform(size=len(grid)) > 0.3
+        sequence.append([{"0": {"center": tuple(i), "orientation": 0}, "3": {"area": 50, "perim": 20}}
+                         for i in grid[visible]])
+
+    for sparse in (0, 1):
+        tracker = Tracker(dict(params, sparse=sparse))
+        ref = [tracker.initialize_detections(sequence[0])]
+        ref.extend(tracker.process_detections(i) for i in sequence[1:])
+        tracker = Tracker(dict(params, lostPool=1, sparse=sparse))
+        rows = []
+        assign = tracker.assign
+
+        def counted_assign(prev, current, gate=None):
+            rows.append(len(prev))
+            return assign(prev, current, gate)
+
+        tracker.assign = counted_assign
+        test = [tracker.initialize_detections(sequence[0])]
+        total = []
+        for i in sequence[1:]:
+            found = tracker.lost.count(0)
+            total.append(len(tracker.lost))
+            test.append(tracker.process_detections(i))
+            assert found <= rows[-1] <= total[-1]
+        # Lost objects without any object nearby are left out of the assignment
+        assert sum(rows) < 0.9 * sum(total)
+        for i, j in zip(ref, test):
+            assert np.array_equal(i.data, j.data)
+
+    # Only the lost object close to a current object joins the assignment
+    tracker = Tracker(dict(params, lostPool=1))
+    tracker.initialize_detections([{"0": {"center": (i, 0), "orientation": 0}, "3": {"area": 50, "perim": 20}}
+                                   for i in (0, 50, 100)])
+    tracker.process_detections(
+        [{"0": {"center": (100, 0), "orientation": 0}, "3": {"area": 50, "perim": 20}}])
+    rows = []
+    assign = tracker.assign
+    tracker.assign = lambda prev, current, gate=None: rows.append(
+        len(prev)) or assign(prev, current, gate)
+    test = tracker.process_detections([{"0": {"center": (i, 0), "orientation": 0}, "3": {"area": 50, "perim": 20}}
+                                       for i in (101, 2)])
+    assert rows == [2]
+    assert list(test.data["id"]) == [0, 2]
@@ -0,0 +1,133 @@
+from ..yolo_detector import YoloDetector
+from types import SimpleNamespace
+import numpy as np
+import cv2
+
+# Result objects of ultralytics are replaced by stubs with the same attributes, ultralytics is not needed.
+
+
+class Tensor():
+    """Array with the cpu and numpy methods of a Torch tensor."""
+
+    def __init__(self, array):
+        self.array = np.asarray(array)
+
+    def __getitem__(self, index):
+        return Tensor(self.array[index])
+
+    def __len__(self):
+        return len(self.array)
+
+    def __iter__(self):
+        return (Tensor(i) for i in self.array)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.array
+
+
+def detector(masks):
+    # The model is not loaded, only get_masks is used
+    yolo = YoloDetector.__new__(YoloDetector)
+    yolo.masks = masks
+    return yolo
+
+
+def frame():
+    """Full-frame masks of 3 objects, 2 of them touching the image border, and their boxes."""
+    height, width = 60, 80
+    masks = np.zeros((3, height, width), dtype=np.float32)
+    cv2.ellipse(masks[0], (40, 30), (12, 5), 30, 0, 360, 1, -1)
+    cv2.ellipse(masks[1], (3, 4), (10, 6), 0, 0, 360, 1, -1)
+    cv2.ellipse(masks[2], (75, 55), (9, 7), 60, 0, 360, 1, -1)
+    boxes = []
+    for i in masks:
+        x, y, w, h = cv2.boundingRect(np.uint8(i))
+        # Boxes of the models are floats and can go past the image
+        boxes.append([x - 0.6, y - 0.3, x + w + 0.4, y + h + 0.8])
+    return masks, np.asarray(boxes, dtype=np.float32)
+
+
+def result(shape, boxes, masks=None, xy=None):
+    """Stub of ultralytics.engine.results.Results."""
+    if boxes is not None:
+        boxes = Tensor(boxes)
+        boxes.xyxy = boxes
+    if masks is not None:
+        masks = SimpleNamespace(data=Tensor(masks), xy=xy)
+    return SimpleNamespace(orig_shape=shape, boxes=boxes, masks=masks, obb=None)
+
+
+def paste(detected, shape):
+    """Draw cropped masks back in full-frame masks."""
+    full = np.zeros((len(detected),) + shape, dtype=np.uint8)
+    for i, (mask, (x, y)) in enumerate(detected):
+        assert x >= 0 and y >= 0
+        assert x + mask.shape[1] <= shape[1] and y + mask.shape[0] <= shape[0]
+        full[i, y:y + mask.shape[0], x:x + mask.shape[1]] = mask
+    return full
+
+
+def test_get_masks_full():
+    masks, boxes = frame()
+    stub = result(masks.shape[1:], boxes, masks)
+    yolo = detector("full")
+    test = yolo.get_masks(stub)
+    assert len(test) == 3
+    # Same pixels as the former full-frame masks
+    assert np.array_equal(paste(test, masks.shape[1:]), np.uint8(masks * 255))
+    ref = yolo.process_masks([(np.uint8(i * 255), (0, 0)) for i in masks]).data
+    features = yolo.process_masks(test).data
+    for name in ref.dtype.names:
+        diff = np.abs(features[name] - ref[name])
+        if "Head" in name or "Tail" in name or name.startswith(("head", "tail")):
+            # The head and the tail are cut in the mask rotated in a canvas of the size of the mask
+            if name in ("tHead", "tTail"):
+                diff = np.minimum(diff, 2 * np.pi - diff)
+                assert np.all(diff < 0.05)
+            else:
+                assert np.all(diff < 0.5)
+        else:
+            assert np.allclose(features[name], ref[name])
+    # Empty masks are dropped
+    masks[1] = 0
+    assert len(yolo.get_masks(stub)) == 2
+
+
+def test_get_masks_low():
+    masks, boxes = frame()
+    polygons = [cv2.findContours(np.uint8(i), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)[0][0][:, 0].astype(np.float32)
+                for i in masks]
+    polygons.append(np.asarray([[1, 1], [2, 2]], dtype=np.float32))
+    stub = result(masks.shape[1:], boxes, masks, polygons)
+    test = detector("low").get_masks(stub)
+    # Degenerated polygons are dropped
+    assert len(test) == 3
+    assert np.array_equal(paste(test, masks.shape[1:]), np.uint8(masks * 255))
+
+
+def test_get_masks_box():
+    masks, boxes = frame()
+    height, width = masks.shape[1:]
+    stub = result(masks.shape[1:], boxes)
+    test = detector("box").get_masks(stub)
+    ref = np.zeros((3, height, width), dtype=np.uint8)
+    for i, (x0, y0, x1, y1) in enumerate(boxes):
+        ref[i, max(int(np.floor(y0)), 0):int(np.ceil(y1)), max(int(np.floor(x0)), 0):int(np.ceil(x1))] = 255
+    # Boxes are clipped to the image
+    assert np.array_equal(paste(test, (height, width)), ref)
+    # Oriented boxes are filled polygons
+    corners = np.asarray([[[10, 10], [30, 20], [25, 30], [5, 20]]], dtype=np.float32)
+    stub.obb = SimpleNamespace(xyxyxyxy=Tensor(corners))
+    (mask, corner), = detector("box").get_masks(stub)
+    assert tuple(corner) == (5, 10)
+    ref = np.zeros((height, width), dtype=np.uint8)
+    cv2.fillPoly(ref, [np.int32(corners[0])], 255)
+    assert np.array_equal(paste([(mask, corner)], (height, width))[0], ref)
+
+
+def test_get_masks_empty():
+    assert detector("full").get_masks(result((60, 80), None)) == []
+    assert detector("full").get_masks(result((60, 80), np.zeros((0, 4)))) == []
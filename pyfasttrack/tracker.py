@@ -1,14 +1,29 @@
+import itertools
+import os
 import numpy as np
 from .base_detector import BaseDetector
-from scipy.optimize import linear_sum_assignment
+from .assignment import AssignmentSolver
+from .data import Detections
+from .motion import MotionModel
 
 
 class Tracker():
     """Tracker class to determine assignment from previous and current coordinates.
 
+    Besides the FastTrack parameters, the optional parameter "sparse" (default 0) selects
+    the sparse assignment that only considers the pairs closer than maxDist,
+    faster for large populations. The optional parameter "motion" (default 0) selects a motion
+    model, see MotionModel.from_params, the costs are then computed from the predicted positions
+    of the objects instead of their last positions. The objects with a known velocity are then
+    gated by the optional parameter "motionDist" (default maxDist), that can be much lower than
+    maxDist for fast objects. The optional parameter "lostPool" (default 0) keeps the lost objects
+    without any object nearby out of the dense assignment, see assign_pool, the sparse assignment
+    already ignores them. The optional parameter "solver" (default 0) selects the assignment solver,
+    see AssignmentSolver.from_params.
+
     """
 
-    def __init__(self, params=None, detector=None):
+    def __init__(self, params=None, detector=None, solver=None):
         """Initialize the tracker.
 
         Parameters
@@ -17,11 +32,15 @@ class Tracker():
             Parameters.
         detector : BaseDetector
             Detector that is an implementation of the BaseDetector.
+        solver : AssignmentSolver
+            Assignment solver, selected by the parameter solver if None.
 
         """
         if params:
             self.params = params.copy()
         self.detector = detector
+        self.solver = solver
+        self.motion = None
         self.is_init = False
 
     def set_params(self, params):
@@ -48,6 +67,30 @@ class Tracker():
         self.detector = detector
         self.is_init = False
 
+    def set_solver(self, solver):
+        """Set the assignment solver.
+
+        Parameters
+        ----------
+        solver : AssignmentSolver
+            Assignment solver, selected by the parameter solver if None.
+
+        """
+        self.solver = solver
+
+    def get_solver(self):
+        """Get the assignment solver.
+
+        Returns
+        -------
+        AssignmentSolver
+            Solver set with set_solver, else the solver selected by the parameter solver.
+
+        """
+        if self.solver is not None:
+            return self.solver
+        return AssignmentSolver.from_params(self.params)
+
     def initialize(self, image):
         """Initialize the tracker.
 
@@ -58,22 +101,42 @@ class Tracker():
 
         Returns
         -------
-        list
-            List of detected objects as dict.
+        Detections
+            Detected objects.
 
         """
         if self.params and self.detector:
-            self.prev_detection = self.detector.process(image)
-            self.is_init = True
-            self.max_id = len(self.prev_detection)
-            self.id = list(range(self.max_id))
-            self.lost = [0]*len(self.prev_detection)
-            self.im = 0
-            for i, j in enumerate(self.prev_detection):
-                j["3"]["time"] = self.im
-                j["3"]["id"] = self.id[i]
-            self.im += 1
-            return self.prev_detection
+            return self.initialize_detections(self.detector.process(image))
+
+    def initialize_detections(self, detections):
+        """Initialize the tracker from already detected objects.
+
+        Parameters
+        ----------
+        detections : Detections or list
+            Detected objects, output of BaseDetector.process.
+
+        Returns
+        -------
+        Detections
+            Detected objects.
+
+        """
+        self.prev_detection = detections
+        if not isinstance(self.prev_detection, Detections):
+            self.prev_detection = Detections.from_dicts(self.prev_detection)
+        self.is_init = True
+        self.max_id = len(self.prev_detection)
+        self.id = list(range(self.max_id))
+        self.lost = [0]*len(self.prev_detection)
+        self.im = 0
+        self.prev_detection.data["imageNumber"] = self.im
+        self.prev_detection.data["id"] = self.id
+        self.im += 1
+        self.motion = MotionModel.from_params(self.params)
+        if self.motion is not None:
+            self.motion.initialize(self.get_positions(self.prev_detection))
+        return self.prev_detection
 
     def process(self, image):
         """Process an image.
@@ -85,28 +148,221 @@ class Tracker():
 
         Returns
         -------
-        list
-            List of detected objects as dict.
+        Detections
+            Detected objects.
+
+        """
+        if self.is_init:
+            return self.process_detections(self.detector.process(image))
+
+    def process_detections(self, detections):
+        """Process already detected objects.
+
+        Parameters
+        ----------
+        detections : Detections or list
+            Detected objects, output of BaseDetector.process.
+
+        Returns
+        -------
+        Detections
+            Detected objects.
 
         """
         if self.is_init:
-            self.current_detection = self.detector.process(image)
-            order = self.assign(self.prev_detection, self.current_detection)
+            self.current_detection = detections
+            if not isinstance(self.current_detection, Detections):
+                self.current_detection = Detections.from_dicts(
+                    self.current_detection)
+            gate = None
+            if self.motion is not None:
+                gate = self.motion.get_gate(self.params["maxDist"], self.params.get(
+                    "motionDist", self.params["maxDist"]))
+            if int(self.params.get("lostPool", 0)):
+                order = self.assign_pool(self.predict(self.prev_detection),
+                                         self.current_detection, self.lost, gate)
+            else:
+                order = self.assign(self.predict(self.prev_detection),
+                                    self.current_detection, gate)
             losts = self.find_lost(order)
             self.current_detection = self.reassign(self.prev_detection,
                                                    self.current_detection, order)
-            while len(self.current_detection) - len(self.id) != 0:
-                self.max_id += 1
-                self.id.append(self.max_id)
-                self.lost.append(0)
-            self.current, self.lost, self.id = self.clean(
+            new = len(self.current_detection) - len(self.id)
+            self.id.extend(range(self.max_id + 1, self.max_id + new + 1))
+            self.lost.extend([0]*new)
+            self.max_id += new
+            if self.motion is not None:
+                positions = self.get_positions(self.current_detection)
+                matched = np.flatnonzero(np.asarray(order, dtype=np.intp) != -1)
+                self.motion.update(matched, positions[matched])
+                self.motion.add(positions[len(order):])
+                ids = np.asarray(self.id)
+            self.current_detection, self.lost, self.id = self.clean(
                 self.current_detection, self.lost, losts, self.id)
-            for i, j in enumerate(self.current_detection):
-                j["3"]["time"] = self.im
-                j["3"]["id"] = self.id[i]
+            if self.motion is not None:
+                self.motion.select(np.isin(ids, self.id))
+            self.current_detection.data["imageNumber"] = self.im
+            self.current_detection.data["id"] = self.id
             self.im += 1
             self.prev_detection = self.current_detection
-            return [j for i, j in enumerate(self.current_detection) if i not in losts]
+            # Objects found in this image are the ones with a reset loss counter
+            return self.current_detection[np.asarray(self.lost, dtype=np.intp) == 0]
+
+    def run(self, images, batch_size=1):
+        """Track the objects in a sequence of images.
+
+        The tracker is initialized with the first image.
+
+        Parameters
+        ----------
+        images : iterable
+            Images, channels depending on the detector, for example a FrameSource.
+        batch_size : int
+            Number of images detected at once with BaseDetector.process_batch.
+
+        Yields
+        ------
+        Detections
+            Detected objects of each image.
+
+        """
+        if batch_size <= 1:
+            for image in images:
+                if not self.is_init:
+                    yield self.initialize(image)
+                else:
+                    yield self.process(image)
+            return
+
+        images = iter(images)
+        while True:
+            batch = list(itertools.islice(images, batch_size))
+            if not batch:
+                break
+            for detections in self.detector.process_batch(batch):
+                if not self.is_init:
+                    yield self.initialize_detections(detections)
+                else:
+                    yield self.process_detections(detections)
+
+    def get_state(self):
+        """Get the state of the tracker.
+
+        Returns
+        -------
+        dict
+            Previous detections, identities, loss counters, maximal identity and next image number.
+
+        """
+        if not self.is_init:
+            raise RuntimeError("The tracker is not initialized")
+        state = {"detections": np.copy(self.prev_detection.data), "id": np.asarray(self.id, dtype=np.int64),
+                 "lost": np.asarray(self.lost, dtype=np.int64), "max_id": self.max_id, "im": self.im}
+        if self.motion is not None:
+            state.update(self.motion.get_state())
+        return state
+
+    def set_state(self, state):
+        """Restore the state of the tracker, the parameters and the detector are not modified.
+
+        Parameters
+        ----------
+        state : dict
+            State, output of get_state.
+
+        """
+        self.prev_detection = Detections(
+            np.asarray(state["detections"], dtype=Detections.dtype).copy())
+        self.id = [int(i) for i in state["id"]]
+        self.lost = [int(i) for i in state["lost"]]
+        self.max_id = int(state["max_id"])
+        self.im = int(state["im"])
+        self.motion = MotionModel.from_params(
+            self.params) if getattr(self, "params", None) else None
+        if self.motion is not None:
+            if "motion_state" in state:
+                self.motion.set_state(state)
+            else:
+                self.motion.initialize(self.get_positions(self.prev_detection))
+        self.is_init = True
+
+    def save_checkpoint(self, path):
+        """Save the state of the tracker in a npz file.
+
+        The file is written next to path then renamed, a crash while saving keeps the
+        previous checkpoint. The result must be flushed before saving the checkpoint.
+
+        Parameters
+        ----------
+        path : str
+            Checkpoint file.
+
+        """
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, **self.get_state())
+        os.replace(tmp, path)
+
+    def load_checkpoint(self, path):
+        """Restore the state of the tracker from a npz file.
+
+        The tracking continues at the image number im of the checkpoint, see Result and
+        FrameSource to resume the result and the images at this image.
+
+        Parameters
+        ----------
+        path : str
+            Checkpoint file, output of save_checkpoint.
+
+        Returns
+        -------
+        int
+            Next image number to process.
+
+        """
+        with np.load(path) as state:
+            self.set_state(state)
+        return self.im
+
+    def get_positions(self, detections):
+        """Get the positions of the tracked spot.
+
+        Parameters
+        ----------
+        detections : Detections
+            Detections.
+
+        Returns
+        -------
+        ndarray
+            Positions [[x, y], ...].
+
+        """
+        x, y = Detections.keys[str(int(self.params["spot"]))]["center"]
+        return np.column_stack((detections.data[x], detections.data[y]))
+
+    def predict(self, detections):
+        """Move the tracked objects to their positions predicted by the motion model for the next image.
+
+        Parameters
+        ----------
+        detections : Detections
+            Tracked objects, in the order of the motion model.
+
+        Returns
+        -------
+        Detections
+            Copy of the objects at their predicted positions, the objects if there is no motion model.
+
+        """
+        if self.motion is None:
+            return detections
+        x, y = Detections.keys[str(int(self.params["spot"]))]["center"]
+        positions = self.motion.predict()
+        predicted = Detections(detections.data.copy())
+        predicted.data[x] = positions[:, 0]
+        predicted.data[y] = positions[:, 1]
+        return predicted
 
     @staticmethod
     def angle_difference(a, b):
@@ -135,14 +391,14 @@ class Tracker():
 
         Parameters
         ----------
-        a : float
+        a : float or ndarray
             Dividend.
         b : float
             Divisor.
 
         Returns
         -------
-        float
+        float or ndarray
             a/b.
 
         """
@@ -157,13 +413,13 @@ class Tracker():
         Parameters
         ----------
         var : List
-            List of variable.
+            List of variable, floats or ndarrays.
         norm : list
             Normalization coefficient associated to var.
 
         Returns
         -------
-        float
+        float or ndarray
             Cost.
 
         """
@@ -172,19 +428,165 @@ class Tracker():
             cost += self.div(i, j)
         return cost
 
-    def assign(self, prev, current):
+    @staticmethod
+    def get_arrays(detections, spot):
+        """Gather the features used by the cost function as arrays.
+
+        Parameters
+        ----------
+        detections : Detections or list
+            Detections or list of dict. Each dict is one object with 4 key "0", "1", "2", "3".
+        spot : str
+            Key of the spot used for the tracking, "0", "1" or "2".
+
+        Returns
+        -------
+        tuple
+            Arrays of x, y, orientation, area and perimeter.
+
+        """
+        if isinstance(detections, Detections):
+            fields = Detections.keys[spot]
+            return (detections.data[fields["center"][0]], detections.data[fields["center"][1]],
+                    detections.data[fields["orientation"]], detections.data["areaBody"], detections.data["perimeterBody"])
+        x = np.fromiter((i[spot]["center"][0] for i in detections),
+                        dtype=np.float64, count=len(detections))
+        y = np.fromiter((i[spot]["center"][1] for i in detections),
+                        dtype=np.float64, count=len(detections))
+        orientation = np.fromiter((i[spot]["orientation"] for i in detections),
+                                  dtype=np.float64, count=len(detections))
+        area = np.fromiter((i["3"]["area"] for i in detections),
+                           dtype=np.float64, count=len(detections))
+        perim = np.fromiter((i["3"]["perim"] for i in detections),
+                            dtype=np.float64, count=len(detections))
+        return x, y, orientation, area, perim
+
+    def get_pair_cost(self, prev, current, gate=None):
+        """Compute the cost between pairs of objects.
+
+        Parameters
+        ----------
+        prev : tuple
+            Arrays of x, y, orientation, area and perimeter of the previous objects.
+        current : tuple
+            Arrays of x, y, orientation, area and perimeter of the current objects, broadcastable with prev.
+        gate : float or ndarray
+            Maximal distance, broadcastable with prev, maxDist if None.
+
+        Returns
+        -------
+        ndarray
+            Cost, 1e34 for the pairs farther than maxDist.
+        ndarray
+            Boolean array of the valid pairs.
+
+        """
+        prev_x, prev_y, prev_orientation, prev_area, prev_perim = prev
+        current_x, current_y, current_orientation, current_area, current_perim = current
+
+        distance = np.sqrt((prev_x - current_x)**2 + (prev_y - current_y)**2)
+        angle = np.abs(self.angle_difference(
+            prev_orientation, current_orientation))
+        area = np.abs(prev_area - current_area)
+        perim = np.abs(prev_perim - current_perim)
+
+        valid = distance < (self.params["maxDist"] if gate is None else gate)
+        cost = self.compute_cost([distance, angle, area, perim], [
+                                 self.params["normDist"], self.params["normAngle"], self.params["normArea"], self.params["normPerim"]])
+        cost = np.where(valid, cost, 1e34)
+        return cost, valid
+
+    def get_cost(self, prev, current, gate=None):
+        """Compute the cost matrix between previous and current objects.
+
+        All the pairs are computed at once as whole-matrix operations.
+
+        Parameters
+        ----------
+        prev : Detections or list
+            Previous detections.
+        current : Detections or list
+            Current detections.
+        gate : ndarray
+            Maximal distance of each previous object, maxDist if None.
+
+        Returns
+        -------
+        ndarray
+            Cost matrix of shape (len(prev), len(current)), 1e34 for the pairs farther than maxDist.
+        ndarray
+            Boolean matrix of the valid pairs.
+
+        """
+        spot = str(int(self.params["spot"]))
+        prev = [i[:, np.newaxis] for i in self.get_arrays(prev, spot)]
+        current = [i[np.newaxis, :] for i in self.get_arrays(current, spot)]
+        if gate is not None:
+            gate = np.asarray(gate)[:, np.newaxis]
+        return self.get_pair_cost(prev, current, gate)
+
+    def get_sparse_cost(self, prev, current, gate=None):
+        """Compute the cost of the pairs of objects closer than maxDist.
+
+        Candidate pairs are enumerated with a KD-tree, the cost is only computed for them.
+
+        Parameters
+        ----------
+        prev : Detections or list
+            Previous detections.
+        current : Detections or list
+            Current detections.
+        gate : ndarray
+            Maximal distance of each previous object, maxDist if None.
+
+        Returns
+        -------
+        ndarray
+            Indexes of the previous objects of each pair.
+        ndarray
+            Indexes of the current objects of each pair.
+        ndarray
+            Cost of each pair.
+
+        """
+        from scipy.spatial import cKDTree
+        spot = str(int(self.params["spot"]))
+        prev = self.get_arrays(prev, spot)
+        current = self.get_arrays(current, spot)
+        points = np.column_stack(prev[0:2])
+        current_tree = cKDTree(np.column_stack(current[0:2]))
+        gate = np.broadcast_to(
+            self.params["maxDist"] if gate is None else gate, len(points))
+        rows = []
+        cols = []
+        # One query by maximal distance, at most two with a motion model
+        for distance in np.unique(gate):
+            index = np.flatnonzero(gate == distance)
+            pairs = cKDTree(points[index]).sparse_distance_matrix(
+                current_tree, distance * (1 + 1e-9), output_type="ndarray")
+            rows.append(index[pairs["i"]])
+            cols.append(pairs["j"].astype(np.intp))
+        row = np.concatenate(rows)
+        col = np.concatenate(cols)
+        cost, valid = self.get_pair_cost(
+            [i[row] for i in prev], [i[col] for i in current], gate[row])
+        return row[valid], col[valid], cost[valid]
+
+    def assign(self, prev, current, gate=None):
         """Find the optimal assignent.
 
         Parameters
         ----------
-        prev : list
-            List of dict. Each dict is one object with 4 key "0", "1", "2", "3".
+        prev : Detections or list
+            Detections or list of dict. Each dict is one object with 4 key "0", "1", "2", "3".
             0,1,2 is the {center, orientation} of the head, tail and body respectively.
             3 is {area, perim} of the object.
-        current : list
-            List of dict. Each dict is one object with 4 key "0", "1", "2", "3".
+        current : Detections or list
+            Detections or list of dict. Each dict is one object with 4 key "0", "1", "2", "3".
             0,1,2 is the {center, orientation} of the head, tail and body respectively.
             3 is {area, perim} of the object.
+        gate : ndarray
+            Maximal distance of each previous object, maxDist if None.
 
         Returns
         -------
@@ -196,67 +598,143 @@ class Tracker():
             assignment = []
         elif len(current) == 0:
             assignment = [-1]*len(prev)
+        elif int(self.params.get("sparse", 0)):
+            assignment = self.assign_sparse(prev, current, gate)
         else:
-            cost = np.zeros((len(prev), len(current)))
-            valid = []
-            for i, l in enumerate(prev):
-                prev_coord = l[str(int(self.params["spot"]))]
-                for j, k in enumerate(current):
-                    current_coord = k[str(int(self.params["spot"]))]
-
-                    distance = np.sqrt((prev_coord["center"][0] - current_coord["center"][0])**2 + (
-                        prev_coord["center"][1] - current_coord["center"][1])**2)
-                    angle = np.abs(self.angle_difference(
-                        prev_coord["orientation"], current_coord["orientation"]))
-                    area = np.abs(l["3"]["area"] - k["3"]["area"])
-                    perim = np.abs(l["3"]["perim"] - k["3"]["perim"])
-
-                    if distance < self.params["maxDist"]:
-                        cost[i, j] = self.compute_cost([distance, angle, area, perim], [
-                                                       self.params["normDist"], self.params["normAngle"], self.params["normArea"], self.params["normPerim"]])
-                        valid.append((i, j))
-                    else:
-                        cost[i, j] = 1e34
-
-            row, col = linear_sum_assignment(cost)
-
-            # TODO: optimize
-            assignment = []
-            for i, __ in enumerate(prev):
-                if i in row and (i, col[list(row).index(i)]) in valid:
-                    assignment.append(col[list(row).index(i)])
-                else:
-                    assignment.append(-1)
+            cost, valid = self.get_cost(prev, current, gate)
+            row, col = self.get_solver().solve(cost, valid)
+            assignment = np.full(len(prev), -1, dtype=np.intp)
+            assignment[row] = col
+            assignment = assignment.tolist()
 
         return assignment
 
+    def assign_sparse(self, prev, current, gate=None):
+        """Find the optimal assignent using only the pairs closer than maxDist.
+
+        The candidate pairs form a bipartite graph that is split in connected components,
+        each component is an independent assignment problem solved separately.
+        The number of assigned objects is the same than assign, the total cost can be
+        lower when the 1e34 cost of the dense problem degrades the solver precision.
+
+        Parameters
+        ----------
+        prev : Detections or list
+            Previous detections.
+        current : Detections or list
+            Current detections.
+        gate : ndarray
+            Maximal distance of each previous object, maxDist if None.
+
+        Returns
+        -------
+        list
+            Assignment.
+
+        """
+        from scipy.sparse import coo_matrix
+        from scipy.sparse.csgraph import connected_components
+        assignment = np.full(len(prev), -1, dtype=np.intp)
+        row, col, cost = self.get_sparse_cost(prev, current, gate)
+        if len(row) == 0:
+            return assignment.tolist()
+
+        graph = coo_matrix((np.ones(len(row)), (row, col + len(prev))),
+                           shape=(len(prev) + len(current), len(prev) + len(current)))
+        __, labels = connected_components(graph, directed=False)
+        pair_labels = labels[row]
+        sort = np.argsort(pair_labels, kind="stable")
+        splits = np.flatnonzero(np.diff(pair_labels[sort])) + 1
+        solver = self.get_solver()
+        for component in np.split(sort, splits):
+            if len(component) == 1:
+                assignment[row[component[0]]] = col[component[0]]
+                continue
+            rows, local_row = np.unique(row[component], return_inverse=True)
+            cols, local_col = np.unique(col[component], return_inverse=True)
+            sub_cost = np.full((len(rows), len(cols)),
+                               AssignmentSolver.get_forbidden_cost(cost[component]))
+            sub_cost[local_row, local_col] = cost[component]
+            valid = np.zeros((len(rows), len(cols)), dtype=bool)
+            valid[local_row, local_col] = True
+            sub_row, sub_col = solver.solve(sub_cost, valid)
+            assignment[rows[sub_row]] = cols[sub_col]
+        return assignment.tolist()
+
+    def assign_pool(self, prev, current, lost, gate=None):
+        """Find the optimal assignment, the lost objects without any current object nearby are left out.
+
+        The lost objects are a pool searched with a KD-tree of the current objects, only the ones that have
+        a current object closer than maxDist join the objects found in the previous image in the assignment.
+        The others cannot be assigned, the result is the same than assign but the assignment stays small
+        when many objects are hidden.
+
+        Parameters
+        ----------
+        prev : Detections
+            Previous detections.
+        current : Detections
+            Current detections.
+        lost : list
+            Loss counter of the previous objects, 0 for the objects found in the previous image.
+        gate : ndarray
+            Maximal distance of each previous object, maxDist if None.
+
+        Returns
+        -------
+        list
+            Assignment.
+
+        """
+        from scipy.spatial import cKDTree
+        lost = np.asarray(lost) > 0
+        if not np.any(lost) or len(current) == 0:
+            return self.assign(prev, current, gate)
+        spot = str(int(self.params["spot"]))
+        gate = np.broadcast_to(
+            self.params["maxDist"] if gate is None else gate, len(prev))
+        x, y = self.get_arrays(prev[lost], spot)[0:2]
+        current_x, current_y = self.get_arrays(current, spot)[0:2]
+        nearby = cKDTree(np.column_stack((current_x, current_y))).query_ball_point(
+            np.column_stack((x, y)), gate[lost] * (1 + 1e-9), return_length=True) > 0
+        kept = ~lost
+        kept[np.flatnonzero(lost)[nearby]] = True
+        kept = np.flatnonzero(kept)
+        assignment = np.full(len(prev), -1, dtype=np.intp)
+        assignment[kept] = self.assign(prev[kept], current, gate[kept])
+        return assignment.tolist()
+
     def reassign(self, past, current, order):
         """Reassign current based on order.
+        The inputs are not modified.
 
         Parameters
         ----------
-        prev : list
-            List of dict of previous detections.
-        current : list
-            List of dict of current detections.
+        prev : Detections or list
+            Previous detections.
+        current : Detections or list
+            Current detections.
         order : list
             Reassingment
 
         Returns
         -------
-        list
+        Detections or list
             Reordered current.
 
         """
-        tmp = past
-        for i, j in enumerate(past):
-            if order[i] != -1:
-                tmp[i] = current[order[i]]
-
-        for i, j in enumerate(current):
-            if i not in order:
-                tmp.append(j)
-
+        if isinstance(past, Detections):
+            order = np.asarray(order, dtype=np.intp)
+            matched = order != -1
+            new = np.ones(len(current), dtype=bool)
+            new[order[matched]] = False
+            data = np.concatenate((past.data, current.data[new]))
+            data[:len(past)][matched] = current.data[order[matched]]
+            return Detections(data)
+
+        assigned = set(order)
+        tmp = [current[j] if j != -1 else i for i, j in zip(past, order)]
+        tmp.extend(j for i, j in enumerate(current) if i not in assigned)
         return tmp
 
     def find_lost(self, assignment):
@@ -277,12 +755,12 @@ class Tracker():
 
     def clean(self, current, counter, lost, idty):
         """Delete objects that were lost.
-        Only counter is copied in this function. Other lists act as pointer.
+        The inputs are not modified.
 
         Parameters
         ----------
-        current : list
-            List to clean.
+        current : Detections or list
+            Objects to clean.
         counter : list
             Counter of losses.
         lost : list
@@ -292,18 +770,24 @@ class Tracker():
 
         Returns
         -------
-        list
-            Cleaned list.
+        Detections or list
+            Cleaned objects.
         list
             Updated counter.
+        list
+            Updated identity.
 
         """
+        lost = set(lost)
         counter = [j + 1 if i in lost else 0 for i, j in enumerate(counter)]
 
-        to_delete = sorted([i for i in lost if counter[i] >
-                           self.params["maxTime"]], reverse=True)
-        for i in to_delete:
-            current.pop(i)
-            counter.pop(i)
-            idty.pop(i)
+        to_delete = {i for i in lost if counter[i] > self.params["maxTime"]}
+        if to_delete:
+            keep = [i for i in range(len(counter)) if i not in to_delete]
+            if isinstance(current, Detections):
+                current = current[np.asarray(keep, dtype=np.intp)]
+            else:
+                current = [current[i] for i in keep]
+            counter = [counter[i] for i in keep]
+            idty = [idty[i] for i in keep]
         return current, counter, idty
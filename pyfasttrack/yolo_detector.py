@@ -1,7 +1,6 @@
 from .base_detector import BaseDetector
 import numpy as np
 import cv2
-from ultralytics import YOLO
 import logging
 
 logging.getLogger("ultralytics").setLevel(logging.WARNING)
@@ -9,6 +8,18 @@ logging.getLogger("tensorflow").setLevel(logging.WARNING)
 
 
 class YoloDetector(BaseDetector):
+    """Detector using a YOLO segmentation model.
+
+    Besides the model, the optional parameter "masks" selects how the object masks are made:
+    "full" (default) crops the masks computed at the image resolution, "low" draws the contours of
+    the masks computed at the inference resolution, faster, and "box" fills the (oriented) boxes
+    without computing the masks. Other parameters are passed to the predict method of the model,
+    for example device="cpu", classes or conf. Masks are cropped to the object bounding boxes.
+
+    """
+
+    reserved = ("model", "masks")
+
     def __init__(self, params):
         """Initialize the detector.
 
@@ -18,8 +29,15 @@ class YoloDetector(BaseDetector):
             Parameters.
 
         """
+        # ultralytics and Torch are only imported when a YOLO detector is created
+        from ultralytics import YOLO
         self.params = params
         self.model = YOLO(self.params["model"])
+        self.masks = self.params.get("masks", "full")
+        if self.masks not in ("full", "low", "box"):
+            raise ValueError("Unknown masks mode {}".format(self.masks))
+        self.predict_params = {i: j for i,
+                               j in self.params.items() if i not in self.reserved}
 
     def detect(self, image):
         """Detect objects
@@ -34,10 +52,87 @@ class YoloDetector(BaseDetector):
         list
             List of masks as [(mask, left_corner), ...].
 
+        """
+        return self.detect_batch([image])[0]
+
+    def detect_batch(self, images):
+        """Detect objects in several images with one inference.
+
+        Parameters
+        ----------
+        images : list
+            Images as BGR.
+
+        Returns
+        -------
+        list
+            List of masks as [(mask, left_corner), ...] by image.
+
         """
         results = self.model.predict(
-            image, retina_masks=True, stream=True, **self.params)
-        masks = [(np.moveaxis(np.uint8(i.masks.data.cpu().numpy()*255), 0, -1), (0, 0))
-                 for i in next(results)]
+            list(images), retina_masks=self.masks == "full", stream=False, verbose=False, **self.predict_params)
+        return [self.get_masks(i) for i in results]
+
+    def get_masks(self, result):
+        """Get the cropped masks of the objects of one image.
+
+        Parameters
+        ----------
+        result : ultralytics.engine.results.Results
+            Result of one image.
 
+        Returns
+        -------
+        list
+            List of masks as [(mask, left_corner), ...].
+
+        """
+        height, width = result.orig_shape
+        if self.masks == "box" and getattr(result, "obb", None) is not None:
+            return [self.get_polygon_mask(i) for i in result.obb.xyxyxyxy.cpu().numpy()]
+        if result.boxes is None or len(result.boxes) == 0:
+            return []
+        boxes = result.boxes.xyxy.cpu().numpy()
+        corners = np.clip(np.floor(boxes[:, 0:2]), 0, [
+                          width - 1, height - 1]).astype(int)
+        ends = np.clip(np.ceil(boxes[:, 2:4]), corners + 1,
+                       [width, height]).astype(int).tolist()
+        corners = corners.tolist()
+
+        masks = []
+        if self.masks == "box" or result.masks is None:
+            for (x0, y0), (x1, y1) in zip(corners, ends):
+                masks.append(
+                    (np.full((y1 - y0, x1 - x0), 255, dtype=np.uint8), (x0, y0)))
+        elif self.masks == "low":
+            for polygon in result.masks.xy:
+                if len(polygon) >= 3:
+                    masks.append(self.get_polygon_mask(polygon))
+        else:
+            for mask, (x0, y0), (x1, y1) in zip(result.masks.data, corners, ends):
+                # Crop on the device before the copy, only the box is transferred
+                mask = np.uint8(mask[y0:y1, x0:x1].cpu().numpy() * 255)
+                if np.any(mask):
+                    masks.append((mask, (x0, y0)))
         return masks
+
+    @staticmethod
+    def get_polygon_mask(polygon):
+        """Draw a polygon in a mask of the size of its bounding box.
+
+        Parameters
+        ----------
+        polygon : ndarray
+            Points [[x, y], ...] in the image.
+
+        Returns
+        -------
+        tuple
+            (mask, left_corner).
+
+        """
+        polygon = np.int32(np.round(polygon))
+        x, y, width, height = cv2.boundingRect(polygon)
+        mask = np.zeros((height, width), dtype=np.uint8)
+        cv2.fillPoly(mask, [polygon - (x, y)], 255)
+        return mask, (x, y)
@@ -13,8 +13,10 @@ setup(
         'opencv-python',
         'scipy',
         'toml',
-        'sentry-sdk',
         'numpy',],
+    extras_require={
+        'onnx': ['onnxruntime'],
+        'telemetry': ['sentry-sdk'],},
     license='MIT',
     python_requires='>=3.9',
     zip_safe=False,